@@ -1,11 +1,15 @@
 import os
+import threading
 from apscheduler.schedulers.background import BackgroundScheduler
+from dispatcher import Notifier
 
-class Automation:
+class Automation(Notifier):
     def __init__(self, defaultstate=None, executors=None, job_defaults=None):
+        Notifier.__init__(self)
         self.queue = [] # Stores datetimes of jobs to be executed for the DateTrigger.
-        self.state = defaultstate
+        self._state = defaultstate
         self.filePath = os.getcwd() # Where to save traces
+        self.cancelEvent = threading.Event()    # Set when the scheduler is stopped to cancel jobs waiting on the analyzer
         self.scheduler = BackgroundScheduler(executors=executors, job_defaults=job_defaults, daemon=True)
         self.presets = self.Presets()
         self.textBoxString = self.presets.default # Last saved textboxstring
@@ -14,6 +18,18 @@ class Automation:
         self.cronStartDatetime = None
         self.cronInterval = [0, 5]
 
+    @property
+    def state(self):
+        """State of the scheduler (state.IDLE or state.AUTO), subscribers are notified when it changes."""
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        changed = value != self._state
+        self._state = value
+        if changed:
+            self.notify()
+
     class Presets:
         def __init__(self):
             self.default = """# This function is called once when the automation scheduler starts (in its own thread)
@@ -34,11 +50,11 @@ def initSchedule():
 def onSchedule():
     with visaLock:
         Vi.openRsrc.write(":INIT:CONT OFF")
-        buffer = Vi.openRsrc.query_ascii_values(":READ:SAN?")
+        buffer = Vi.queryTrace(":READ:SAN?")
         TimeParameter.update(value=datetime.now(LOCAL_TIMEZONE).isoformat())
     xAxis = buffer[::2]
     yAxis = buffer[1::2]
-    saveTrace(filePath=automation.filePath, xdata=xAxis, ydata=yAxis)
+    queueTrace(filePath=automation.filePath, xdata=xAxis, ydata=yAxis)
 """
             self.average = """# This function is called once when the automation scheduler starts (in its own thread)
 def initSchedule():
@@ -50,15 +66,14 @@ def initSchedule():
 def onSchedule():
     with visaLock:
         Vi.openRsrc.write(":INIT:CONT OFF")
-        Vi.openRsrc.write(":INIT:IMM")
-        time.sleep(0.25)
-        while Vi.getOperationRegister() & 0b00011011:
-            time.sleep(0.1)
-        buffer = Vi.openRsrc.query_ascii_values(":FETCH:SAN?")
+    if not Vi.waitForSweep(lock=visaLock, timeout=Spec_An.sweepTimeout(), cancel=automation.cancelEvent):
+        return
+    with visaLock:
+        buffer = Vi.queryTrace(":FETCH:SAN?")
         TimeParameter.update(value=datetime.now(LOCAL_TIMEZONE).isoformat())
     xAxis = buffer[::2]
     yAxis = buffer[1::2]
-    saveTrace(filePath=automation.filePath, xdata=xAxis, ydata=yAxis)
+    queueTrace(filePath=automation.filePath, xdata=xAxis, ydata=yAxis)
 """
             self.maxhold = """# This function is called once when the automation scheduler starts (in its own thread)
 def initSchedule():
@@ -70,15 +85,14 @@ def initSchedule():
 def onSchedule():
     with visaLock:
         Vi.openRsrc.write(":INIT:CONT OFF")
-        Vi.openRsrc.write(":INIT:IMM")
-        time.sleep(0.25)
-        while Vi.getOperationRegister() & 0b00011011:
-            time.sleep(0.1)
-        buffer = Vi.openRsrc.query_ascii_values(":FETCH:SAN?")
+    if not Vi.waitForSweep(lock=visaLock, timeout=Spec_An.sweepTimeout(), cancel=automation.cancelEvent):
+        return
+    with visaLock:
+        buffer = Vi.queryTrace(":FETCH:SAN?")
         TimeParameter.update(value=datetime.now(LOCAL_TIMEZONE).isoformat())
     xAxis = buffer[::2]
     yAxis = buffer[1::2]
-    saveTrace(filePath=automation.filePath, xdata=xAxis, ydata=yAxis)
+    queueTrace(filePath=automation.filePath, xdata=xAxis, ydata=yAxis)
 """
             self.minhold = """# This function is called once when the automation scheduler starts (in its own thread)
 def initSchedule():
@@ -90,13 +104,12 @@ def initSchedule():
 def onSchedule():
     with visaLock:
         Vi.openRsrc.write(":INIT:CONT OFF")
-        Vi.openRsrc.write(":INIT:IMM")
-        time.sleep(0.25)
-        while Vi.getOperationRegister() & 0b00011011:
-            time.sleep(0.1)
-        buffer = Vi.openRsrc.query_ascii_values(":FETCH:SAN?")
+    if not Vi.waitForSweep(lock=visaLock, timeout=Spec_An.sweepTimeout(), cancel=automation.cancelEvent):
+        return
+    with visaLock:
+        buffer = Vi.queryTrace(":FETCH:SAN?")
         TimeParameter.update(value=datetime.now(LOCAL_TIMEZONE).isoformat())
     xAxis = buffer[::2]
     yAxis = buffer[1::2]
-    saveTrace(filePath=automation.filePath, xdata=xAxis, ydata=yAxis)
+    queueTrace(filePath=automation.filePath, xdata=xAxis, ydata=yAxis)
 """
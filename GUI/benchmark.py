@@ -0,0 +1,465 @@
+"""Benchmarks for the acquisition and storage paths of the Python Front End. Run `python benchmark.py --help` for usage.
+"""
+
+import argparse
+import io
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from frontendio import *
+from loggingsetup import *
+from plotting import BlitManager, DecimatedLine
+from simulator import SimulatedAnalyzer, SimulatorServer
+from tracedata import *
+from parameters import Parameter, Span
+from catalog import TraceCatalog
+from drift import toDriftFormat
+from waterfall import _scanGroups, _processGroup
+
+# Commands of the Parameter instances queried by SpecAn.setAnalyzerValue in main.py
+PARAMETER_COMMANDS = tuple(parameter.command for parameter in Parameter.instances if parameter.command is not None)
+# Span and its dependents
+SPAN_COMMANDS = tuple(parameter.command for parameter in (Span, *Span.dependents))
+
+class RoundTripCounter:
+    def __init__(self, resource):
+        """Wraps an open pyvisa resource and counts the messages written to it and the responses read from it. Attributes not overridden here are passed to the resource.
+
+        Args:
+            resource (pyvisa.resources.MessageBasedResource): Open resource to wrap.
+        """
+        self._resource = resource
+        self.writes = 0
+        self.reads = 0
+
+    def __getattr__(self, name):
+        return getattr(self._resource, name)
+
+    def reset(self):
+        self.writes = 0
+        self.reads = 0
+
+    def write(self, *args, **kwargs):
+        self.writes += 1
+        return self._resource.write(*args, **kwargs)
+
+    def query(self, *args, **kwargs):
+        self.writes += 1
+        self.reads += 1
+        return self._resource.query(*args, **kwargs)
+
+    def query_ascii_values(self, *args, **kwargs):
+        self.writes += 1
+        self.reads += 1
+        return self._resource.query_ascii_values(*args, **kwargs)
+
+    def query_binary_values(self, *args, **kwargs):
+        self.writes += 1
+        self.reads += 1
+        return self._resource.query_binary_values(*args, **kwargs)
+
+def _report(name, counter, elapsed, iterations):
+    print(f'{name:<40} messages: {counter.writes / iterations:>6.1f}   round trips: {counter.reads / iterations:>6.1f}   time: {1000 * elapsed / iterations:>8.2f} ms')
+
+def benchSetAnalyzerValue(Vi, iterations=10):
+    """Compares the SCPI traffic of one query per parameter against SpecAn's batched synchronisation for a full parameter query and for a span change.
+
+    Args:
+        Vi (VisaIO): Object of VisaIO with an open resource.
+        iterations (int, optional): Amount of times each scenario is repeated. Defaults to 10.
+    """
+    # setAnalyzerValue leaves the commands the device does not answer out of its batches, find them once like its first full query does
+    for command in PARAMETER_COMMANDS:
+        try:
+            Vi.openRsrc.query_ascii_values(f'{command}?', converter='s')
+        except visa.errors.VisaIOError:
+            Vi.unbatchedCommands.add(command)
+            Vi.openRsrc.clear()
+    if Vi.unbatchedCommands:
+        print(f'Not answered by the device, left out: {", ".join(sorted(Vi.unbatchedCommands))}')
+    commands = [command for command in PARAMETER_COMMANDS if command not in Vi.unbatchedCommands]
+    spanCommands = [command for command in SPAN_COMMANDS if command not in Vi.unbatchedCommands]
+    counter = RoundTripCounter(Vi.openRsrc)
+    Vi.openRsrc = counter
+    scenarios = {
+        'Full query, per parameter': lambda: [counter.query_ascii_values(f'{command}?', converter='s') for command in commands],
+        'Full query, batched': lambda: Vi.queryBatch(queries=[f'{command}?' for command in commands]),
+        'Span change, per parameter': lambda: (counter.write(':SENS:FREQ:SPAN 1e6'), [counter.query_ascii_values(f'{command}?', converter='s') for command in commands]),
+        'Span change, batched with dependents': lambda: Vi.queryBatch(writes=[':SENS:FREQ:SPAN 1e6'], queries=[f'{command}?' for command in spanCommands]),
+    }
+    try:
+        for name, scenario in scenarios.items():
+            counter.reset()
+            timer = time.perf_counter()
+            for _ in range(iterations):
+                scenario()
+            _report(name, counter, time.perf_counter() - timer, iterations)
+    finally:
+        Vi.openRsrc = counter._resource
+
+def benchTraceTransfer(Vi, iterations=10):
+    """Compares the time taken by VisaIO.queryTrace to transfer a trace in each of the formats in TRACE_FORMATS at several sweep point counts.
+
+    Args:
+        Vi (VisaIO): Object of VisaIO with an open resource.
+        iterations (int, optional): Amount of times each transfer is repeated. Defaults to 10.
+    """
+    Vi.openRsrc.write(':INIT:CONT OFF')
+    try:
+        for sweepPoints in (1001, 10001, 100001):
+            Vi.openRsrc.write(f':SENS:SWEEP:POINTS {sweepPoints}')
+            Vi.openRsrc.query('*OPC?')
+            for traceFormat in TRACE_FORMATS:
+                Vi.setTraceFormat(traceFormat)
+                timer = time.perf_counter()
+                for _ in range(iterations):
+                    buffer = Vi.queryTrace(':TRACE:DATA? TRACE1')
+                elapsed = time.perf_counter() - timer
+                print(f'{sweepPoints:>7} points, {traceFormat:<8} time: {1000 * elapsed / iterations:>8.2f} ms   ({len(buffer)} values)')
+    finally:
+        Vi.setTraceFormat(FORMAT_ASCII)
+        Vi.openRsrc.write(':INIT:CONT ON')
+
+def benchSweepWait(Vi, iterations=10):
+    """Compares the time taken to detect the end of a single sweep by polling the operation register, as the automation presets used to, against VisaIO.waitForSweep.
+
+    Args:
+        Vi (VisaIO): Object of VisaIO with an open resource.
+        iterations (int, optional): Amount of sweeps taken with each method. Defaults to 10.
+    """
+    def _pollOperationRegister():
+        Vi.openRsrc.write(':INIT:IMM')
+        time.sleep(0.25)
+        while Vi.getOperationRegister() & 0b00011011:
+            time.sleep(0.1)
+
+    Vi.openRsrc.write(':INIT:CONT OFF')
+    sweepTime = float(Vi.openRsrc.query(':SWE:TIME?'))
+    try:
+        for name, method in (('Operation register polling', _pollOperationRegister), ('VisaIO.waitForSweep', Vi.waitForSweep)):
+            timer = time.perf_counter()
+            for _ in range(iterations):
+                method()
+            elapsed = (time.perf_counter() - timer) / iterations
+            print(f'{name:<40} sweep time: {1000 * sweepTime:>8.2f} ms   time: {1000 * elapsed:>8.2f} ms   overhead: {1000 * (elapsed - sweepTime):>8.2f} ms')
+    finally:
+        Vi.openRsrc.write(':INIT:CONT ON')
+
+def _concatenateTrace(header, xdata, ydata, delimiter=','):
+    """Trace formatting used by saveTrace before tracedata.formatTrace, kept as the benchmark baseline."""
+    buffer = ''
+    for name, value in header:
+        buffer = buffer + name + delimiter + value + '\n'
+    buffer = buffer + 'DATA\n'
+    for index in range(len(xdata)):
+        buffer = buffer + str(xdata[index]) + delimiter + str(ydata[index]) + '\n'
+    return buffer
+
+def benchTraceWriter(iterations=10):
+    """Compares the string concatenation saveTrace used to build trace csvs with tracedata.writeTrace at 1k, 10k and 100k points, and checks both produce the same text.
+    The baseline is quadratic and is only timed once per trace length.
+
+    Args:
+        iterations (int, optional): Amount of times each trace is written with writeTrace. Defaults to 10.
+    """
+    rng = np.random.default_rng(0)
+    header = [(f'Parameter {index}', f'{rng.normal():.6E}') for index in range(20)]
+    for points in (1000, 10000, 100000):
+        xdata = np.linspace(0, 10e9, points)
+        ydata = rng.normal(-80, 5, points).astype(np.float32)
+
+        timer = time.perf_counter()
+        baseline = io.StringIO()
+        baseline.write(_concatenateTrace(header, xdata, ydata))
+        baselineTime = time.perf_counter() - timer
+
+        timer = time.perf_counter()
+        for _ in range(iterations):
+            output = io.StringIO()
+            writeTrace(output, header, xdata, ydata)
+        writerTime = (time.perf_counter() - timer) / iterations
+
+        if output.getvalue() != baseline.getvalue():
+            raise AssertionError(f'writeTrace output differs from the previous saveTrace output at {points} points')
+        print(f'{points:>7} points   string concatenation: {1000 * baselineTime:>10.2f} ms   tracedata.writeTrace: {1000 * writerTime:>8.2f} ms   ({baselineTime / writerTime:.0f}x)')
+
+def _directorySize(path):
+    return sum(os.path.getsize(os.path.join(dirpath, f)) for dirpath, _, filenames in os.walk(path) for f in filenames)
+
+def benchTraceStorage(iterations=100):
+    """Compares writing `iterations` traces of 10001 points as csvs against appending them to a TraceArchive, and reading them back for a waterfall.
+
+    Args:
+        iterations (int, optional): Amount of traces written. Defaults to 100.
+    """
+    rng = np.random.default_rng(0)
+    header = [(f'Parameter {index}', f'{rng.normal():.6E}') for index in range(20)]
+    xdata = np.linspace(0, 10e9, 10001)
+    traces = [rng.normal(-80, 5, xdata.size) for _ in range(iterations)]
+    with tempfile.TemporaryDirectory() as directory:
+        csvDirectory = os.path.join(directory, 'csv')
+        os.mkdir(csvDirectory)
+        timer = time.perf_counter()
+        for index, ydata in enumerate(traces):
+            with open(os.path.join(csvDirectory, f'EMS1-2026-01-01-{index}.csv'), 'x') as f:
+                writeTrace(f, header, xdata, ydata)
+        csvWrite = time.perf_counter() - timer
+        timer = time.perf_counter()
+        matrix = np.array([pd.read_csv(os.path.join(csvDirectory, f), header=None, skiprows=len(header) + 1)[1].to_numpy(float) for f in getAllCsvFiles(csvDirectory)])
+        csvRead = time.perf_counter() - timer
+
+        archive = TraceArchive.forTrace(os.path.join(directory, 'archive'), 'EMS1', datetime(2026, 1, 1))
+        timer = time.perf_counter()
+        for ydata in traces:
+            archive.append(xdata, ydata, header, datetime.now())
+        archiveWrite = time.perf_counter() - timer
+        timer = time.perf_counter()
+        matrix = np.array(archive.amplitudes(archive.segments()[0]))
+        archiveRead = time.perf_counter() - timer
+
+        print(f'{iterations} traces of {xdata.size} points')
+        print(f'csv            write: {1000 * csvWrite / iterations:>8.2f} ms/trace   read all: {1000 * csvRead:>9.2f} ms   size: {_directorySize(csvDirectory) / 1e6:>8.2f} MB')
+        print(f'TraceArchive   write: {1000 * archiveWrite / iterations:>8.2f} ms/trace   read all: {1000 * archiveRead:>9.2f} ms   size: {_directorySize(archive.path) / 1e6:>8.2f} MB   ({matrix.shape[0]} rows)')
+
+def _makeTraceDirectory(directory, receivers=('EMS1',), traces=120, points=10001, date=datetime(2026, 1, 1)):
+    """Writes a day of synthetic trace csvs per receiver in `directory`, in the format saved by saveTrace.
+
+    Returns:
+        int: Amount of csvs written.
+    """
+    rng = np.random.default_rng(0)
+    xdata = np.linspace(0, 10e9, points)
+    for receiver in receivers:
+        for index in range(traces):
+            timestamp = date + timedelta(days=index / traces)
+            header = [('Start Frequency', '0.0'), ('Stop Frequency', str(xdata[-1])), ('Number of Points', str(points)), ('Time', timestamp.astimezone().isoformat())]
+            with open(os.path.join(directory, f'{receiver}-{date.strftime("%Y-%m-%d")}-{index}.csv'), 'x') as f:
+                writeTrace(f, header, xdata, rng.normal(-80, 5, points))
+    return len(receivers) * traces
+
+def benchHeaderScan(iterations=200):
+    """Compares reading the metadata of `iterations` trace csvs with readTraceHeader against building a Trace from each file, as makeWaterfalls did.
+
+    Args:
+        iterations (int, optional): Amount of csvs scanned. Defaults to 200.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        _makeTraceDirectory(directory, traces=iterations)
+        files = [os.path.join(directory, f) for f in getAllCsvFiles(directory)]
+        timer = time.perf_counter()
+        for path in files:
+            trace = Trace(pd.read_csv(path, header=None), os.path.basename(path))
+            float(trace.header.loc['Start Frequency'].item())
+        fullTime = time.perf_counter() - timer
+        timer = time.perf_counter()
+        for path in files:
+            readTraceHeader(path).startFreq
+        headerTime = time.perf_counter() - timer
+        print(f'{len(files)} csvs   Trace: {1000 * fullTime / len(files):>7.2f} ms/file   readTraceHeader: {1000 * headerTime / len(files):>7.3f} ms/file   ({fullTime / headerTime:.0f}x)')
+
+def benchWaterfallGroup(iterations=200):
+    """Measures the time and peak traced memory of stacking a group of `iterations` trace csvs of 10001 points, as _processGroup does before plotting, against
+    keeping a Trace and a Series per csv as makeWaterfalls did.
+
+    Args:
+        iterations (int, optional): Amount of csvs in the group. Defaults to 200.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        _makeTraceDirectory(directory, traces=iterations)
+        os.mkdir(os.path.join(directory, 'out'))
+        key, traces = max(_scanGroups(directory, 'UTC', 0).items(), key=lambda group: len(group[1]))
+        logging.disable(logging.CRITICAL)
+        try:
+            tracemalloc.start()
+            timer = time.perf_counter()
+            parsed = [Trace(pd.read_csv(entry['path'], header=None), entry['filename']) for entry in traces]
+            z = [trace.data.iloc[:, 1].astype(float) for trace in parsed]
+            np.mean(z, axis=0)
+            listTime = time.perf_counter() - timer
+            listPeak = tracemalloc.get_traced_memory()[1]
+            del parsed, z
+            tracemalloc.reset_peak()
+            timer = time.perf_counter()
+            _processGroup(key, traces, os.path.join(directory, 'out'), 'UTC', '.png', 100, moveFlag=False, makeMatpl=False, makePlotly=False, makeAvg=True)
+            matrixTime = time.perf_counter() - timer
+            matrixPeak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            logging.disable(logging.NOTSET)
+        print(f'{len(traces)} csvs of {key[4]:.0f} points, float32 matrix {len(traces) * key[4] * 4 / 1e6:.1f} MB')
+        print(f'Trace list       time: {listTime:>7.2f} s   peak: {listPeak / 1e6:>8.1f} MB')
+        print(f'_processGroup    time: {matrixTime:>7.2f} s   peak: {matrixPeak / 1e6:>8.1f} MB')
+
+def benchCatalogScan(iterations=1000):
+    """Compares grouping a directory of `iterations` trace csvs by reading every header, as _scanGroups does without a catalog, against a TraceCatalog: the first scan
+    indexes every csv, later scans only stat the files and read the headers of the 10 csvs added in between.
+
+    Args:
+        iterations (int, optional): Amount of csvs in the directory. Defaults to 1000.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        traceDirectory = os.path.join(directory, 'traces')
+        os.mkdir(traceDirectory)
+        _makeTraceDirectory(traceDirectory, traces=iterations, points=101)
+        catalog = TraceCatalog(os.path.join(directory, 'catalog.sqlite'))
+        try:
+            timer = time.perf_counter()
+            _scanGroups(traceDirectory, 'UTC', 0)
+            headerTime = time.perf_counter() - timer
+            timer = time.perf_counter()
+            _scanGroups(traceDirectory, 'UTC', 0, catalog=catalog)
+            indexTime = time.perf_counter() - timer
+            _makeTraceDirectory(traceDirectory, receivers=('EMS2',), traces=10, points=101)
+            timer = time.perf_counter()
+            groups = _scanGroups(traceDirectory, 'UTC', 0, catalog=catalog)
+            catalogTime = time.perf_counter() - timer
+        finally:
+            catalog.close()
+        print(f'{sum(len(traces) for traces in groups.values())} csvs   readTraceHeader: {1000 * headerTime:>8.2f} ms   first catalog scan: {1000 * indexTime:>8.2f} ms   '
+              f'catalog scan after 10 new csvs: {1000 * catalogTime:>8.2f} ms   ({headerTime / catalogTime:.0f}x)')
+
+def benchDriftConversion(iterations=200):
+    """Compares converting `iterations` trace csvs of 10001 points to DRIFT format in this process against a pool of one worker process per CPU core, and times
+    a second run over the converted csvs.
+
+    Args:
+        iterations (int, optional): Amount of csvs converted. Defaults to 200.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        traceDirectory = os.path.join(directory, 'traces')
+        os.mkdir(traceDirectory)
+        _makeTraceDirectory(traceDirectory, traces=iterations)
+        size = _directorySize(traceDirectory) / 1e6
+        logging.disable(logging.CRITICAL)
+        try:
+            timings = {}
+            for name, workers in (('serial', 1), (f'{os.cpu_count()} workers', 0)):
+                timer = time.perf_counter()
+                toDriftFormat(traceDirectory, os.path.join(directory, name), maxWorkers=workers)
+                timings[name] = time.perf_counter() - timer
+            timer = time.perf_counter()
+            toDriftFormat(traceDirectory, os.path.join(directory, 'serial'))
+            rerunTime = time.perf_counter() - timer
+        finally:
+            logging.disable(logging.NOTSET)
+        for name, elapsed in timings.items():
+            print(f'{name:<12} {elapsed:>7.2f} s   {iterations / elapsed:>7.1f} files/s   {size / elapsed:>7.2f} MB/s')
+        print(f'rerun        {1000 * rerunTime:>7.2f} ms')
+
+def _spectrumFigure():
+    fig = plt.figure(figsize=(12, 6), dpi=100)
+    ax = fig.add_subplot()
+    ax.autoscale(enable=False, tight=True)
+    ax.set_ylim(-100, 0)
+    return fig, ax
+
+def benchSpectrumDraw(iterations=50):
+    """Compares the frame time of the spectrum plot when the line is removed, re-plotted and the whole canvas drawn, as analyzerDisplayLoop did, against updating
+    the line with set_data and blitting it over the cached background, with and without min/max decimation to the axes width. Rendered with Agg at 1200 x 600 pixels.
+
+    Args:
+        iterations (int, optional): Frames drawn per sweep size. Defaults to 50.
+    """
+    rng = np.random.default_rng(0)
+    for points in (1001, 10001, 40001, 100001):
+        xAxis = np.linspace(1e9, 2e9, points)
+        frames = [rng.normal(-70, 5, points) for _ in range(4)]
+
+        fig, ax = _spectrumFigure()
+        ax.set_xlim(xAxis[0], xAxis[-1])
+        lines = ax.plot(xAxis, frames[0])
+        timer = time.perf_counter()
+        for index in range(iterations):
+            lines.pop(0).remove()
+            lines = ax.plot(xAxis, frames[index % len(frames)])
+            ax.grid(visible=True)
+            fig.canvas.draw()
+        replotTime = time.perf_counter() - timer
+        plt.close(fig)
+
+        fig, ax = _spectrumFigure()
+        ax.set_xlim(xAxis[0], xAxis[-1])
+        ax.grid(visible=True)
+        line, = ax.plot([], [])
+        blitManager = BlitManager(fig.canvas, [line])
+        fig.canvas.draw()
+        timer = time.perf_counter()
+        for index in range(iterations):
+            line.set_data(xAxis, frames[index % len(frames)])
+            blitManager.update()
+        blitTime = time.perf_counter() - timer
+        plt.close(fig)
+
+        fig, ax = _spectrumFigure()
+        ax.set_xlim(xAxis[0], xAxis[-1])
+        ax.grid(visible=True)
+        decimatedLine = DecimatedLine(ax, [], [])
+        blitManager = BlitManager(fig.canvas, [decimatedLine.line])
+        fig.canvas.draw()
+        timer = time.perf_counter()
+        for index in range(iterations):
+            decimatedLine.setData(xAxis, frames[index % len(frames)])
+            blitManager.update()
+        decimatedTime = time.perf_counter() - timer
+        plt.close(fig)
+        print(f'{points:>7} points   re-plot: {1000 * replotTime / iterations:>8.2f} ms/frame   blit: {1000 * blitTime / iterations:>8.2f} ms/frame   '
+              f'decimated blit: {1000 * decimatedTime / iterations:>8.2f} ms/frame')
+
+BENCHMARKS = {
+    'setanalyzervalue': benchSetAnalyzerValue,
+    'tracetransfer': benchTraceTransfer,
+    'sweepwait': benchSweepWait,
+}
+# Benchmarks that do not use an instrument
+OFFLINE_BENCHMARKS = {
+    'tracewriter': benchTraceWriter,
+    'tracestorage': benchTraceStorage,
+    'headerscan': benchHeaderScan,
+    'waterfallgroup': benchWaterfallGroup,
+    'catalogscan': benchCatalogScan,
+    'driftconversion': benchDriftConversion,
+    'spectrumdraw': benchSpectrumDraw,
+}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('benchmark', choices=list(BENCHMARKS) + list(OFFLINE_BENCHMARKS))
+    parser.add_argument('--resource', default=None, help='VISA resource ID of the instrument. Defaults to a simulated analyzer (see simulator.py)')
+    parser.add_argument('--backend', default=None, help="pyvisa backend, e.g. '@py'. Defaults to the default VISA library, or '@py' for the simulated analyzer")
+    parser.add_argument('--latency', type=float, default=0.002, help='Per message latency of the simulated analyzer in seconds. Defaults to 0.002 (GPIB)')
+    parser.add_argument('--bytes-per-second', type=int, default=1000000, help='Response throughput of the simulated analyzer. Defaults to 1000000 (GPIB)')
+    parser.add_argument('--iterations', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.benchmark in OFFLINE_BENCHMARKS:
+        OFFLINE_BENCHMARKS[args.benchmark](iterations=args.iterations)
+        raise SystemExit(RETURN_SUCCESS)
+
+    server = None
+    if args.resource is None:
+        server = SimulatorServer(SimulatedAnalyzer(seed=0), port=0, latency=args.latency, bytesPerSecond=args.bytes_per_second).start()
+        args.resource = server.resourceName
+        args.backend = '@py' if args.backend is None else args.backend
+
+    Vi = VisaIO(args.backend or '')
+    if Vi.connectToRsrc(args.resource) != RETURN_SUCCESS:
+        raise SystemExit(RETURN_ERROR)
+    Vi.openRsrc.read_termination = '\n'
+    Vi.openRsrc.write_termination = '\n'
+    try:
+        BENCHMARKS[args.benchmark](Vi, iterations=args.iterations)
+    finally:
+        Vi.closeSession()
+        if server is not None:
+            logging.info(f'Simulator received {server.analyzer.messages} messages and sent {server.analyzer.queries} responses')
+            server.stop()
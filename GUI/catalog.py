@@ -0,0 +1,279 @@
+"""Persistent index of the trace csvs saved by the Front End, kept in an SQLite database.
+
+Every csv is indexed once with its header values, file size and modification time. Later scans of a directory only stat its files and read the headers of the csvs
+that are new or changed, so the batch jobs do work proportional to the new data rather than to the size of the directory. The catalog also records which csvs were
+converted to DRIFT format, plotted in a waterfall and archived, and answers queries such as "every EMS1 trace covering 1.4 GHz taken last week".
+
+Run `python catalog.py --help` to index directories and search the catalog from the command line.
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import logging
+import argparse
+import threading
+from datetime import datetime, timezone
+
+from tracedata import *
+
+TRACE_STATES = ('drift', 'drift_failed', 'waterfall', 'archived')     # Processing states recorded per trace, see TraceCatalog.mark()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS traces (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    name TEXT NOT NULL,
+    receiver TEXT,
+    time TEXT,
+    start_freq REAL,
+    stop_freq REAL,
+    points INTEGER,
+    rbw REAL,
+    trace_type TEXT,
+    azimuth REAL,
+    elevation REAL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    data_row INTEGER NOT NULL,
+    header TEXT NOT NULL,
+    drift TEXT,
+    drift_failed TEXT,
+    waterfall TEXT,
+    archived TEXT
+);
+CREATE INDEX IF NOT EXISTS traces_directory ON traces (directory);
+CREATE INDEX IF NOT EXISTS traces_receiver_time ON traces (receiver, time);
+"""
+_COLUMNS = ('path', 'directory', 'name', 'receiver', 'time', 'start_freq', 'stop_freq', 'points', 'rbw', 'trace_type', 'azimuth', 'elevation', 'size', 'mtime', 'data_row', 'header')
+
+def _key(path):
+    """Returns the normalized absolute path used as the key of a file in the catalog."""
+    return os.path.normcase(os.path.abspath(path))
+
+def _utc(value):
+    """Returns a datetime or ISO format string as an ISO format string in UTC, so times compare in chronological order. Naive times are kept as they are."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.isoformat()
+
+def _number(values, name, cast=float):
+    try:
+        return cast(float(values[name]))
+    except (KeyError, ValueError, TypeError):
+        return None
+
+class TraceCatalog:
+    def __init__(self, path):
+        """SQLite index of trace csvs. The database is created if it does not exist. One object can be shared by every thread of a process, and several processes
+        (e.g. the GUI and a waterfall.py subprocess) can open the same database.
+
+        Args:
+            path (string): Path to the database file.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            self.connection.execute('PRAGMA journal_mode=WAL')     # Readers do not wait for the trace writers
+            self.connection.executescript(_SCHEMA)
+            # Databases created before a state was added are missing its column
+            columns = {row['name'] for row in self.connection.execute('PRAGMA table_info(traces)')}
+            for state in TRACE_STATES:
+                if state not in columns:
+                    self.connection.execute(f'ALTER TABLE traces ADD COLUMN {state} TEXT')
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def _row(self, path, header, stat):
+        values = header.values
+        try:
+            time = _utc(header.time)
+        except (KeyError, ValueError):
+            time = None
+        name = os.path.basename(path)
+        return (_key(path), os.path.dirname(_key(path)), name, name.split('-')[0], time, _number(values, 'Start Frequency'), _number(values, 'Stop Frequency'),
+                _number(values, 'Number of Points', int), _number(values, 'RBW'), values.get('Trace Type'), _number(values, 'Azimuth'), _number(values, 'Elevation'),
+                stat.st_size, stat.st_mtime, header.dataRow, json.dumps(values))
+
+    def add(self, path, header=None):
+        """Indexes a trace csv, replacing its previous entry and processing states. Called by saveTrace after writing a trace.
+
+        Args:
+            path (string): Path to the trace csv.
+            header (TraceHeader, optional): Header of the trace, read with readTraceHeader if None. Defaults to None.
+        """
+        if header is None:
+            header = readTraceHeader(path)
+        row = self._row(path, header, os.stat(path))
+        with self.lock, self.connection:
+            self.connection.execute(f'INSERT OR REPLACE INTO traces ({", ".join(_COLUMNS)}) VALUES ({", ".join("?" * len(_COLUMNS))})', row)
+
+    def sync(self, directory):
+        """Brings the entries of the csvs in `directory` up to date with the files. Only the headers of csvs that are not indexed or whose size or modification time
+        changed are read, and the entries of csvs that no longer exist are removed. Subdirectories are not scanned.
+
+        Args:
+            directory (string): Directory holding trace csvs.
+
+        Returns:
+            tuple[int, int, list]: Amount of entries added or updated, amount of entries removed, and (path, exception) pairs of the csvs whose header could not be read.
+        """
+        directoryKey = _key(directory)
+        with self.lock:
+            known = {row['path']: (row['size'], row['mtime']) for row in self.connection.execute('SELECT path, size, mtime FROM traces WHERE directory = ?', (directoryKey,))}
+        rows = []
+        failed = []
+        found = set()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.csv') or not entry.is_file():
+                    continue
+                path = os.path.join(directoryKey, os.path.normcase(entry.name))
+                found.add(path)
+                stat = entry.stat()
+                if known.get(path) == (stat.st_size, stat.st_mtime):
+                    continue
+                try:
+                    rows.append(self._row(entry.path, readTraceHeader(entry.path), stat))
+                except Exception as e:
+                    # e.g. a csv still being written, it is read again by the next sync
+                    found.discard(path)
+                    failed.append((entry.path, e))
+        removed = [(path,) for path in known if path not in found]
+        with self.lock, self.connection:
+            self.connection.executemany(f'INSERT OR REPLACE INTO traces ({", ".join(_COLUMNS)}) VALUES ({", ".join("?" * len(_COLUMNS))})', rows)
+            self.connection.executemany('DELETE FROM traces WHERE path = ?', removed)
+        return len(rows), len(removed), failed
+
+    def headers(self, directory):
+        """Returns the csvs of `directory` indexed by the last sync() with their headers, without opening the files.
+
+        Args:
+            directory (string): Directory holding trace csvs.
+
+        Returns:
+            list[tuple[str, TraceHeader]]: (path, header) pairs.
+        """
+        with self.lock:
+            rows = self.connection.execute('SELECT name, data_row, header FROM traces WHERE directory = ?', (_key(directory),)).fetchall()
+        return [(os.path.join(directory, row['name']), TraceHeader(json.loads(row['header']), row['data_row'], row['name'].replace('.csv', ''))) for row in rows]
+
+    def mark(self, paths, state, when=None):
+        """Records that the csvs in `paths` went through a processing step.
+
+        Args:
+            paths (iterable): Paths to indexed trace csvs.
+            state (str): One of TRACE_STATES.
+            when (datetime, optional): Time of the processing step, None for the current time. Defaults to None.
+
+        Raises:
+            ValueError: If `state` is not in TRACE_STATES.
+        """
+        if state not in TRACE_STATES:
+            raise ValueError(f'Unknown trace state {state}, expected one of {TRACE_STATES}')
+        when = _utc(when or datetime.now(timezone.utc))
+        with self.lock, self.connection:
+            self.connection.executemany(f'UPDATE traces SET {state} = ? WHERE path = ?', [(when, _key(path)) for path in paths])
+
+    def move(self, path, newPath):
+        """Updates the entry of a csv moved to `newPath`, keeping its header and processing states."""
+        with self.lock, self.connection:
+            self.connection.execute('DELETE FROM traces WHERE path = ?', (_key(newPath),))
+            self.connection.execute('UPDATE traces SET path = ?, directory = ?, name = ? WHERE path = ?', (_key(newPath), os.path.dirname(_key(newPath)), os.path.basename(newPath), _key(path)))
+
+    def find(self, receiver=None, since=None, until=None, frequency=None, points=None, traceType=None, directory=None, processed=(), unprocessed=(), limit=None):
+        """Searches the catalog. Every argument left as None matches any trace.
+
+        Args:
+            receiver (str, optional): Receiver name, e.g. 'EMS1'. Defaults to None.
+            since (datetime | str, optional): Earliest acquisition time, inclusive. Defaults to None.
+            until (datetime | str, optional): Latest acquisition time, exclusive. Defaults to None.
+            frequency (float, optional): Frequency in Hz between the start and stop frequency of the trace. Defaults to None.
+            points (int, optional): Number of sweep points. Defaults to None.
+            traceType (str, optional): Value of the 'Trace Type' parameter. Defaults to None.
+            directory (string, optional): Directory holding the csvs, subdirectories are not included. Defaults to None.
+            processed (iterable, optional): TRACE_STATES the traces must have gone through. Defaults to ().
+            unprocessed (iterable, optional): TRACE_STATES the traces must not have gone through. Defaults to ().
+            limit (int, optional): Maximum amount of traces returned. Defaults to None.
+
+        Returns:
+            list[dict]: Catalog entries sorted by acquisition time, with the header values decoded into a dictionary.
+        """
+        conditions = []
+        parameters = []
+        for column, operator, value in (('receiver', '=', receiver), ('time', '>=', since), ('time', '<', until), ('start_freq', '<=', frequency), ('stop_freq', '>=', frequency),
+                                        ('points', '=', points), ('trace_type', '=', traceType), ('directory', '=', directory)):
+            if value is None:
+                continue
+            if column == 'time':
+                value = _utc(value)
+            elif column == 'directory':
+                value = _key(value)
+            conditions.append(f'{column} {operator} ?')
+            parameters.append(value)
+        for states, test in ((processed, 'IS NOT NULL'), (unprocessed, 'IS NULL')):
+            for state in states:
+                if state not in TRACE_STATES:
+                    raise ValueError(f'Unknown trace state {state}, expected one of {TRACE_STATES}')
+                conditions.append(f'{state} {test}')
+        query = 'SELECT * FROM traces'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY time, path'
+        if limit is not None:
+            query += ' LIMIT ?'
+            parameters.append(int(limit))
+        with self.lock:
+            rows = self.connection.execute(query, parameters).fetchall()
+        entries = []
+        for row in rows:
+            entry = dict(row)
+            entry['header'] = json.loads(entry['header'])
+            entries.append(entry)
+        return entries
+
+    def statistics(self):
+        """Returns a summary of the catalog for the console."""
+        with self.lock:
+            row = self.connection.execute(f'SELECT COUNT(*), SUM(size), {", ".join(f"COUNT({state})" for state in TRACE_STATES)} FROM traces').fetchone()
+        return f'Trace catalog: {row[0]} traces ({(row[1] or 0) / 1e6:.1f} MB), ' + ', '.join(f'{count} {state}' for state, count in zip(TRACE_STATES, row[2:])) + '.'
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Indexes trace csvs and searches the trace catalog. Prints the paths of the traces found, one per line.')
+    parser.add_argument('catalog', help='Path to the catalog database')
+    parser.add_argument('--sync', nargs='*', default=[], metavar='DIRECTORY', help='Index the csvs in these directories and their subdirectories before searching')
+    parser.add_argument('--receiver')
+    parser.add_argument('--since', help='Earliest acquisition time in ISO format, e.g. 2026-01-01T00:00:00-07:00')
+    parser.add_argument('--until', help='Latest acquisition time in ISO format, exclusive')
+    parser.add_argument('--frequency', type=float, help='Frequency in Hz covered by the traces')
+    parser.add_argument('--points', type=int)
+    parser.add_argument('--processed', nargs='*', default=[], choices=TRACE_STATES)
+    parser.add_argument('--unprocessed', nargs='*', default=[], choices=TRACE_STATES)
+    parser.add_argument('--limit', type=int)
+    parser.add_argument('--stats', action='store_true', help='Print a summary of the catalog instead of searching it')
+    args = parser.parse_args()
+
+    catalog = TraceCatalog(args.catalog)
+    for top in args.sync:
+        for dirpath, dirnames, filenames in os.walk(top):
+            if any(filename.endswith('.csv') for filename in filenames):
+                added, removed, failed = catalog.sync(dirpath)
+                for path, e in failed:
+                    logging.warning(f'Could not index {path}: {type(e).__name__}: {e}')
+                print(f'{dirpath}: {added} indexed, {removed} removed', file=sys.stderr)
+    if args.stats:
+        print(catalog.statistics())
+    else:
+        for entry in catalog.find(receiver=args.receiver, since=args.since, until=args.until, frequency=args.frequency, points=args.points, processed=args.processed,
+                                  unprocessed=args.unprocessed, limit=args.limit):
+            print(entry['path'])
+    catalog.close()
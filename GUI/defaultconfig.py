@@ -18,6 +18,51 @@ config = """
 thread_max_workers = 1
 coalesce = true
 job_max_instances = 1
+# Acquired traces are queued in memory and written to disk by separate threads so slow storage does not delay the next capture.
+write_queue_size = 16
+write_workers = 1
+# Seconds a capture waits for space in a full write queue before the trace is dropped.
+write_queue_timeout = 5.0
+# Storage for automated captures: "csv" (one Keysight-style csv per trace), "archive" (one binary TraceArchive per receiver per day), or "both".
+trace_storage = "csv"
+
+[visa]
+# pyvisa backend, leave empty for the default VISA library (NI-VISA). Use "@py" for pyvisa-py, e.g. to connect to simulator.py at TCPIP0::127.0.0.1::5025::SOCKET
+backend = ""
+
+[waterfall]
+# Worker processes generating waterfall plots of different receivers/days in parallel. 0 uses one per CPU core, 1 runs in the GUI process without workers.
+max_workers = 1
+
+[drift]
+# Worker processes converting trace csvs to DRIFT format in parallel. 0 uses one per CPU core, 1 runs in the GUI process without workers.
+max_workers = 0
+
+[display]
+# Sweeps shown in the live waterfall under the spectrum plot, 0 hides it.
+waterfall_rows = 100
+# Horizontal bins of the live waterfall. Sweeps with more points are reduced to the maximum of each bin so narrow signals stay visible. Memory use is 8 bytes per bin per row.
+waterfall_columns = 1000
+# Matplotlib colormap name of the live waterfall.
+waterfall_colormap = "viridis"
+# Worker threads queue widget updates and plot draws, which the GUI applies every ui_interval milliseconds. Repeated updates of the same widget are merged.
+ui_interval = 20
+# Milliseconds the GUI may spend applying queued updates per interval, the rest are applied in the next interval.
+ui_budget = 10
+
+[console]
+# Lines kept in the console, older lines are deleted. 0 keeps all of them.
+max_lines = 5000
+# Milliseconds between console updates, text logged in between is added at once.
+interval = 100
+# File mirroring the full log, rotated when it reaches log_file_max_bytes with log_file_backups older files kept. Leave empty to disable.
+log_file = ""
+log_file_max_bytes = 10485760
+log_file_backups = 5
+
+[catalog]
+# SQLite index of the saved trace csvs, relative to the GUI directory. Waterfall runs only read the headers of csvs added since the last run. Leave empty to disable.
+path = "trace-catalog.sqlite"
 
 [calibration]
 # Encoder home is the encoder position when the dish is parked (azimuth at true north, elevation straight up).
@@ -0,0 +1,197 @@
+"""Queue of UI updates posted by worker threads and applied by the Tk main loop.
+
+Tk is not thread safe, so threads that poll instruments post the widget changes and canvas draws they need instead of making them, and the main loop applies
+them every `interval` milliseconds. Updates posted with the same key replace each other until they are applied, so a thread posting the same icon state many
+times a second costs one Tk call per drain at most.
+
+Notifier lets the objects whose state the GUI displays announce their changes, so the GUI does not have to poll them.
+
+ConsoleSink replaces the writes of sys.stdout and sys.stderr to the console Text widget. Text written by any thread is buffered and inserted in one Tk call per
+interval, and the widget keeps a bounded amount of lines.
+"""
+
+import logging
+import threading
+import time
+
+class Notifier:
+    def __init__(self):
+        """Base class of objects that call their subscribers when their state changes. Subclasses call notify() after every change the GUI displays."""
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        """Calls callback(self) after every state change, from the thread that made the change. Callbacks should return quickly, e.g. by setting an Event.
+
+        Args:
+            callback (callable): Function taking the notifying object.
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def notify(self):
+        for callback in list(self.subscribers):
+            try:
+                callback(self)
+            except Exception as e:
+                logging.error(f'{type(e).__name__}: {e}')
+
+class UiDispatcher:
+    def __init__(self, root, interval=20, budget=10):
+        """Coalescing queue of UI updates drained by the Tk main loop. See post().
+
+        Args:
+            root (tk.Tk): Root window, its after() method schedules the drains.
+            interval (int, optional): Milliseconds between drains. Defaults to 20.
+            budget (int, optional): Milliseconds a drain may spend applying updates, the remaining updates wait for the next drain. Defaults to 10.
+        """
+        self.root = root
+        self.interval = int(interval)
+        self.budget = budget / 1000
+        self.lock = threading.Lock()
+        self.pending = {}       # Keys mapped to (func, args, kwargs) in the order they were last posted
+        self.running = False
+        self.posted = 0         # Updates posted
+        self.applied = 0        # Updates applied, the difference with posted is the updates that were coalesced or are pending
+
+    def post(self, key, func, *args, **kwargs):
+        """Queues func(*args, **kwargs) to be called by the main loop. A pending update with the same key is replaced, and the update moves to the end of the queue.
+        Can be called from any thread.
+
+        Args:
+            key (hashable): Identifies updates that supersede each other, e.g. (widget, 'text'). None never coalesces.
+            func (callable): Function to call from the main loop.
+            *args: Positional arguments passed to func.
+            **kwargs: Keyword arguments passed to func.
+        """
+        if key is None:
+            key = object()
+        with self.lock:
+            self.pending.pop(key, None)
+            self.pending[key] = (func, args, kwargs)
+            self.posted += 1
+
+    def configure(self, widget, **options):
+        """Queues widget.configure(**options), coalesced with pending configures of the same options of `widget`."""
+        self.post((widget, 'configure', tuple(sorted(options))), widget.configure, **options)
+
+    def start(self):
+        """Starts draining the queue from the Tk main loop."""
+        if not self.running:
+            self.running = True
+            self.root.after(self.interval, self._drain)
+
+    def stop(self):
+        self.running = False
+
+    def statistics(self):
+        """Returns a summary of the dispatcher counters for the console."""
+        with self.lock:
+            pending = len(self.pending)
+            return f'UI dispatcher: {self.posted} updates posted, {self.applied} applied, {self.posted - self.applied - pending} coalesced, {pending} pending.'
+
+    def _drain(self):
+        if not self.running:
+            return
+        deadline = time.perf_counter() + self.budget
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+        updates = iter(pending.items())
+        for key, (func, args, kwargs) in updates:
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                logging.error(f'{type(e).__name__}: {e}')
+            self.applied += 1
+            if time.perf_counter() > deadline:
+                break
+        leftover = dict(updates)
+        if leftover:
+            with self.lock:
+                # Updates posted while draining are newer than the leftover ones with the same key
+                leftover = {key: update for key, update in leftover.items() if key not in self.pending}
+                leftover.update(self.pending)
+                self.pending = leftover
+        self.root.after(self.interval, self._drain)
+
+class ConsoleSink:
+    def __init__(self, root, widget, interval=100, maxLines=5000):
+        """Buffers text written by any thread and appends it to a disabled Text widget from the Tk main loop. Assign write() to sys.stdout.write and
+        sys.stderr.write, then call start().
+
+        Args:
+            root (tk.Tk): Root window, its after() method schedules the flushes.
+            widget (tk.Text): Console widget, kept in the DISABLED state between flushes.
+            interval (int, optional): Milliseconds between flushes. Defaults to 100.
+            maxLines (int, optional): Lines kept in the widget, the oldest lines are deleted first. 0 keeps all of them. Defaults to 5000.
+        """
+        self.root = root
+        self.widget = widget
+        self.interval = int(interval)
+        self.maxLines = max(int(maxLines), 0)
+        self.lock = threading.Lock()
+        self.pending = []       # Strings written since the last flush
+        self.pendingLines = 0   # Newlines in self.pending
+        self.running = False
+        self.dropped = 0        # Lines discarded before reaching the widget because more than maxLines were written between two flushes
+
+    def write(self, text):
+        """Queues text to be appended to the console. Can be called from any thread.
+
+        Args:
+            text (str): Text to append, as passed to sys.stdout.write.
+
+        Returns:
+            int: Amount of characters written.
+        """
+        if not text:
+            return 0
+        with self.lock:
+            self.pending.append(text)
+            self.pendingLines += text.count('\n')
+            if self.maxLines and self.pendingLines > 2 * self.maxLines:
+                # The widget would delete most of these lines right away, keep only the last maxLines
+                lines = ''.join(self.pending).splitlines(keepends=True)
+                self.dropped += len(lines) - self.maxLines
+                self.pending = [''.join(lines[-self.maxLines:])]
+                self.pendingLines = self.pending[0].count('\n')
+        return len(text)
+
+    def start(self):
+        """Starts flushing the buffer from the Tk main loop."""
+        if not self.running:
+            self.running = True
+            self.root.after(self.interval, self._flush)
+
+    def stop(self):
+        self.running = False
+
+    def flush(self):
+        """Appends the buffered text to the widget and deletes the lines over maxLines. Must be called from the Tk main loop."""
+        with self.lock:
+            text = ''.join(self.pending)
+            self.pending = []
+            self.pendingLines = 0
+        if not text:
+            return
+        self.widget.configure(state='normal')
+        self.widget.insert('end', text)
+        if self.maxLines:
+            # Text widgets end with a newline, so the line after the last complete line of text is 'end-1c'
+            excess = int(self.widget.index('end-1c').split('.')[0]) - 1 - self.maxLines
+            if excess > 0:
+                self.widget.delete('1.0', f'{excess + 1}.0')
+        self.widget.yview('moveto', 1)
+        self.widget.configure(state='disabled')
+
+    def _flush(self):
+        if not self.running:
+            return
+        try:
+            self.flush()
+        except Exception:
+            pass    # Logging the error would write to this sink again
+        self.root.after(self.interval, self._flush)
@@ -1,8 +1,18 @@
 import os
-import pandas as pd
+import time
 import logging
+import argparse
+import itertools
+import contextlib
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 
+import loggingsetup
 from tracedata import *
+from catalog import TraceCatalog
+
+DRIFT_MANIFEST_FILE = 'converted.txt'   # Name, size and modification time of the csvs converted by previous runs, one tab separated line per csv
+DRIFT_FAILED_FILE = 'failed.txt'        # Same for the csvs that could not be converted, they are tried again once their size or modification time changes
 
 def makeDriftDir(path):
     """Checks if a folder called `DRIFT` exists in `path`, creates it if it does not exist.
@@ -51,44 +61,163 @@ def makeDir(path, logfileexistserror = False):
         return None
     return path
 
-def toDriftFormat(tracePath, driftPath):
-    """Converts the trace csv files in `tracePath` to DRIFT compatible format and writes them in `driftPath`
+def _readDriftManifest(driftPath, fileName=DRIFT_MANIFEST_FILE):
+    """Returns the names of the trace csvs converted by previous runs mapped to their (size, modification time in nanoseconds) when they were converted, or
+    attempted if `fileName` is DRIFT_FAILED_FILE."""
+    manifest = {}
+    try:
+        with open(os.path.join(driftPath, fileName), 'r') as f:
+            for line in f:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) == 3 and fields[1].isdigit() and fields[2].isdigit():
+                    manifest[fields[0]] = (int(fields[1]), int(fields[2]))
+    except FileNotFoundError:
+        pass
+    return manifest
+
+def _writeDriftManifest(driftPath, manifest, fileName=DRIFT_MANIFEST_FILE):
+    path = os.path.join(driftPath, fileName)
+    with open(path + '.tmp', 'w') as f:
+        f.writelines(f'{name}\t{size}\t{mtime}\n' for name, (size, mtime) in sorted(manifest.items(), key=lambda item: natural_sort_key(item[0])))
+    os.replace(path + '.tmp', path)
+
+def _convertTrace(path, header, driftPath):
+    """Writes the DRIFT csv of one trace csv in `driftPath` unless it already exists. Runs in a worker process in process pool mode, exceptions are returned
+    instead of raised so one bad csv does not stop the others.
+
+    Args:
+        path (string): Path to the trace csv.
+        header (TraceHeader): Header of the trace, read from the csv if None.
+        driftPath (string): File path to write the DRIFT csv in.
+
+    Returns:
+        tuple: (path, scan name of the DRIFT csv written or None if it already existed, size of the trace csv in bytes, exception raised or None).
+    """
+    try:
+        if header is None:
+            header = readTraceHeader(path)
+        driftName = Trace.Drift.scanName(header.name, header.time)
+        driftFile = os.path.join(driftPath, driftName + '.csv')
+        if os.path.isfile(driftFile):
+            return path, None, 0, None
+        trace = Trace(pd.read_csv(path, header=None), os.path.basename(path))
+        trace.generateDriftData().to_csv(driftFile, index=False)
+        return path, driftName, os.path.getsize(path), None
+    except Exception as e:
+        return path, None, 0, e
+
+def toDriftFormat(tracePath, driftPath, catalogPath=None, maxWorkers=1, progress=None):
+    """Converts the trace csv files in `tracePath` that were not converted by a previous run to DRIFT compatible format and writes them in `driftPath`
+
+    Converted csvs are recorded with their size and modification time in a manifest in `driftPath`, or in the trace catalog if `catalogPath` is given, and later
+    runs skip them without opening them. A csv that changed since it was converted is converted again. Csvs that could not be converted, e.g. DFS traces, are
+    recorded the same way and skipped until they change. Csvs converted before the manifest existed are recognised by
+    their DRIFT csv, whose name is found from the trace header without parsing the data.
 
     Args:
         tracePath (string): File path to search for trace csv's
         driftPath (string): File path to write DRIFT compatible csv's in
+        catalogPath (string, optional): Trace catalog database (see catalog.py) to record the converted csvs in instead of the manifest. Defaults to None.
+        maxWorkers (int, optional): Amount of worker processes converting csvs in parallel, 0 for one per CPU core. Defaults to 1 (no worker processes).
+        progress (callable, optional): Called after every csv with (csvs done, csvs to do, csvs converted, bytes converted, seconds elapsed). Defaults to None.
     """
-    tracesToProcess = []
-    makeDir(driftPath)
-    # import data
-    trace_files = getAllCsvFiles(tracePath)
-    drift_files = getAllCsvFiles(driftPath)
-
-    # process all csvs
-    for file_name in trace_files:
-        # Generate dataframe from csv
-        file_path = os.path.join(tracePath, file_name)
-        df = pd.read_csv(file_path, header=None)
-        trace = Trace(df, file_name)
-        # Does the csv have a drift compatible counterpart?
-        try:
-            trace.generateDriftData()
-        except:
-            continue
-        drift_trace_path = os.path.join(driftPath, trace.drift.scan_name + '.csv')
-        if os.path.isfile(drift_trace_path):
-            continue
-        # keep track of traces that need drift processing
+    if makeDir(driftPath) is None:
+        return
+    catalog = TraceCatalog(catalogPath) if catalogPath else None
+    try:
+        # (path, header) of the csvs to convert, header is None when it has not been read yet
+        if catalog is not None:
+            catalog.sync(tracePath)
+            done = {entry['name'] for entry in catalog.find(directory=tracePath, processed=['drift'])}
+            done.update(entry['name'] for entry in catalog.find(directory=tracePath, processed=['drift_failed']))
+            pending = sorted(((path, header) for path, header in catalog.headers(tracePath) if os.path.basename(path) not in done), key=lambda item: natural_sort_key(item[0]))
         else:
-            tracesToProcess.append(trace)
+            manifest = _readDriftManifest(driftPath)
+            failedManifest = _readDriftManifest(driftPath, DRIFT_FAILED_FILE)
+            stats = {}
+            with os.scandir(tracePath) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.csv') and entry.is_file():
+                        stat = entry.stat()
+                        stats[entry.name] = (stat.st_size, stat.st_mtime_ns)
+            pending = [(os.path.join(tracePath, name), None) for name in sorted(stats, key=natural_sort_key) if stats[name] not in (manifest.get(name), failedManifest.get(name))]
 
-    if not tracesToProcess:
-        logging.drift('No traces to process.')
-        return
+        if not pending:
+            logging.drift('No traces to process.')
+            if progress is not None:
+                progress(0, 0, 0, 0, 0.0)
+            return
+
+        if maxWorkers == 0:
+            maxWorkers = os.cpu_count() or 1
+        maxWorkers = min(maxWorkers, len(pending))
+        converted = []      # Paths of the pending csvs that have a DRIFT csv after this run
+        written = 0
+        writtenBytes = 0
+        failed = []         # Paths of the pending csvs that could not be converted
+        timer = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            paths, headers = zip(*pending)
+            if maxWorkers <= 1:
+                results = map(_convertTrace, paths, headers, itertools.repeat(driftPath))
+            else:
+                logging.drift(f'Converting {len(pending)} traces with {maxWorkers} worker processes.')
+                executor = stack.enter_context(ProcessPoolExecutor(max_workers=maxWorkers))
+                # Send the csvs in chunks to limit the inter-process traffic, small enough to keep every worker busy until the end
+                results = executor.map(_convertTrace, paths, headers, itertools.repeat(driftPath, len(paths)), chunksize=max(1, min(32, len(paths) // (4 * maxWorkers))))
+            for index, (path, driftName, size, error) in enumerate(results, 1):
+                if error is not None:
+                    # e.g. csvs without a time, not named RECEIVER-YYYY-MM-DD-#.csv or of a DFS receiver, they are tried again once they change
+                    logging.warning(f'Could not convert {os.path.basename(path)} to DRIFT format: {type(error).__name__}: {error}')
+                    failed.append(path)
+                else:
+                    converted.append(path)
+                    if driftName is not None:
+                        written += 1
+                        writtenBytes += size
+                        logging.drift(f'File {driftName} successfully saved to {driftPath}')
+                if progress is not None:
+                    progress(index, len(pending), written, writtenBytes, time.perf_counter() - timer)
+        elapsed = max(time.perf_counter() - timer, 1e-6)
+
+        if catalog is not None:
+            catalog.mark(converted, 'drift')
+            catalog.mark(failed, 'drift_failed')
+        else:
+            # Forget csvs that were moved or deleted so the manifest only grows with the contents of `tracePath`
+            manifest = {name: value for name, value in manifest.items() if name in stats}
+            manifest.update((os.path.basename(path), stats[os.path.basename(path)]) for path in converted)
+            _writeDriftManifest(driftPath, manifest)
+            failedManifest = {name: value for name, value in failedManifest.items() if name in stats and name not in manifest}
+            failedManifest.update((os.path.basename(path), stats[os.path.basename(path)]) for path in failed)
+            _writeDriftManifest(driftPath, failedManifest, DRIFT_FAILED_FILE)
+        logging.drift(f'{written} traces ({writtenBytes / 1e6:.1f} MB) converted to DRIFT format in {elapsed:.1f} s ({written / elapsed:.1f} files/s, '
+                      f'{writtenBytes / 1e6 / elapsed:.2f} MB/s), {len(converted) - written} already converted, {len(failed)} could not be converted.')
+    finally:
+        if catalog is not None:
+            catalog.close()
+
+PROGRESS_PREFIX = 'PROGRESS'    # First field of the progress lines written by the command line interface with --relay
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Converts the trace csvs not converted by a previous run to DRIFT format.')
+    parser.add_argument('tracePath', help='Directory to search for trace csvs')
+    parser.add_argument('driftPath', help='Directory to write DRIFT csvs in')
+    parser.add_argument('--workers', type=int, default=0, help='Worker processes, 0 for one per CPU core. Defaults to 0')
+    parser.add_argument('--catalog', default=None, help='Trace catalog database recording the converted csvs instead of the manifest in driftPath')
+    parser.add_argument('--relay', action='store_true', help='Write log records to stdout as "<level number>\\t<message>" lines, and progress as '
+                        f'"{PROGRESS_PREFIX}\\t<done>\\t<total>\\t<converted>\\t<bytes>\\t<seconds>" lines at most 10 times a second')
+    args = parser.parse_args()
+
+    _lastProgress = 0.0
+    def _relayProgress(done, total, written, writtenBytes, elapsed):
+        global _lastProgress
+        if done == total or elapsed - _lastProgress >= 0.1:
+            _lastProgress = elapsed
+            print(f'{PROGRESS_PREFIX}\t{done}\t{total}\t{written}\t{writtenBytes}\t{elapsed:.3f}', flush=True)
 
-    # make drift formatted csv and write one in the drift directory
-    for trace in tracesToProcess:
-        df = trace.generateDriftData()
-        file_path = os.path.join(driftPath, trace.drift.scan_name + '.csv')
-        df.to_csv(file_path, index=False)
-        logging.drift(f'File {trace.drift.scan_name} successfully saved to {driftPath}')
\ No newline at end of file
+    progress = None
+    if args.relay:
+        loggingsetup.relayLogToStdout()
+        progress = _relayProgress
+    toDriftFormat(args.tracePath, args.driftPath, catalogPath=args.catalog, maxWorkers=args.workers, progress=progress)
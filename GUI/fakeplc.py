@@ -0,0 +1,177 @@
+"""Simulated P1AM-100 PLC for testing the Python Front End without the RF chain hardware.
+
+The fake PLC opens a pseudo-terminal and emulates the firmware in `P1AM-100 PLC/src/main.cpp` on it: opcodes are read `PLC_FRAME_LENGTH` bytes at a time
+with the one second Serial timeout of the firmware, replies are printed as lines, and a status frame `STATUS <opcode> <status> <24V check>` is sent after every
+opcode but QUERY_STATUS and, with the opcode PLC_NO_OPCODE, whenever the simulated 24V check changes. Open the printed device with SerialIO.openSerial, e.g.
+
+    python fakeplc.py --legacy
+
+--legacy emulates the firmware from before status frames, which only reports its status in answer to QUERY_STATUS. Pseudo-terminals are only available on
+POSIX systems.
+"""
+
+import argparse
+import logging
+import os
+import select
+import threading
+import time
+
+from loggingsetup import *
+from opcodes import opcodes
+from frontendio import PLC_FRAME_LENGTH, PLC_NO_OPCODE, PLC_STATUS_FRAME
+
+FIRMWARE_VERSION = 'SIMULATED'
+READ_TIMEOUT = 1.0          # Serial.setTimeout default of the firmware, in seconds
+OUTPUT_CHAINS = {           # Chain selection opcodes and the replies of the firmware
+    opcodes.EMS_CHAIN1.value: 'EMS Chain 1 selected: writing to channels 1 and 9.',
+    opcodes.EMS_SELECT.value | 0b00000001: 'EMS Chain 2 selected: writing to channels 2 and 9.',
+    opcodes.DFS_CHAIN1.value: 'DFS Chain 1 selected: writing to channels 1 and 10.',
+}
+
+class FakePLC:
+    def __init__(self, pushStatus=True, latency=0.0):
+        """Emulates the P1AM-100 firmware on a pseudo-terminal, see the module docstring.
+
+        Args:
+            pushStatus (bool, optional): Send status frames. False emulates the firmware from before status frames. Defaults to True.
+            latency (float, optional): Delay in seconds before each opcode is handled. Defaults to 0.0.
+        """
+        self.pushStatus = pushStatus
+        self.latency = latency
+        self.status = 0
+        self.supply24V = 0
+        self.returnOpCodes = False
+        self.baseEnabled = True
+        self.received = []          # Opcodes handled, in order
+        self.lock = threading.Lock()
+        self.master, self.slave = os.openpty()
+        self.running = False
+        self.thread = None
+
+    @property
+    def port(self):
+        """Device path of the pseudo-terminal to pass to SerialIO.openSerial."""
+        return os.ttyname(self.slave)
+
+    def start(self):
+        """Handles opcodes in a daemon thread.
+
+        Returns:
+            FakePLC: self
+        """
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        logging.info(f'Fake PLC: Listening on {self.port}')
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(2 * READ_TIMEOUT)
+        os.close(self.master)
+        os.close(self.slave)
+
+    def set24V(self, value):
+        """Changes the simulated 24V check of the output module, which sends a status frame like the firmware does when its periodic check changes."""
+        with self.lock:
+            changed = value != self.supply24V
+            self.supply24V = value
+            if changed:
+                self._sendStatusFrame()
+
+    def _println(self, line):
+        os.write(self.master, f'{line}\r\n'.encode('utf-8'))
+
+    def _sendStatusFrame(self, opCode=PLC_NO_OPCODE):
+        if self.pushStatus:
+            self._println(f'{PLC_STATUS_FRAME} {opCode} {self.status} {self.supply24V}')
+
+    def _readOpCode(self):
+        # Serial.readBytes(buffer, BUFFER_LENGTH): returns once the buffer is full or no byte arrived for READ_TIMEOUT seconds
+        buffer = b''
+        while len(buffer) < PLC_FRAME_LENGTH:
+            ready, _, _ = select.select([self.master], [], [], READ_TIMEOUT if buffer else 0.1)
+            if not ready:
+                if buffer or not self.running:
+                    break
+                continue
+            buffer += os.read(self.master, PLC_FRAME_LENGTH - len(buffer))
+        return buffer
+
+    def _run(self):
+        while self.running:
+            try:
+                buffer = self._readOpCode()
+            except OSError:
+                break
+            if not buffer:
+                continue
+            line = buffer.split(b'\n')[0].strip()
+            if b'\n' not in buffer or len(line) < 1:
+                self._println('Too many characters in buffer or buffer empty.')
+                continue
+            try:
+                opCode = int(line, 2)
+            except ValueError:
+                self._println('No binary integer found')
+                continue
+            if self.latency:
+                time.sleep(self.latency)
+            with self.lock:
+                self.received.append(opCode)
+                self._handleOpCode(opCode)
+                if opCode != opcodes.QUERY_STATUS.value:
+                    self._sendStatusFrame(opCode)
+
+    def _handleOpCode(self, opCode):
+        if self.returnOpCodes and opCode != opcodes.QUERY_STATUS.value:
+            self._println(f'OpCode: 0x{opCode:02X} ({opCode})')
+        opCode |= self.status & opcodes.WLIGHT_ON.value
+        masked = opCode & opcodes.WLIGHT_CLR.value
+        match masked:
+            case opcodes.SLEEP.value:
+                self._println('Sleep issued: all outputs disabled.')
+                self.status = opCode
+            case opcodes.WLIGHT_TOGGLE.value:
+                self._println('WLIGHT OFF' if self.status & opcodes.WLIGHT_ON.value else 'WLIGHT ON')
+                self.status ^= opcodes.WLIGHT_ON.value
+            case opcodes.RETURN_OPCODES.value:
+                self.returnOpCodes = not self.returnOpCodes
+                self._println('Parsed OpCodes will be returned.' if self.returnOpCodes else 'OpCode returns disabled.')
+            case opcodes.GET_FW_VERSION.value:
+                self._println(FIRMWARE_VERSION)
+            case opcodes.IS_BASE_ACTIVE.value:
+                self._println(f'BASE {int(self.baseEnabled)}')
+            case opcodes.CHECK_24V_SL1.value | opcodes.CHECK_24V_SL2.value | opcodes.CHECK_24V_SL3.value:
+                slot = {opcodes.CHECK_24V_SL1.value: 1, opcodes.CHECK_24V_SL2.value: 2, opcodes.CHECK_24V_SL3.value: 3}[masked]
+                self._println(f'24V {slot} {self.supply24V}')
+            case opcodes.P1_INIT.value:
+                self._println('Initializing...')
+                self.baseEnabled = True
+                self.status = opcodes.SLEEP.value
+            case opcodes.P1_DISABLE.value:
+                self._println('Disabling P1AM-100 Module')
+                self.baseEnabled = False
+                self.status = opCode
+            case opcodes.QUERY_STATUS.value:
+                self._println(self.status)
+            case _ if masked in OUTPUT_CHAINS:
+                self._println(OUTPUT_CHAINS[masked])
+                self.status = opCode
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Simulated P1AM-100 PLC on a pseudo-terminal.')
+    parser.add_argument('--legacy', action='store_true', help='Do not send status frames, like the firmware before they were added')
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay in seconds before each opcode is handled')
+    args = parser.parse_args()
+
+    plc = FakePLC(pushStatus=not args.legacy, latency=args.latency).start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        plc.stop()
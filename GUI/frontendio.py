@@ -4,7 +4,12 @@
 # MISC LIBRARIES
 import sys
 import logging
+import contextlib
+import re
+import queue
+from concurrent.futures import Future
 from opcodes import *
+from dispatcher import Notifier
 import threading
 
 # TKINTER
@@ -24,12 +29,129 @@ from timestamp import *
 import pyvisa as visa
 from pyvisa import constants
 
+# NUMPY
+import numpy as np
+
 # CONSTANTS
 RETURN_ERROR = 1
 RETURN_SUCCESS = 0
+FORMAT_ASCII = 'ASC'        # Trace data format arguments for :FORM
+FORMAT_REAL32 = 'REAL,32'
+FORMAT_REAL64 = 'REAL,64'
+TRACE_FORMATS = (FORMAT_ASCII, FORMAT_REAL32, FORMAT_REAL64)
+INTERLEAVED_TRACE_QUERY = ':SAN?'   # Suffix of the trace queries returning interleaved x frequencies and y values (:READ:SAN?, :FETCH:SAN?)
+ESR_OPC = 0b00000001        # Operation Complete bit of the Standard Event Status Register
+STB_ESB = 0b00100000        # Event Status Bit of the Status Byte, summarizes the enabled bits of the Standard Event Status Register
+MOTOR_PROMPT = r'P\d+>'     # Command prompt of the motor controller (program number), printed without a newline after every command
+PLC_FRAME_LENGTH = 10       # Bytes the PLC reads per opcode (BUFFER_LENGTH in its firmware), it waits up to a second for shorter messages
+PLC_STATUS_FRAME = 'STATUS' # First word of the status frames 'STATUS <opcode> <status> <24V check>' the PLC firmware sends after every opcode and when its 24V check changes
+PLC_NO_OPCODE = -1          # Opcode of the status frames sent because the 24V check changed, which do not acknowledge a command
+
+class SerialReader:
+    def __init__(self, port, onFrame=None, prompt=None):
+        """Thread that reads an open serial port and splits what it receives into frames: lines without their line ending, and command prompts, which are not
+        followed by a newline. Every frame is passed to onFrame and then to the callers waiting in transact(), as soon as it arrives and without polling.
+
+        Args:
+            port (serial.Serial): Open serial port. Nothing else should read from it while the reader runs.
+            onFrame (callable, optional): Called with every frame (str) from the reader thread. Defaults to None.
+            prompt (str, optional): Regular expression matching a whole command prompt, e.g. MOTOR_PROMPT. Defaults to None (lines only).
+        """
+        self.port = port
+        self.onFrame = onFrame
+        self.prompt = re.compile(prompt) if prompt else None
+        self.lock = threading.Lock()                # Protects self.waiters
+        self.transactionLock = threading.Lock()     # One transaction at a time so responses are not mixed up
+        self.waiters = []                           # (complete, frames, future) of the pending transactions
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stops the reader thread, interrupting a read in progress if the platform allows it. The port is left open."""
+        self.running = False
+        with contextlib.suppress(Exception):
+            self.port.cancel_read()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+    def isRunning(self):
+        return self.running and self.thread is not None and self.thread.is_alive()
+
+    def transact(self, send, complete, timeout):
+        """Calls send(), e.g. to write a command, and waits for the frames received until complete(frames) returns True.
+
+        Args:
+            send (callable): Called without arguments once the caller is registered to receive frames.
+            complete (callable): Called with the list of frames received so far after each frame, returns True when the response is complete.
+            timeout (float): Seconds to wait for a complete response.
+
+        Raises:
+            TimeoutError: If the response is not complete after 'timeout' seconds.
+
+        Returns:
+            list[str]: Frames received from send() until the response was complete.
+        """
+        future = Future()
+        waiter = (complete, [], future)
+        with self.transactionLock:
+            with self.lock:
+                self.waiters.append(waiter)
+            try:
+                send()
+                return future.result(timeout)
+            except TimeoutError:
+                raise TimeoutError(f'Timeout expired after {timeout} s, received: {waiter[1]}') from None
+            finally:
+                with self.lock:
+                    self.waiters.remove(waiter)
 
-class MotorIO: 
+    def _dispatch(self, frame):
+        # onFrame first, so the state it updates is current when the waiters resume
+        if self.onFrame is not None:
+            try:
+                self.onFrame(frame)
+            except Exception as e:
+                logging.error(f'{type(e).__name__}: {e}')
+        with self.lock:
+            waiters = list(self.waiters)
+        for complete, frames, future in waiters:
+            if future.done():
+                continue
+            frames.append(frame)
+            try:
+                if complete(frames):
+                    future.set_result(frames)
+            except Exception as e:
+                future.set_exception(e)
+
+    def _run(self):
+        buffer = b''
+        while self.running:
+            try:
+                data = self.port.read(max(self.port.in_waiting, 1))     # Blocks until data arrives or the port timeout expires
+            except Exception:
+                break       # Port closed
+            if not data:
+                continue
+            *lines, buffer = (buffer + data).split(b'\n')
+            for line in lines:
+                self._dispatch(line.rstrip(b'\r').decode('utf-8', errors='replace'))
+            if self.prompt is not None and buffer:
+                partial = buffer.decode('utf-8', errors='replace').strip()
+                if self.prompt.fullmatch(partial):
+                    buffer = b''
+                    self._dispatch(partial)
+        self.running = False
+
+class MotorIO(Notifier):
     def __init__(self, Azimuth, Elevation, userAzi = 0, userEle = 0, Azi_bound = [0,360], Ele_bound = [-90,10] ): 
+        Notifier.__init__(self)
         self.Azimuth    = Azimuth
         self.Elevation  = Elevation
         self.userAzi    = userAzi
@@ -40,6 +162,7 @@ class MotorIO:
         self.homeEle    = 0
         self.port       = ''
         self.ser        = serial.Serial()
+        self.reader     = None          # SerialReader of the port opened by openSerial
         self.OpenSerial()
 
         # THREADING LOCK
@@ -76,8 +199,28 @@ class MotorIO:
             self.errorPopup()
 
 
+    def sendAndRead( self, command ):
+        """Sends a command and logs the response of the controller. While the reader thread of openSerial owns the port, nothing else may read from it, so the
+        command is sent with query() and its response is logged as soon as the prompt arrives. Otherwise the command is sent with sendCommand and read with readLine.
+
+        Returns:
+            string: Response of the controller, or None if it was read with readLine or did not arrive.
+        """
+        if self.reader is None or not self.reader.isRunning():
+            self.sendCommand( command )
+            self.readLine()
+            return None
+        try:
+            return self.query( command, log=True )
+        except Exception as e:
+            logging.error(f'{type(e).__name__}: {e}')
+            self.errorType = self.connectionError[0]
+            self.errorMsg = self.connectionError[1]
+            self.errorPopup()
+            return None
+
     def readLine( self ):
-        """Serial Commmunication, read until End Of Line charactor
+        """Serial Commmunication, read until End Of Line charactor. Only used while the reader thread is stopped, see sendAndRead().
         """
         try:
             while( self.ser.in_waiting > 0):
@@ -137,8 +280,7 @@ class MotorIO:
         if isInRange:
             commandToSend = self.commandGen + " x " + self.userAzi + " y " + self.userEle 
             logging.info("Raange Check cleared")
-            self.sendCommand( commandToSend )
-            self.readLine()
+            self.sendAndRead( commandToSend )
             self.Azimuth = self.userAzi
             self.Elevation = self.userEle
         else: 
@@ -174,32 +316,41 @@ class MotorIO:
                  self.errorType = self.connectionError[0]
                  self.errorMsg = self.connectionError[1]
                  self.errorPopup()
+            self.notify()
 
 
     def CloseSerial( self ):        
-        self.sendCommand( 'drive off x y' )
-        self.readLine()
+        self.sendAndRead( 'drive off x y' )
+        if self.reader is not None:
+            self.reader.stop()
         self.ser.close()
+        self.notify()
 
 
     def EmargencyStop( self ):
-        self.sendCommand( "jog off x y" )
-        self.readLine()
+        self.sendAndRead( "jog off x y" )
 
 
     def Park( self ):
-        self.sendCommand( "jog abs" + " x " + str( self.homeAzi ) + " y " + str( self.homeEle ) )
-        self.readLine()
+        self.sendAndRead( "jog abs" + " x " + str( self.homeAzi ) + " y " + str( self.homeEle ) )
 
 
     def freeInput( self ):
         def ReadandSend():
 
             line = inBox.get()
+            if self.reader is not None and self.reader.isRunning():
+                # The reader thread owns the port, show the response it received instead of reading the port here
+                response = self.sendAndRead( line )
+                if response:
+                    self.returnLineBox.config(text = response )
+                return
             self.sendCommand( line )
             update_text()
         
         def update_text(): 
+            if self.reader is not None and self.reader.isRunning():
+                return
             try:
                 with self.serialLock:
                     line = self.ser.readline()
@@ -255,14 +406,24 @@ class MotorIO:
             baud (int, optional): Baud rate. Defaults to 9600.
             timeout (float, optional): Timeout in seconds. Defaults to 1.
         """
-        with self.serialLock:
-            if self.ser.is_open:
-                self.ser.close()
-            self.ser = serial.Serial(port, baud, timeout=timeout)
+        try:
+            with self.serialLock:
+                if self.reader is not None:
+                    self.reader.stop()
+                if self.ser.is_open:
+                    self.ser.close()
+                self.ser = serial.Serial(port, baud, timeout=timeout)
+                self.reader = SerialReader(self.ser, prompt=MOTOR_PROMPT)
+                self.reader.start()
+        finally:
+            self.notify()
 
     def closeSerial(self):
         with self.serialLock:
+            if self.reader is not None:
+                self.reader.stop()
             self.ser.close()
+        self.notify()
 
     def write(self, msg, log=False):
         """Write a message to the serial object and append it with a CRLF if not present.
@@ -296,7 +457,8 @@ class MotorIO:
         return buffer
 
     def query(self, msg, timeout=5.0, log=False):
-        """Writes a message to the serial object at self.ser and awaits a response.
+        """Writes a message to the serial object at self.ser and waits for the response, which ends with the command prompt of the controller (e.g. 'P00>'). The
+        response is returned as soon as the prompt arrives.
 
         Args:
             msg (string): Message to send to the output buffer, will be converted to string.
@@ -304,21 +466,58 @@ class MotorIO:
             log (bool, optional): Passed to write/read calls. Determines whether or not to log at level MOTOR.
 
         Raises:
-            TimeoutError: If read does not return a value after 'timeout' seconds.
+            TimeoutError: If the prompt is not received after 'timeout' seconds.
+            serial.PortNotOpenError: If the port was not opened with openSerial.
 
         Returns:
-            string: Response from the serial object decoded in utf-8
+            string: Lines of the response, starting with the echoed command and ending with the prompt.
         """
-        self.write(msg, log=log)
-        time.sleep(0.1)
+        if self.reader is None or not self.reader.isRunning():
+            raise serial.PortNotOpenError()
+        command = str(msg).strip()
+        prompt = self.reader.prompt
+
+        def complete(frames):
+            # A prompt from an earlier command may arrive first, the response ends with the first prompt after the echo of this command
+            echoed = next((i for i, frame in enumerate(frames) if command in frame), None)
+            return echoed is not None and any(prompt.fullmatch(frame) for frame in frames[echoed + 1:])
+
+        frames = self.reader.transact(lambda: self.write(msg, log=log), complete, timeout)
+        echoed = next(i for i, frame in enumerate(frames) if command in frame)
+        response = '\n'.join(frames[echoed:])
+        if log:
+            logging.motor(response)
+        return response
+
+    def queryPrint(self, items, timeout=2.0, log=False):
+        """Reads several parameters and bits of the motor controller with one PRINT command, e.g. queryPrint(('BIT8465', 'P6144')) sends 'PRINT BIT8465, P6144'.
+
+        Args:
+            items (iterable of str): Parameter and bit names to print.
+            timeout (float, optional): Amount of time in seconds to wait for the response. Defaults to 2.0.
+            log (bool, optional): Determines whether or not to log the command and response at level MOTOR.
+
+        Raises:
+            TimeoutError: If the response is not received after 'timeout' seconds.
+            ValueError: If the response does not contain one integer per item.
+
+        Returns:
+            list[int]: Values of the items in the same order. Bits are 0 or nonzero.
+        """
+        items = list(items)
+        command = 'PRINT ' + ', '.join(items)
+        response = self.query(command, timeout=timeout, log=log)
+
+        # The response echoes the command, prints the values separated by tabs, possibly over several lines, and ends with the prompt
+        values = []
+        for line in response.splitlines():
+            if 'PRINT' in line or self.reader.prompt.fullmatch(line):
+                continue
+            values.extend(line.replace(',', ' ').split())
+        if len(values) != len(items):
+            raise ValueError(f'{command} expected {len(items)} values and returned {len(values)}: {values}')
+        return [int(value) for value in values]
 
-        timer = time.time()
-        while time.time() - timer < timeout:
-            buffer = self.read(log=log)
-            if buffer:
-                return buffer
-        raise TimeoutError('Timeout expired before motor query response.')
-    
     def flushInput(self):
         """Flush the input buffer, discarding all its contents.
         """
@@ -332,14 +531,22 @@ class MotorIO:
         with self.serialLock:
             self.ser.reset_output_buffer()
     
-class SerialIO:
+class SerialIO(Notifier):
     def __init__(self):
         """Contains methods for serial communication, this class contains its own threading lock on IO methods. The attribute 'serial' can be used to directly manipulate the instance of serial.Serial().
+        Subscribers are notified when the port is opened or closed and when the PLC reports a new status.
         """
+        Notifier.__init__(self)
         self.serial = serial.Serial()
         self.serialLock = threading.RLock()
-        self.TIMEOUT = 5.0                        # Default timeout between read and write commands in query call.
+        self.TIMEOUT = 5.0                        # Default time to wait for the status of the PLC after a command in query call.
         self.status = 0                           # Status message returned from the PLC which is used to synchronize front end buttons
+        self.reader = None                        # SerialReader of the port opened by openSerial, logs messages and updates self.status as they arrive
+        self.supply24V = None                     # 24V check of the output module in the last status frame, None if the firmware does not send status frames
+        self.pushesStatus = False                 # Set when the first status frame is received, commands then complete on the frame acknowledging them without querying the status
+        self.commands = queue.Queue()             # Commands submitted to the PLC, sent one at a time in order by commandThread
+        self.commandThread = threading.Thread(target=self._commandWorker, name='PLC commands', daemon=True)
+        self.commandThread.start()
 
     def threadHandler(self, target, args=(), kwargs={}):
         """Generates a new thread to handle IO routines without blocking main thread. For most operations, this should be used instead of calling target methods directly.
@@ -365,53 +572,120 @@ class SerialIO:
         """
         if timeout is None:
             timeout = self.TIMEOUT
-        with self.serialLock:
-            if self.serial.is_open:
-                self.serial.close()
-            self.serial = serial.Serial(port, baud, timeout=timeout)
+        try:
+            with self.serialLock:
+                if self.reader is not None:
+                    self.reader.stop()
+                if self.serial.is_open:
+                    self.serial.close()
+                self.serial = serial.Serial(port, baud, timeout=timeout)
+                self.pushesStatus = False       # The PLC on the new port may run older firmware
+                self.supply24V = None
+                self.reader = SerialReader(self.serial, onFrame=self.parseLine)
+                self.reader.start()
+        finally:
+            self.notify()
 
     def close(self):
         """Closes serial communications.
         """
         with self.serialLock:
+            if self.reader is not None:
+                self.reader.stop()
             self.serial.close()
+        self.notify()
+
+    def submit(self, msg, converter='bin', delay=None, queryStatus=True):
+        """Queues a command for the PLC and returns immediately. Commands are sent one at a time in the order they were submitted: the message is written, then
+        opcodes.QUERY_STATUS, and the command completes as soon as the PLC reports its status. Once the PLC is known to send status frames, an opcode instead
+        completes on the frame that echoes it. The reply lines of the PLC are logged at level SERIAL as they arrive.
+
+        Args:
+            msg (string or int): Message to send, see write(). None only queries the status.
+            converter (str, optional): Format to convert the message to if it is an integer. Can be 'bin' or 'int'. Defaults to 'bin'.
+            delay (float, optional): Maximum time in seconds to wait for the status. Defaults to self.TIMEOUT.
+            queryStatus (bool, optional): Determines whether or not to query the status after the message. If False, the command completes once it is written.
+                Defaults to True.
+
+        Returns:
+            Future: Resolves to the status reported by the PLC, or None if it was not queried. Raises TimeoutError if the PLC did not report its status in time.
+        """
+        future = Future()
+        self.commands.put((msg, converter, self.TIMEOUT if delay is None else delay, queryStatus, future))
+        return future
 
     def query(self, msg, converter='bin', delay=None, queryStatus=True):
-        """Writes message to the serial object at self.serial and logs the response after 'delay' seconds at level SERIAL. Due to the delay this should only be called by the thread handler to prevent blocking.
+        """Submits a command to the PLC and waits until it completes, see submit(). This blocks, so it should only be called by the thread handler.
 
         Args:
             msg (string or int): Message to send. If msg is passed as an integer, it will be converted to a string in the format defined by 'converter'.
             converter (str, optional): Format to convert the message to if it is an integer. Can be 'bin' or 'int'. Defaults to 'bin'.
-            delay (float, optional): Delay between read and write commands. Defaults to self.TIMEOUT.
+            delay (float, optional): Maximum time in seconds to wait for the status. Defaults to self.TIMEOUT.
             queryStatus(bool, optional): Determines whether or not to sent an opcodes.QUERY_STATUS message after the initial message. Used only for PLC, defaults to True.
-        """
-        if delay is None:
-            delay = self.TIMEOUT
 
-        self.write(msg, converter=converter)
-
-        timer = time.time()
-        while time.time() - timer < 1.2:
-            self.read()
-        if queryStatus:     # Delay is required between writes or the PLC will not parse it correctly
-            self.threadHandler(self.queryStatus)
-        timer = time.time()
-        while time.time() - timer < delay:
-            self.read()
+        Returns:
+            int: Status reported by the PLC, or None if it was not queried or did not respond in time.
+        """
+        try:
+            return self.submit(msg, converter=converter, delay=delay, queryStatus=queryStatus).result()
+        except TimeoutError as e:
+            logging.timeout(f'PLC did not report its status: {e}')
+        except Exception as e:
+            logging.error(f'{type(e).__name__}: {e}')
+        return None
 
     def queryStatus(self, delay=None):
-        """Writes opcodes.QUERY_STATUS to the serial object at self.serial and logs the response after 'delay' seconds at level SERIAL. Due to the delay this should only be called by the thread handler to prevent blocking.
+        """Queries the status of the PLC after the commands already submitted and waits for it, which updates self.status. This blocks, so it should only be called
+        by the thread handler.
 
         Args:
-            delay (float, optional): Delay between read and write commands. Defaults to self.TIMEOUT.
+            delay (float, optional): Maximum time in seconds to wait for the status. Defaults to self.TIMEOUT.
+
+        Returns:
+            bool: True if the PLC responded in time, False otherwise.
         """
-        if delay is None:
-            delay = self.TIMEOUT
-        self.write(opcodes.QUERY_STATUS.value, log=False)
-        timer = time.time()
-        while time.time() - timer < delay:
-            self.read()
+        return self.query(None, delay=delay) is not None
 
+    def _commandWorker(self):
+        while True:
+            msg, converter, delay, queryStatus, future = self.commands.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if self.reader is None or not self.reader.isRunning():
+                    raise serial.PortNotOpenError()
+                if queryStatus and self.pushesStatus and type(msg) == int and converter == 'bin':
+                    # The firmware acknowledges every opcode with a status frame echoing it, frames of earlier commands or of the 24V check are skipped
+                    isAcknowledged = lambda frames: self.isStatusFrame(frames[-1]) and self.parseStatusFrame(frames[-1])[0] == msg
+                    self.reader.transact(lambda: self.write(msg, converter=converter), isAcknowledged, delay)
+                else:
+                    if msg is not None:
+                        self.write(msg, converter=converter)
+                    if queryStatus:
+                        # Answered with the bare status after the status frame of msg, if the firmware sends one
+                        isStatus = lambda frames: self.isStatus(frames[-1])
+                        self.reader.transact(lambda: self.write(opcodes.QUERY_STATUS.value, log=False), isStatus, delay)
+                status = self.status if queryStatus else None
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(status)
+
+    @staticmethod
+    def isStatus(line):
+        """Returns True if a line received from the PLC is a status message (an integer), the response to opcodes.QUERY_STATUS."""
+        return line.strip().isdigit()
+
+    @staticmethod
+    def isStatusFrame(line):
+        """Returns True if a line received from the PLC is a status frame, 'STATUS <opcode> <status> <24V check>'."""
+        words = line.split()
+        return len(words) == 4 and words[0] == PLC_STATUS_FRAME and all(word.lstrip('-').isdigit() for word in words[1:])
+
+    @staticmethod
+    def parseStatusFrame(line):
+        """Returns the (opcode, status, 24V check) integers of a status frame. The opcode is PLC_NO_OPCODE if the frame was sent because the 24V check changed."""
+        return tuple(int(word) for word in line.split()[1:])
 
     def write(self, msg, converter='bin', log=True):
         """Writes message to the serial object at self.serial appended with a newline character.
@@ -428,7 +702,8 @@ class SerialIO:
                     msg = msg + '\n'
                 self.serial.write(msg.encode('utf-8'))
             elif type(msg) == int and converter == 'bin':
-                msg = bin(msg)[2:] + '\n'
+                # Zero padded to fill the read buffer of the PLC, which parses it as soon as PLC_FRAME_LENGTH bytes arrive instead of after its read timeout
+                msg = format(msg, 'b').zfill(PLC_FRAME_LENGTH - 2) + '\r\n'
                 self.serial.write(msg.encode('utf-8'))
             elif type(msg) == int and converter == 'int':
                 msg = str(msg) + '\n'
@@ -447,17 +722,37 @@ class SerialIO:
             logging.serial(self.serial.readline().decode('utf-8'))
 
     def read(self):
-        """Reads the amount of bytes in the input buffer and logs it at level SERIAL. If a timeout is reached, log the remaining bytes in the serial buffer.
+        """Reads the amount of bytes in the input buffer and parses its lines with parseLine. Only needed while the reader thread is stopped, it reads and parses
+        every line as it arrives.
         """
         with self.serialLock:
             buffer = self.serial.read(self.serial.in_waiting).decode('utf-8')
-            lines = buffer.splitlines()
-            for i in lines:
-                if i:   # Check if the string is empty
-                    try:
-                        self.status = int(i)
-                    except:
-                        logging.serial(i)
+        for line in buffer.splitlines():
+            self.parseLine(line)
+
+    def parseLine(self, line):
+        """Stores a status message or status frame from the PLC in self.status and self.supply24V, notifying subscribers if they changed, and logs any other line
+        at level SERIAL.
+
+        Args:
+            line (str): Line received from the PLC without its line ending.
+        """
+        if not line:    # Check if the string is empty
+            return
+        if self.isStatusFrame(line):
+            self.pushesStatus = True
+            _, status, supply24V = self.parseStatusFrame(line)
+        elif self.isStatus(line):
+            status, supply24V = int(line), self.supply24V
+        else:
+            logging.serial(line)
+            return
+        if supply24V != self.supply24V and self.supply24V is not None:
+            logging.serial(f'24V check of the output module changed from {self.supply24V} to {supply24V}')
+        if status != self.status or supply24V != self.supply24V:
+            self.status = status
+            self.supply24V = supply24V
+            self.notify()
 
     def flushInput(self):
         """Flush the input buffer, discarding all its contents.
@@ -473,16 +768,23 @@ class SerialIO:
             self.serial.reset_output_buffer()
 
 
-class VisaIO():
-    def __init__(self):
-        """Opens the VISA resource manager on the default backend (NI-VISA). If the VISA library cannot be found, a path must be passed to pyvisa.highlevel.ResourceManager() constructor
+class VisaIO(Notifier):
+    def __init__(self, visaLibrary=''):
+        """Opens the VISA resource manager on the default backend (NI-VISA). If the VISA library cannot be found, a path must be passed to pyvisa.highlevel.ResourceManager() constructor.
+        Subscribers are notified when a session is opened or closed.
+
+        Args:
+            visaLibrary (string, optional): Path to the VISA library or a pyvisa backend such as '@py'. Defaults to '' (default backend).
         """
+        Notifier.__init__(self)
+        self.traceFormat = FORMAT_ASCII     # Format used by queryTrace, applied to the open resource with setTraceFormat
+        self.unbatchedCommands = set()      # Commands the open resource did not answer, left out of batched messages (see queryBatch) so they cannot break them
         logging.info('Initializing VISA Resource Manager...')
-        self.rm = visa.ResourceManager()
+        self.rm = visa.ResourceManager(visaLibrary)
         if self.isError():
             logging.error(f'Could not open a session to the resource manager, error code: {hex(self.rm.last_status)}')
             return    
-        logging.info(f'Success code {hex(self.rm.last_status)}')
+        logging.info(f'Resource manager opened on {self.rm.visalib}')
         return
     
     def connectToRsrc(self, inputString):
@@ -505,7 +807,11 @@ class VisaIO():
         
         # If a session is not open or the open resource does not match inputString, attempt connection to inputString
         logging.info(f'Connecting to resource: {inputString}')
-        self.openRsrc = self.rm.open_resource(inputString)
+        try:
+            self.openRsrc = self.rm.open_resource(inputString)
+            self.unbatchedCommands = set()
+        finally:
+            self.notify()
         if self.isError():
             logging.error(f'Could not open a session to {inputString}.')
             logging.error(f'Error Code: {self.rm.last_status}.')
@@ -522,6 +828,7 @@ class VisaIO():
             return
         if sessionOpen:
             self.openRsrc.close()
+            self.notify()
 
     def identify(self):
         """Issues *IDN? to the open resource and returns a list of its response, split at each comma.
@@ -543,6 +850,135 @@ class VisaIO():
         self.openRsrc.write("*WAI")
         # Consider issuing sleep time or *OPC? here
         self.openRsrc.write(":INIT:CONT OFF")
+        # *RST returns the trace format to ASCII, so restore the selected format
+        self.setTraceFormat(self.traceFormat)
+
+    def setTraceFormat(self, traceFormat):
+        """Issues :FORM to the open resource so trace queries are returned in the format passed in `traceFormat`. Binary formats are sent big endian (:FORM:BORD NORM).
+
+        Args:
+            traceFormat (string): One of FORMAT_ASCII, FORMAT_REAL32 or FORMAT_REAL64.
+
+        Raises:
+            ValueError: If `traceFormat` is not in TRACE_FORMATS.
+        """
+        if traceFormat not in TRACE_FORMATS:
+            raise ValueError(f'Invalid trace format: {traceFormat}, expected one of {TRACE_FORMATS}')
+        self.openRsrc.write(f':FORM {traceFormat}')
+        if traceFormat != FORMAT_ASCII:
+            self.openRsrc.write(':FORM:BORD NORM')
+        self.traceFormat = traceFormat
+
+    def queryTrace(self, command):
+        """Issues a trace query (:TRACE:DATA?, :FETCH:SAN?, :READ:SAN?, etc.) to the open resource and returns the response in the format set by setTraceFormat.
+        Binary formats are read as an IEEE 488.2 block directly into a NumPy array, which avoids formatting and parsing the trace as text. Interleaved queries are
+        read as REAL,64 when the format is REAL,32, since a float32 rounds frequencies in the GHz range to steps of a hundred Hz or more.
+
+        Args:
+            command (string): SCPI query which returns trace data.
+
+        Returns:
+            ndarray: Trace data returned from the device.
+        """
+        if self.traceFormat == FORMAT_REAL32 and command.strip().upper().endswith(INTERLEAVED_TRACE_QUERY):
+            # Switch to REAL,64 for this query and back in the same message, which costs no extra round trip
+            return self.openRsrc.query_binary_values(f':FORM {FORMAT_REAL64};{command};:FORM {FORMAT_REAL32}', datatype='d', is_big_endian=True, container=np.array)
+        elif self.traceFormat == FORMAT_REAL32:
+            return self.openRsrc.query_binary_values(command, datatype='f', is_big_endian=True, container=np.array)
+        elif self.traceFormat == FORMAT_REAL64:
+            return self.openRsrc.query_binary_values(command, datatype='d', is_big_endian=True, container=np.array)
+        else:
+            return self.openRsrc.query_ascii_values(command, container=np.array)
+
+    def queryBatch(self, writes=(), queries=()):
+        """Joins write commands and queries into a single semicolon chained SCPI message so they are issued in one round trip. Writes are executed before queries.
+
+        Args:
+            writes (list, optional): SCPI commands with arguments, e.g. ':SENS:FREQ:SPAN 1e6'. Defaults to ().
+            queries (list, optional): SCPI queries, e.g. ':SENS:FREQ:START?'. Defaults to ().
+
+        Raises:
+            ValueError: If the amount of responses returned by the device does not match the amount of queries.
+
+        Returns:
+            list: Response string to each query in the same order as `queries`, with leading/trailing whitespace removed.
+        """
+        message = ';'.join(list(writes) + list(queries))
+        if not message:
+            return []
+        if not queries:
+            self.openRsrc.write(message)
+            return []
+        buffer = self.openRsrc.query(message).strip().split(';')
+        if len(buffer) != len(queries):
+            raise ValueError(f'Batched query expected {len(queries)} responses and received {len(buffer)}')
+        return [value.strip() for value in buffer]
+
+    def waitForSweep(self, lock=None, timeout=None, cancel=None, pollInterval=0.02):
+        """Starts a single sweep with ':INIT:IMM;*OPC' and blocks until the device sets the Operation Complete bit of its Event Status Register. On GPIB the bit is routed to a
+        service request and the SRQ event is awaited, on other interfaces '*ESR?' is polled every `pollInterval` seconds. `lock` is only held while a message is exchanged with
+        the device so other threads can use the resource during the sweep.
+
+        Args:
+            lock (threading.Lock, optional): Resource lock acquired for each exchange with the device. Defaults to None.
+            timeout (float, optional): Seconds to wait for the sweep to complete, None to wait indefinitely. Defaults to None.
+            cancel (threading.Event, optional): Stops waiting when set. Defaults to None.
+            pollInterval (float, optional): Seconds between '*ESR?' queries or SRQ event waits. Defaults to 0.02.
+
+        Raises:
+            TimeoutError: If the sweep does not complete within `timeout` seconds.
+
+        Returns:
+            bool: True if the sweep completed, False if `cancel` was set.
+        """
+        if lock is None:
+            lock = contextlib.nullcontext()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        useSrq = self.openRsrc.interface_type == constants.InterfaceType.gpib
+        with lock:
+            if useSrq:
+                try:
+                    self.openRsrc.enable_event(constants.EventType.service_request, constants.EventMechanism.queue)
+                    self.openRsrc.discard_events(constants.EventType.service_request, constants.EventMechanism.queue)
+                except (visa.errors.VisaIOError, NotImplementedError) as e:
+                    logging.verbose(f'Service requests unavailable, polling *ESR? instead. {type(e).__name__}: {e}')
+                    useSrq = False
+            # Reading the Event Status Register before initiating clears an Operation Complete bit left over from an earlier *OPC
+            self.openRsrc.query_ascii_values(f'*ESE {ESR_OPC};*SRE {STB_ESB if useSrq else 0};*ESR?;:INIT:IMM;*OPC')
+        try:
+            while True:
+                if cancel is not None and cancel.is_set():
+                    return False
+                wait = pollInterval
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f'Sweep did not complete within {timeout} s')
+                    wait = min(wait, remaining)
+                if useSrq:
+                    try:
+                        self.openRsrc.wait_on_event(constants.EventType.service_request, max(int(wait * 1000), 1))
+                    except visa.errors.VisaIOError as e:
+                        if e.error_code == constants.StatusCode.error_timeout:
+                            continue
+                        raise
+                    with lock:
+                        self.openRsrc.read_stb()
+                        eventRegister = int(self.openRsrc.query_ascii_values('*ESR?')[0])
+                else:
+                    if cancel is not None:
+                        cancel.wait(wait)
+                    else:
+                        time.sleep(wait)
+                    with lock:
+                        eventRegister = int(self.openRsrc.query_ascii_values('*ESR?')[0])
+                if eventRegister & ESR_OPC:
+                    return True
+        finally:
+            if useSrq:
+                with lock:
+                    self.openRsrc.write('*SRE 0')
+                    self.openRsrc.disable_event(constants.EventType.service_request, constants.EventMechanism.queue)
 
     def testBufferSize(self):
         # PyVISA reads until a termination is received, not specified bytes like NI-VISA unless resource.read_bytes() is called.
@@ -609,8 +1045,12 @@ class VisaIO():
         Returns:
             Literal (int): 0 on success or warning (operation succeeded), StatusCode on error.
         """
-        if self.rm.last_status < constants.VI_SUCCESS:
-            return self.rm.last_status
+        try:
+            lastStatus = self.rm.last_status
+        except visa.errors.Error:   # Backends such as pyvisa-py do not record a status for the resource manager session
+            return RETURN_SUCCESS
+        if lastStatus < constants.VI_SUCCESS:
+            return lastStatus
         else:
             # logging.info(f'Success code: {hex(self.rm.last_status)}')
             return RETURN_SUCCESS
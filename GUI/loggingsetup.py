@@ -9,14 +9,20 @@
  * 
  """
 
+import os
+import sys
 import logging
+import logging.handlers
 
+LOG_FORMAT = "[%(asctime)s] %(levelname)-s: %(message)s"
+LOG_DATEFMT = "%Y-%m-%d %H:%M:%S"
+RELAY_FORMAT = '%(levelno)d\t%(message)s'   # Log format of the command line tools run by the GUI, parsed to re-log the records at their level
 VERBOSE = logging.DEBUG + 1
 
 logging.basicConfig(
     level=logging.INFO,
-    format="[%(asctime)s] %(levelname)-s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
+    format=LOG_FORMAT,
+    datefmt=LOG_DATEFMT,
 )
 
 def addLoggingLevel(levelName, levelNum, methodName=None):
@@ -55,6 +61,33 @@ def loggingLevelHandler(level):
     elif level == 3:
         logging.getLogger().setLevel(logging.DEBUG)
 
+def addLogFile(path, maxBytes=10485760, backupCount=5):
+    """Mirrors every record logged at the level of the root logger to a rotating file. The console only keeps its last lines, the file keeps the full log.
+
+    Args:
+        path (str): Path of the log file, its folder is created if it does not exist.
+        maxBytes (int, optional): Size at which the file is renamed to path.1 (path.1 to path.2, etc.) and a new file is started. Defaults to 10 MiB.
+        backupCount (int, optional): Amount of renamed files kept. Defaults to 5.
+
+    Returns:
+        RotatingFileHandler: The handler added to the root logger.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=maxBytes, backupCount=backupCount, encoding='utf-8')
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATEFMT))
+    logging.getLogger().addHandler(handler)
+    return handler
+
+def relayLogToStdout():
+    """Replaces the handlers of the root logger with one writing every record to stdout as a "<level number>\\t<message>" line (RELAY_FORMAT). Used by the command
+    line tools the GUI runs in subprocesses, which re-logs the records at their level.
+    """
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter(RELAY_FORMAT))
+    root.addHandler(handler)
 
 addLoggingLevel("TERMINAL", logging.INFO + 1)
 addLoggingLevel("SERIAL", logging.INFO + 2)
@@ -7,11 +7,17 @@ from loggingsetup import *
 from automation import *
 from drift import *
 from waterfall import *
+from catalog import *
+from pipeline import *
+from plotting import *
+from dispatcher import *
+from parameters import *
 
 # OTHER MODULES
 import threading
 import sys
 import os
+import subprocess
 from datetime import date, datetime, timedelta, timezone
 import datetime as dt
 from tzlocal import get_localzone
@@ -22,6 +28,7 @@ import numpy as np
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 import logging
 import decimal
 import traceback
@@ -52,8 +59,15 @@ from tktooltip import ToolTip
 IDLE_DELAY = 1.0
 ANALYZER_LOOP_DELAY = 0.5
 ANALYZER_REFRESH_DELAY = 0.05
-MOTOR_LOOP_DELAY = 0.5
-STATUS_MONITOR_DELAY = 0.2
+SWEEP_AXIS_MAX_AGE = 2.0    # Seconds before the cached sweep axis is queried again to catch changes made on the instrument
+SWEEP_TIMEOUT_FACTOR = 2.0  # Multiple of the expected sweep duration to wait for a single sweep before timing out
+SWEEP_TIMEOUT_MARGIN = 5.0  # Seconds added to the expected sweep duration to allow for transfer and settling
+TRACE_WRITER_EXIT_TIMEOUT = 10.0   # Seconds to wait on exit for queued traces to be written
+MOTOR_LOOP_DELAY = 0.1
+MOTOR_STATUS_BITS = ('BIT8465', 'BIT8497', 'BIT792', 'BIT824', 'BIT8467', 'BIT8499')   # Drive enable, active and kill all motion request of x and y
+MOTOR_ENCODER_PARAMETERS = ('P6144', 'P6160')     # Encoder positions of x and y
+STATUS_MONITOR_DELAY = 0.02    # Seconds to wait after a notification so changes made together are rendered together
+STATUS_MONITOR_TIMEOUT = 1.0   # Seconds between checks without notifications, catches connections lost without a call to close them
 RETURN_ERROR = 1
 RETURN_SUCCESS = 0
 ENABLE = 1
@@ -85,6 +99,7 @@ DEF_WF_THRESHOLD = 100
 DEF_WF_TZ = 'US/Mountain'
 DEF_WF_FILETYPE = '.png'
 DEF_WF_DPI = 600
+DEF_WF_INTERVAL = 5                         # Minutes between scheduled runs in incremental mode
 WATERFALL_JOB_ID = 'waterfall'
 DEF_DRIFT_FROM_PATH = os.getcwd()
 DEF_DRIFT_TO_PATH = os.getcwd()
@@ -124,6 +139,35 @@ X_HOME = cfg['calibration']['x_enc_home']
 Y_HOME = cfg['calibration']['y_enc_home']
 X_CPD = cfg['calibration']['x_countsperrotation'] / 360
 Y_CPD = cfg['calibration']['y_countsperrotation'] / 360
+TRACE_STORAGE = str(cfg['automation']['trace_storage']).lower()    # Storage for automated captures: 'csv', 'archive', or 'both'
+TRACE_STORAGE_OPTIONS = ('csv', 'archive', 'both')
+WF_MAX_WORKERS = int(cfg['waterfall']['max_workers'])           # Waterfall worker processes, 0 for one per CPU core and 1 to run in the GUI process
+DRIFT_MAX_WORKERS = int(cfg['drift']['max_workers'])           # DRIFT conversion worker processes, 0 for one per CPU core and 1 to run in the GUI process
+LIVE_WF_ROWS = int(cfg['display']['waterfall_rows'])           # Sweeps shown in the live waterfall under the spectrum plot, 0 to hide it
+LIVE_WF_COLUMNS = int(cfg['display']['waterfall_columns'])     # Live waterfall bins, wider sweeps are reduced to the maximum of each bin
+LIVE_WF_COLORMAP = cfg['display']['waterfall_colormap']
+UI_INTERVAL = int(cfg['display']['ui_interval'])               # Milliseconds between drains of the UI update queue
+UI_BUDGET = int(cfg['display']['ui_budget'])                   # Milliseconds each drain may spend applying updates
+CONSOLE_MAX_LINES = int(cfg['console']['max_lines'])           # Lines kept in the console, 0 for all of them
+CONSOLE_INTERVAL = int(cfg['console']['interval'])             # Milliseconds between console updates
+LOG_FILE = str(cfg['console']['log_file'])                     # Rotating file mirroring the full log, empty to disable
+CATALOG_PATH = str(cfg['catalog']['path'])                     # Trace catalog database, relative to this directory, empty to disable
+if CATALOG_PATH:
+    CATALOG_PATH = str(Path(__file__).parent.absolute() / CATALOG_PATH)
+
+if LOG_FILE:
+    try:
+        addLogFile(LOG_FILE, maxBytes=int(cfg['console']['log_file_max_bytes']), backupCount=int(cfg['console']['log_file_backups']))
+    except Exception as e:
+        logging.error(f'Could not open log file {LOG_FILE}: {type(e).__name__}: {e}')
+
+traceCatalog = None     # Index of the saved trace csvs, see catalog.py. Search it from the console with traceCatalog.find()
+if CATALOG_PATH:
+    try:
+        traceCatalog = TraceCatalog(CATALOG_PATH)
+    except Exception as e:
+        logging.error(f'Could not open trace catalog {CATALOG_PATH}: {type(e).__name__}: {e}')
+        CATALOG_PATH = ''
 
 # THREADING EVENTS
 visaLock = threading.RLock()        # For VISA resources
@@ -145,127 +189,57 @@ automation = Automation(defaultstate=state.IDLE, executors=executors, job_defaul
 # DRIFT/WATERFALL SCHEDULER
 dwfScheduler = BackgroundScheduler()
 
-# SPECTRUM ANALYZER PARAMETERS
-class Parameter:
-    instances = []
-    def __init__(self, name, command, log=True, required=False):
-        """Spectrum analyzer parameter and associated SCPI command.
-
-        Args:
-            name (string): Full name to be used in trace csv.
-            command (string): SCPI command used to query/set parameter.
-            log (bool): Determines whether or not to save the parameter to trace csv. Defaults to True.
-            required (bool): Determines if this parameter is necessary for the program to function. Defaults to False.
+class SweepAxis:
+    def __init__(self):
+        """Cached x axis of the spectrum analyzer sweep. Holds the start/stop frequency and sweep points last queried from the device and a precomputed
+        x axis array which is reused across display frames until the axis is invalidated or expires after SWEEP_AXIS_MAX_AGE seconds.
         """
-        Parameter.instances.append(self)
-        self.name = name
-        self.command = command
-        self.log = log
-        self.required = required
-        self.arg = None             # Argument to issue to the device, used in SpecAn.setAnalyzerValue
-        self.widget = None          # Widget (entry/combobox/radiobutton) which controls the parameter. In the case of radiobuttons, only one button needs to be stored here but all buttons should share a parent frame/labelframe
-        self.tkvar = None           # Tkinter variable which controls the radiobutton widget
-        self.value = None           # Last queried value for the parameter
-        self.isEnabled = True       # State of the parameter (are the widgets which controlled this parameter enabled or disabled), defaults to True and is tested each time the SpecAn state goes to state.LOOP
-        self.commandList = []       # Additional commands to try for the same Parameter, e.g. TRAC:TYPE and DISP:WIND1:SUBW:TRAC1:MODE for Keysight and R&S frameworks.
-
-    def update(self, arg:str = None, widget = None, tkvar = None, value:any = None):
-        """Update the argument/value and tkinter widget associated with the parameter.
-
-        Args:
-            arg (any, optional): Parameter argument. Defaults to None.
-            widget (ttk.Widget or Tkinter_variable, optional): Associated tkinter widget. Defaults to None.
-            value(any, optional): Parameter value. Defaults to None.
+        self.startFreq = None
+        self.stopFreq = None
+        self.sweepPoints = None
+        self.xAxis = None
+        self.timestamp = 0.0
+        self.valid = False
+
+    def invalidate(self):
+        """Forces the next call to isValid to return False so the axis is queried again.
         """
-        self.arg = arg
-        if widget is not None:
-            self.widget = widget
-        if value is not None:
-            self.value = value
-        if tkvar is not None:
-            self.tkvar = tkvar
-
-    def addCommand(self, command:str):
-        self.commandList.append(command)
+        self.valid = False
 
-    def renewCommand(self, command:str):
-        """Swaps `self.command` with the string passed in `command`.
+    def isValid(self):
+        """Tests whether the cached axis can be used without querying the device.
 
-        Args:
-            command (str): SCPI string in `self.commandList` to replace the active command.
+        Returns:
+            bool: True if the axis has been queried since it was last invalidated and has not expired.
         """
-        if not isinstance(command, str):
-            raise TypeError(f"Command passed to Parameter.renewCommand did not match correct type. Expected str, received {type(command)}")
-        if command in self.commandList:
-            self.commandList.remove(command)
-            self.commandList.append(self.command)
-            self.command = command
-        else:
-            raise ValueError(f"Command {command} not found in self.commandList: {self.commandList}")
-        
-    def getValue(self, dtype: type):
-        """Python may interpret scpi return values as a list or string, sometimes with quotes, brackets or other characters. This function returns the value in the type passed in `type`.
+        return self.valid and time.time() - self.timestamp < SWEEP_AXIS_MAX_AGE
+
+    def update(self, startFreq, stopFreq, sweepPoints):
+        """Sets the axis parameters and recomputes the x axis array only if they changed.
 
         Args:
-            dtype (type): Data type to cast on the return value.
-        
-        Returns:
-            value: `Parameter.value` in the type passed as an argument, with quotes, brackets, etc. removed.
+            startFreq (float): Start frequency in hertz.
+            stopFreq (float): Stop frequency in hertz.
+            sweepPoints (int): Number of sweep points.
         """
-        if isinstance(self.value, (list,)):
-            try:
-                value = self.value[0].strip("[]{}()#* \n\t")
-            except:
-                value = str(self.value).strip("[]{}()#* \n\t")
-        else:
-            value = str(self.value).strip("[]{}()#* \n\t")
-        return dtype(value)
+        if (startFreq, stopFreq, sweepPoints) != (self.startFreq, self.stopFreq, self.sweepPoints) or self.xAxis is None:
+            self.xAxis = np.linspace(startFreq, stopFreq, sweepPoints)
+            self.startFreq = startFreq
+            self.stopFreq = stopFreq
+            self.sweepPoints = sweepPoints
+        self.timestamp = time.time()
+        self.valid = True
 
-    def disable(self):
-        if isinstance(self.widget, (type(None),)):
-            return
-        else:
-            disableChildren(self.widget.master)
-            self.isEnabled = False
+    def refresh(self, Vi):
+        """Queries the start frequency, stop frequency and sweep points from the open resource and updates the axis. Should be called with visaLock acquired.
 
-    def enable(self):
-        if isinstance(self.widget, (type(None),)):
-            return
-        else:
-            enableChildren(self.widget.master)
-            self.isEnabled = True
-
-CenterFreq      = Parameter('Center Frequency', ':SENS:FREQ:CENTER', log=False)
-Span            = Parameter('Span', ':SENS:FREQ:SPAN', log=False)
-StartFreq       = Parameter('Start Frequency', ':SENS:FREQ:START', required=True)
-StopFreq        = Parameter('Stop Frequency', ':SENS:FREQ:STOP', required=True)
-SweepTime       = Parameter('Sweep Time', ':SWE:TIME')
-Rbw             = Parameter('RBW', ':SENS:BANDWIDTH:RESOLUTION')
-Vbw             = Parameter('VBW', ':SENS:BANDWIDTH:VIDEO')
-BwRatio         = Parameter('VBW:3 dB RBW', ':SENS:BANDWIDTH:VIDEO:RATIO', log=False)
-Ref             = Parameter('Ref Level', ':DISP:WINDOW:TRACE:Y:RLEVEL', log=False)
-NumDiv          = Parameter('Number of Divisions', ':DISP:WINDOW:TRACE:Y:NDIV', log=False)  # Keysight
-YScale          = Parameter('Scale/Div', ':DISP:WINDOW:TRACE:Y:PDIV', log=False)            # Keysight
-YRange          = Parameter('Range', ':DISP:TRACE:Y:SCALE', log=False)                      # R&S
-Atten           = Parameter('Attenuation', ':SENS:POWER:RF:ATTENUATION')
-SpanType        = Parameter('Swept Span', ':SENS:FREQ:SPAN', log=False)
-SweepType       = Parameter('Auto Sweep Time', ':SWE:TIME:AUTO', log=False)
-RbwType         = Parameter('Auto RBW', ':SENS:BAND:RES:AUTO', log=False)
-VbwType         = Parameter('Auto VBW', ':SENS:BAND:VID:AUTO', log=False)
-BwRatioType     = Parameter('Auto VBW:RBW Ratio', ':SENS:BAND:VID:RATIO', log=False)
-RbwFilterShape  = Parameter('RBW Filter', ':SENS:BAND:SHAP')
-RbwFilterType   = Parameter('RBW Filter BW', ':SENS:BAND:TYPE')
-AttenType       = Parameter('Auto Attenuation', ':SENS:POWER:ATT:AUTO', log=False)
-XAxisUnit       = Parameter('X Axis Units', None)
-XAxisUnit.update(value='Hz')
-YAxisUnit       = Parameter('Y Axis Units', ':UNIT:POW')
-TraceType       = Parameter('Trace Type', ':TRACE:TYPE')                                    # Keysight
-TraceType.addCommand(':DISP:WIND1:SUBW:TRAC1:MODE')                                         # R&S
-AvgType         = Parameter('Average Type', ':SENS:AVER:TYPE')
-AvgAutoMan      = Parameter('Auto Average Type', ':SENS:AVER:TYPE:AUTO', log=False)
-AvgHoldCount    = Parameter('Average/Hold Count', ':SENS:AVER:COUNT', log=False)
-SweepPoints     = Parameter('Number of Points', ':SENS:SWEEP:POINTS', required=True)
-TimeParameter   = Parameter('Time', None)
+        Args:
+            Vi (VisaIO): Object of VisaIO with an open resource.
+        """
+        startFreq = float(Vi.openRsrc.query_ascii_values(":SENS:FREQ:START?")[0])
+        stopFreq = float(Vi.openRsrc.query_ascii_values(":SENS:FREQ:STOP?")[0])
+        sweepPoints = int(Vi.openRsrc.query_ascii_values(":SENS:SWEEP:POINTS?")[0])
+        self.update(startFreq, stopFreq, sweepPoints)
 
 # real code starts here
 def threadHandler(target, args=(), kwargs={}):
@@ -343,36 +317,6 @@ def clearAndSetWidget(widget, arg):
         widget.configure(state=state)
 
 
-def disableChildren(parent):
-    """Tries to set the state of the child widgets of parent to 'disable'.
-
-    Args:
-        parent (tk:widget): Parent widget whose children should be disabled.
-    """
-    for child in parent.winfo_children():
-        wtype = child.winfo_class()
-        if wtype not in ('Frame', 'LabelFrame', 'TFrame', 'TLabelframe'):
-            child.configure(state='disable')
-        else:
-            disableChildren(child)
-
-def enableChildren(parent):
-    """Tries to set the state of the child widgets of parent to 'enable' or 'normal'.
-
-    Args:
-        parent (tk:widget): Parent widget whose children should be enabled.
-    """
-    for child in parent.winfo_children():
-        wtype = child.winfo_class()
-        if wtype not in ('Frame', 'LabelFrame', 'TFrame', 'TLabelframe'):
-            try:
-                child.configure(state='enable')
-            except:
-                child.configure(state='normal')
-        else:
-            enableChildren(child)
-
-
 class FrontEnd():
     def __init__(self, root, Vi, Motor, PLC):
         """Initializes the top level tkinter interface
@@ -385,9 +329,11 @@ class FrontEnd():
         """
         # CONSTANTS
         self.SELECT_TERM_VALUES = ('Line Feed - \\n', 'Carriage Return - \\r')
+        self.SELECT_FORMAT_VALUES = ('ASCII', 'Binary (REAL,32)', 'Binary (REAL,64)')     # Indexes match frontendio.TRACE_FORMATS
         # VARIABLES
         self.timeout = TIMEOUT_DEF           # VISA timeout value
         self.chunkSize = CHUNK_SIZE_DEF      # Bytes to read from buffer
+        self.traceFormat = FORMAT_ASCII      # Trace transfer format
         self.instrument = ''                 # ID of the currently open instrument.
         self.motorPort = ''
         self.plcPort = ''
@@ -542,14 +488,16 @@ class FrontEnd():
             background (string, optional): Color in any tkinter-compatible format, although ideally hex for compatibility. Defaults to None.
         """
         if text is not None:
-            widget.configure(text=text)
+            dispatcher.configure(widget, text=text)
         if background is not None:
-            widget.configure(background=background)
+            dispatcher.configure(widget, background=background)
     
     def onExit( self ):
         """Cleanup""" 
         while (self.motor.ser.is_open):
             self.motor.CloseSerial()
+        if not tracePipeline.stop(timeout=TRACE_WRITER_EXIT_TIMEOUT):
+            logging.error(f'Traces still queued for writing after {TRACE_WRITER_EXIT_TIMEOUT} s were discarded.')
         root.quit()
         logging.info("Program executed with exit code: 0")
 
@@ -643,6 +591,11 @@ class FrontEnd():
         self.chunkSizeWidget = ttk.Spinbox(configFrame, from_=CHUNK_SIZE_MIN, to=CHUNK_SIZE_MAX, increment=10240, validate="key", validatecommand=(isNumWrapper, '%P'))
         self.chunkSizeWidget.grid(row = 3, column = 0, padx=20, pady=5, columnspan=2)
         self.chunkSizeWidget.set(self.chunkSize)
+        traceFormatLabel = ttk.Label(configFrame, text = 'Trace format')
+        traceFormatLabel.grid(row = 4, column = 0, pady=5)
+        self.traceFormatWidget = ttk.Combobox(configFrame, values=self.SELECT_FORMAT_VALUES, state='readonly')
+        self.traceFormatWidget.grid(row = 5, column = 0, padx=20, pady=5, columnspan=2)
+        self.traceFormatWidget.current(TRACE_FORMATS.index(self.traceFormat))
         applyButton = ttk.Button(configFrame, text = "Apply Changes", command = lambda:self.scpiApplyConfig(self.timeoutWidget.get(), self.chunkSizeWidget.get()))
         applyButton.grid(row = 7, column = 0, columnspan=2, pady=10)
         # VISA TERMINATION FRAME
@@ -669,6 +622,7 @@ class FrontEnd():
         try:
             self.timeoutWidget.set(self.timeout)
             self.chunkSizeWidget.set(self.chunkSize)
+            self.traceFormatWidget.current(TRACE_FORMATS.index(self.traceFormat))
             self.instrSelectBox.set(self.instrument)
         except:
             pass
@@ -713,6 +667,8 @@ class FrontEnd():
             termChar = '\r'
         else:
             termChar = ''
+        # Get the trace format from traceFormatWidget
+        traceFormat = TRACE_FORMATS[max(self.traceFormatWidget.current(), 0)]
         # Get timeout and chunk size values from respective widgets
         try:
             timeoutArg = int(timeoutArg)
@@ -728,7 +684,14 @@ class FrontEnd():
         if self.Vi.setConfig(timeoutArg, chunkSizeArg, self.sendEnd.get(), self.enableTerm.get(), termChar) == RETURN_SUCCESS:
             self.timeout = timeoutArg
             self.chunkSize = chunkSizeArg
-            logging.info(f'Timeout: {self.Vi.openRsrc.timeout}, Chunk size: {self.Vi.openRsrc.chunk_size}, Send EOI: {self.Vi.openRsrc.send_end}, Termination: {repr(self.Vi.openRsrc.write_termination)}')
+            try:
+                with visaLock:
+                    self.Vi.setTraceFormat(traceFormat)
+                self.traceFormat = traceFormat
+            except Exception as e:
+                logging.error(f'{type(e).__name__}: {e}')
+                return RETURN_ERROR
+            logging.info(f'Timeout: {self.Vi.openRsrc.timeout}, Chunk size: {self.Vi.openRsrc.chunk_size}, Send EOI: {self.Vi.openRsrc.send_end}, Termination: {repr(self.Vi.openRsrc.write_termination)}, Trace format: {self.Vi.traceFormat}')
             return RETURN_SUCCESS
         else:
             return RETURN_ERROR
@@ -782,6 +745,7 @@ class SpecAn(FrontEnd):
         s.configure('Icon.TLabel', font=cfg['theme']['icon_font'], justify=CENTER)
         # VISA OBJECT
         self.Vi = Vi
+        self.sweepAxis = SweepAxis()
         # PARENT
         spectrumFrame = parentWidget
         spectrumFrame.rowconfigure(0, weight=0)     # Prevent this row to resize
@@ -794,9 +758,17 @@ class SpecAn(FrontEnd):
 
         # MATPLOTLIB GRAPH
         self.fig = plt.figure(linewidth=0, edgecolor="#04253a")
-        self.ax = self.fig.add_subplot()
+        if LIVE_WF_ROWS > 0:
+            grid = self.fig.add_gridspec(2, 1, height_ratios=(2, 1), hspace=0.08)
+            self.ax = self.fig.add_subplot(grid[0])
+            self.wfAx = self.fig.add_subplot(grid[1], sharex=self.ax)
+            self.xLabelAx = self.wfAx   # Frequency is labelled under the waterfall
+        else:
+            self.ax = self.fig.add_subplot()
+            self.wfAx = None
+            self.xLabelAx = self.ax
         self.ax.set_title("Spectrum Plot")
-        self.ax.set_xlabel("Frequency (Hz)")
+        self.xLabelAx.set_xlabel("Frequency (Hz)")
         self.ax.set_ylabel("Power (dBm)")
         self.ax.autoscale(enable=False, tight=True)
         self.ax.xaxis.set_minor_locator(ticker.AutoMinorLocator())
@@ -805,6 +777,28 @@ class SpecAn(FrontEnd):
         self.fig.subplots_adjust(bottom=0.12, top=0.92)
         self.spectrumDisplay = FigureCanvasTkAgg(self.fig, master=spectrumFrame)
         self.spectrumDisplay.get_tk_widget().grid(row = 0, column = 0, sticky=NSEW, rowspan=5)
+        self.blitManager = BlitManager(self.spectrumDisplay)
+        self.renderedAxesState = None   # Axes limits and labels when the canvas was last fully drawn, see renderSpectrum
+        # The spectrum line is created once and updated in place, see analyzerDisplayLoop. It is drawn at screen resolution from a min/max decimated copy of the
+        # trace, the full resolution trace is kept in self.spectrumLine for saving
+        self.spectrumLine = DecimatedLine(self.ax, [], [])
+        self.line = self.spectrumLine.line
+        self.styleLine()
+        self.blitManager.add(self.line)
+        self.ax.grid(visible=True)
+
+        # LIVE WATERFALL
+        # The last LIVE_WF_ROWS sweeps are kept in a fixed size ring buffer and drawn by a single image whose data is replaced in place, newest sweep at the top
+        self.waterfall = None
+        if self.wfAx is not None:
+            self.waterfall = WaterfallBuffer(LIVE_WF_ROWS, LIVE_WF_COLUMNS)
+            self.ax.tick_params(labelbottom=False)
+            self.wfAx.set_ylabel("Sweeps")
+            self.wfAx.autoscale(enable=False)
+            self.wfAx.set_ylim(0, LIVE_WF_ROWS)
+            self.wfImage = self.wfAx.imshow(np.full((1, 1), np.nan, dtype=np.float32), aspect='auto', origin='lower', interpolation='nearest', cmap=LIVE_WF_COLORMAP,
+                                            extent=(0, 1, 0, LIVE_WF_ROWS), vmin=-100, vmax=0)
+            self.blitManager.add(self.wfImage)
 
         # ICON FRAME
         self.iconFrame = ttk.Frame(spectrumFrame)
@@ -1131,16 +1125,37 @@ class SpecAn(FrontEnd):
                         self.Vi.openRsrc.write("INIT:CONT 0")
                     else:
                         self.Vi.openRsrc.write("INIT:CONT 1")
-                elif action == 'restart':
+                elif action == 'restart' and isContinuous:
                     self.Vi.openRsrc.write("INIT:IMM")
                 isContinuous = bool(self.Vi.openRsrc.query_ascii_values(":INIT:CONT?")[0])
-                if isContinuous:
-                    self.sweepIcon.configure(text=CONT_ICON)
-                else:
-                    self.sweepIcon.configure(text=SINGLE_ICON)
-        thread = threading.Thread(target=do)
+                dispatcher.configure(self.sweepIcon, text=CONT_ICON if isContinuous else SINGLE_ICON)
+            # A single sweep is awaited without holding visaLock so the display keeps updating during the sweep
+            if action == 'restart' and not isContinuous:
+                try:
+                    if self.Vi.waitForSweep(lock=visaLock, timeout=self.sweepTimeout()):
+                        logging.verbose('Single sweep complete.')
+                except TimeoutError as e:
+                    logging.error(f'{type(e).__name__}: {e}')
+        thread = threading.Thread(target=do, daemon=True)
         thread.start()
 
+    def sweepTimeout(self):
+        """Returns the time to wait for a single sweep to complete, estimated from the sweep time and the average/hold count of the last queried parameters.
+
+        Returns:
+            float: Timeout in seconds, or None if the sweep time is unknown.
+        """
+        try:
+            duration = SweepTime.getValue(float)
+        except (TypeError, ValueError):
+            return None
+        try:
+            if TraceType.getValue(str).upper() != 'WRIT':
+                duration *= AvgHoldCount.getValue(int)
+        except (TypeError, ValueError):
+            pass
+        return SWEEP_TIMEOUT_FACTOR * duration + SWEEP_TIMEOUT_MARGIN
+
     def setAnalyzerPlotLimits(self, **kwargs):
         """Sets self.ax limits to parameters passed in **kwargs if they exist. If not, gets relevant widget values to set limits.
 
@@ -1156,11 +1171,11 @@ class SpecAn(FrontEnd):
             if tkSpanType.get() == 0:
                 xmin = 0
                 xmax = round(SweepTime.getValue(float), 5)
-                self.ax.set_xlabel("Time (s)")
+                self.xLabelAx.set_xlabel("Time (s)")
             else:
                 xmin = StartFreq.getValue(float)
                 xmax = StopFreq.getValue(float)
-                self.ax.set_xlabel("Frequency (Hz)")
+                self.xLabelAx.set_xlabel("Frequency (Hz)")
             self.ax.set_xlim(xmin, xmax)
 
         if 'ymin' in kwargs and 'ymax' in kwargs:
@@ -1281,11 +1296,6 @@ class SpecAn(FrontEnd):
             AvgType.update(arg=self.AVG_TYPE_VAL_ARGS[avgtype])
         AvgAutoMan.update(arg=avgautoman)
 
-        # Sort the list so dictionaries with 'arg': None are placed (and executed) after write commands
-        for index in range(len(_list)):
-            if _list[index].arg is not None:
-                _list.insert(0, _list.pop(index))
-
         def _query(_parameter):
             try:
                 buffer = self.Vi.openRsrc.query_ascii_values(f'{_parameter.command}?', converter='s') # Default converter is float
@@ -1302,33 +1312,70 @@ class SpecAn(FrontEnd):
                     raise e
 
 
+        def _setValue(_parameter, buffer):
+            _parameter.enable()
+            logging.verbose(f"Command {_parameter.command}? returned {buffer}")
+            _parameter.update(value=buffer)
+            if _parameter.tkvar:
+                clearAndSetWidget(_parameter.tkvar, buffer)
+            else:
+                clearAndSetWidget(_parameter.widget, buffer)
+
+        # Only the written parameters and their dependents can change on the device. If nothing was written, query every parameter.
+        _written = [parameter for parameter in _list if parameter.arg is not None and parameter.command is not None and parameter.isEnabled]
+        if _written:
+            _affected = set(_written)
+            for parameter in _written:
+                _affected.update(parameter.dependents)
+        else:
+            _affected = set(_list)
+        _queried = [parameter for parameter in _list if parameter in _affected and parameter.command is not None and parameter.isEnabled]
+
         # EXECUTE COMMANDS
-        logging.debug(f"setAnalyzerValue generated list of dictionaries '_list' with value {_list}")
+        logging.debug(f"setAnalyzerValue writing {[parameter.name for parameter in _written]} and querying {[parameter.name for parameter in _queried]}")
         with visaLock:
-            for parameter in _list:
-                if parameter.command is None or not parameter.isEnabled:
-                    continue
-                # Issue command with argument
-                if parameter.arg is not None:
-                    self.Vi.openRsrc.write(f'{parameter.command} {parameter.arg}')
-
-                # Issue command as query
+            # Writing to the frequency axis (or a full query with no arguments) makes the cached x axis stale
+            if not _written or any(parameter in _written for parameter in SWEEP_AXIS_PARAMETERS):
+                self.sweepAxis.invalidate()
+            # Issue every write and query in a single semicolon chained message, except the commands the device did not answer before (e.g. R&S only commands on
+            # a Keysight instrument), which would break it
+            _isBatched = lambda parameter: parameter.command not in self.Vi.unbatchedCommands
+            _batchedWrites = [parameter for parameter in _written if _isBatched(parameter)]
+            _batchedQueries = [parameter for parameter in _queried if _isBatched(parameter)]
+            try:
+                buffers = self.Vi.queryBatch(
+                    writes=[f'{parameter.command} {parameter.arg}' for parameter in _batchedWrites],
+                    queries=[f'{parameter.command}?' for parameter in _batchedQueries]
+                )
+            except (visa.errors.VisaIOError, ValueError) as e:
+                # A command the device does not recognize breaks the whole message, fall back to one round trip per parameter so it can be found and disabled
+                logging.verbose(f'Batched query raised {type(e).__name__}: {e}. Querying parameters individually.')
+                try:
+                    self.Vi.openRsrc.clear()
+                except visa.errors.VisaIOError:
+                    pass
+                buffers = None
+            if buffers is not None:
+                for parameter, buffer in zip(_batchedQueries, buffers):
+                    _setValue(parameter, [buffer])
+                _written = [parameter for parameter in _written if not _isBatched(parameter)]
+                _queried = [parameter for parameter in _queried if not _isBatched(parameter)]
+            for parameter in _written:
+                self.Vi.openRsrc.write(f'{parameter.command} {parameter.arg}')
+            for parameter in _queried:
                 buffer = _query(parameter)
                 if buffer == ViConstants.VI_ERROR_TMO:
+                    self.Vi.unbatchedCommands.add(parameter.command)
                     if parameter.commandList:
                         for newCommand in parameter.commandList[:]:
                             parameter.renewCommand(newCommand)
                             buffer = _query(parameter)
+                            if buffer == ViConstants.VI_ERROR_TMO:
+                                self.Vi.unbatchedCommands.add(parameter.command)
                     else:
                         continue
                 if not buffer == ViConstants.VI_ERROR_TMO:
-                    parameter.enable()
-                    logging.verbose(f"Command {parameter.command}? returned {buffer}")
-                    parameter.update(value=buffer)
-                    if parameter.tkvar:
-                        clearAndSetWidget(parameter.tkvar, buffer)
-                    else:
-                        clearAndSetWidget(parameter.widget, buffer)
+                    _setValue(parameter, buffer)
         # Set plot limits
         with specPlotLock:
             self.setAnalyzerPlotLimits()
@@ -1388,27 +1435,13 @@ class SpecAn(FrontEnd):
         """Sets the state of the icon widgets depending on their value in self.operationStatusRegister
         """
         osr = self.operationStatusRegister
-        if osr & 0b00000001:
-            self.calibratingIcon.configure(state='enable')
-        else:
-            self.calibratingIcon.configure(state='disable')
-        if osr & 0b00000010:
-            self.settlingIcon.configure(state='enable')
-        else:
-            self.settlingIcon.configure(state='disable')
-        if osr & 0b00001000:
-            self.sweepingIcon.configure(state='enable')
-        else:
-            self.sweepingIcon.configure(state='disable')
-        if osr & 0b00010000:
-            self.measuringIcon.configure(state='enable')
-        else:
-            self.measuringIcon.configure(state='disable')
+        for bit, icon in ((0b00000001, self.calibratingIcon), (0b00000010, self.settlingIcon), (0b00001000, self.sweepingIcon), (0b00010000, self.measuringIcon)):
+            dispatcher.configure(icon, state='enable' if osr & bit else 'disable')
 
     def analyzerDisplayLoop(self):
         """Spectrum analyzer display loop. Constantly fetches the spectrum analyzer xy values and plots it in the matplotlib canvas.
         """
-        yAxisOld = []
+        yAxisOld = None
         while TRUE:
             match self.loopState:
                 case state.IDLE:
@@ -1417,7 +1450,7 @@ class SpecAn(FrontEnd):
                 case state.LOOP:
                     try:
                         if visaLock.acquire(blocking=False) is False:   # This returns true if lock was successfully acquired
-                            self.lockedIcon.configure(state='enable')
+                            dispatcher.configure(self.lockedIcon, state='enable')
                             time.sleep(ANALYZER_REFRESH_DELAY)
                             continue
                         else:
@@ -1426,12 +1459,14 @@ class SpecAn(FrontEnd):
                         # Update the osr and call the state machine
                         self.operationStatusRegister = self.Vi.getOperationRegister()
                         self.osrStateMachine()
-                        self.lockedIcon.configure(state='disable')
-                        # :FETCH:SAN? doesn't fetch if a sweep is in progress, this big ole mess is a workaround for that
-                        startFreq = float(self.Vi.openRsrc.query_ascii_values(":SENS:FREQ:START?")[0])
-                        stopFreq = float(self.Vi.openRsrc.query_ascii_values(":SENS:FREQ:STOP?")[0])
-                        sweepPoints = int(self.Vi.openRsrc.query_ascii_values(":SENS:SWEEP:POINTS?")[0])
-                        yAxis = self.Vi.openRsrc.query_ascii_values(":TRACE:DATA? TRACE1")
+                        dispatcher.configure(self.lockedIcon, state='disable')
+                        # :FETCH:SAN? doesn't fetch if a sweep is in progress, so the x axis is rebuilt from the cached sweep axis instead
+                        if not self.sweepAxis.isValid():
+                            self.sweepAxis.refresh(self.Vi)
+                        yAxis = self.Vi.queryTrace(":TRACE:DATA? TRACE1")
+                        if len(yAxis) != self.sweepAxis.sweepPoints:   # Sweep points were changed on the instrument
+                            self.sweepAxis.refresh(self.Vi)
+                        xAxis = self.sweepAxis.xAxis
                         # currAvgCount = self.Vi.openRsrc.query_ascii_values(":SENS:AVER:COUNT:CURR?")
                         # clearAndSetWidget(self.currAvgCountEntry, currAvgCount)
                         buffer = True
@@ -1439,30 +1474,69 @@ class SpecAn(FrontEnd):
                     except Exception as e:
                         visaLock.release()
                         logging.error(f'{type(e).__name__}: {e}')
-                        self.loopStateHandler(toState=state.IDLE)
+                        self.loopState = state.IDLE
+                        dispatcher.post(None, self.loopStateHandler, toState=state.IDLE)
                         buffer = None
                     if buffer:
+                        newTrace = not np.array_equal(yAxis, yAxisOld)
+                        yAxisOld = yAxis
                         with specPlotLock:
                             try:
-                                if 'lines' in locals():     # Remove previous plot if it exists
-                                    yAxisOld = self.ax.lines[0].get_data()[1].tolist()   # Save the currently plotted y data
-                                    lines.pop(0).remove()
-                                stepSize = (stopFreq - startFreq) / (sweepPoints - 1)
-                                xAxis = np.zeros(sweepPoints)
-                                xAxis[0] = startFreq
-                                for index in range(sweepPoints - 1):
-                                    xAxis[index + 1] = xAxis[index] + stepSize
-                                lines = self.ax.plot(xAxis, yAxis, color=self.color, marker=self.marker, linestyle=self.linestyle, linewidth=self.linewidth, markersize=self.markersize)
-                                self.ax.grid(visible=True)
-                                self.spectrumDisplay.draw()
+                                self.spectrumLine.setData(xAxis, yAxis)
+                                if self.waterfall is not None and newTrace:
+                                    self.updateWaterfall(xAxis, yAxis)
                             except Exception as e:
                                 logging.fatal(f'{type(e).__name__}: {e}')
                                 pass
-                        if 'yAxisOld' in locals():
-                            if yAxis != yAxisOld:
-                                TimeParameter.update(value=datetime.now(LOCAL_TIMEZONE).isoformat())
+                        # Frames that are not rendered before the next one is posted are dropped
+                        dispatcher.post((self, 'renderSpectrum'), self.renderSpectrum)
+                        if newTrace:
+                            TimeParameter.update(value=datetime.now(LOCAL_TIMEZONE).isoformat())
                     time.sleep(ANALYZER_REFRESH_DELAY)
 
+    def renderSpectrum(self):
+        """Draws the spectrum canvas from the main loop. Only the animated artists are redrawn over the cached background, unless the axes changed since the last
+        render.
+        """
+        with specPlotLock:
+            try:
+                axesState = self.axesState()
+                if axesState != self.renderedAxesState:
+                    self.spectrumDisplay.draw()
+                    self.renderedAxesState = axesState
+                else:
+                    self.blitManager.update()
+            except Exception as e:
+                logging.fatal(f'{type(e).__name__}: {e}')
+
+    def axesState(self):
+        """Returns the limits and labels of the spectrum plot, which are part of the cached background of the canvas and require a full redraw when they change."""
+        return (self.ax.get_xlim(), self.ax.get_ylim(), self.xLabelAx.get_xlabel(), self.ax.get_ylabel())
+
+    def styleLine(self):
+        """Applies the plot parameters set by setPlotParam to the spectrum line, None selects the matplotlib default like in pyplot.plot (the first colour of
+        the property cycle for the colour)."""
+        self.line.set_color(plt.rcParams['axes.prop_cycle'].by_key()['color'][0] if self.color is None else self.color)
+        for name in ('marker', 'linestyle', 'linewidth', 'markersize'):
+            value = getattr(self, name)
+            self.line.set(**{name: plt.rcParams[f'lines.{name}'] if value is None else value})
+
+    def updateWaterfall(self, xAxis, yAxis):
+        """Adds a sweep to the live waterfall and updates its image in place. The colour scale follows the y limits of the spectrum plot. Must be called with
+        specPlotLock held, the image is drawn by the next draw or blit of the spectrum canvas.
+
+        Args:
+            xAxis (array_like): X axis of the sweep.
+            yAxis (array_like): Y axis data points of the sweep.
+        """
+        self.waterfall.append(yAxis)
+        self.wfImage.set_data(self.waterfall.image())
+        extent = (xAxis[0], xAxis[-1], 0, self.waterfall.rows)
+        if tuple(self.wfImage.get_extent()) != extent:
+            self.wfImage.set_extent(extent)
+            self.wfAx.set_ylim(0, self.waterfall.rows)
+        self.wfImage.set_clim(*self.ax.get_ylim())
+
     def setPlotThreadHandler(self, color=None, marker=None, linestyle=None, linewidth=None, markersize=None):
         """Generates thread to issue setPlotParam.
 
@@ -1493,14 +1567,17 @@ class SpecAn(FrontEnd):
                 color = colorchooser.askcolor(initialcolor=self.color)[1]
             else:
                 color = colorchooser.askcolor(initialcolor='#1f77b4')[1]
+            if color is None:   # Colour chooser cancelled
+                color = self.color
         with specPlotLock:
             self.color = color
             self.marker = marker
             self.linestyle = linestyle
             self.linewidth = linewidth
             self.markersize = markersize
+            self.styleLine()
             
-class AziElePlot(FrontEnd):
+class AziElePlot(FrontEnd, Notifier):
     """Generates tkinter-embedded matplotlib graph of spectrum analyzer. Requires an instance of FrontEnd to be constructed with the name Front_End.
 
     Args:
@@ -1508,6 +1585,8 @@ class AziElePlot(FrontEnd):
         parentWidget (tk::LabelFrame, tk::Frame): Parent widget which will contain graph and control widgets.
     """
     def __init__(self, Motor, parentWidget):
+        Notifier.__init__(self)
+
         # MOTOR INSTANCE
         self.Motor = Motor
 
@@ -1517,7 +1596,7 @@ class AziElePlot(FrontEnd):
         self.parent.columnconfigure(0, weight=1)
 
         # STATE VARIABLES
-        self.loopState = state.IDLE
+        self._loopState = state.IDLE
         self.axis0 = False              # Keeps track of drive x and y states so they can be accessed by the main thread to update status buttons in class FrontEnd
         self.axis1 = False
 
@@ -1635,25 +1714,23 @@ class AziElePlot(FrontEnd):
         motorLoop = threading.Thread(target=self.bearingDisplayLoop, daemon=True)
         motorLoop.start()
 
-    def iconStateMachine(self):
-        _bits = [
-            'BIT8465', 'BIT8497',
-            'BIT792', 'BIT824',
-            'BIT8467', 'BIT8499'
-        ]
+    def iconStateMachine(self, bits):
+        """Enables the drive status icons whose bit is set.
+
+        Args:
+            bits (list[int]): Values of MOTOR_STATUS_BITS, see MotorIO.queryPrint.
+        """
         _icons = [self.xDriveEnable, self.yDriveEnable,
                   self.xActive, self.yActive,
                   self.xKamr, self.yKamr
         ]
 
-        for bit, icon in zip(_bits, _icons):
-            if self.queryBit(bit):
-                icon.configure(state='enable')
-            else:
-                icon.configure(state='disable')
+        for bit, icon in zip(bits, _icons):
+            dispatcher.configure(icon, state='enable' if bit else 'disable')
 
     def drawArrow(self, axis, angle):
-        """Draws arrow on the matplotlib axis from the origin at the angle specified. Intended for polar plots only.
+        """Draws arrow on the matplotlib axis from the origin at the angle specified. Intended for polar plots only. Must be called from the main loop, worker threads
+        post it with UiDispatcher.
 
         Args:
             axis (plt.subplots): Matplotlib axis
@@ -1674,7 +1751,7 @@ class AziElePlot(FrontEnd):
                     pass
                 self.elArrow = axis.arrow(angle/180.*np.pi, 0, 0, 0.8, alpha = 1, width = 0.03, edgecolor = 'blue', facecolor = 'blue', lw = 3, zorder = 5)
 
-        self.bearingDisplay.draw()
+        self.bearingDisplay.draw_idle()     # Both arrows of a drain are drawn together
 
     def threadHandler(self, target, *event, **kwargs):
         """Generates a new thread to handle IO routines without blocking main thread. For most operations, this should be used instead of calling target methods directly.
@@ -1704,14 +1781,14 @@ class AziElePlot(FrontEnd):
                 self.Motor.write(f'jog inc x {value}')
                 time.sleep(0.1)
                 self.Motor.flushInput()
-            self.azCmdLabel.configure(text = f'{value}{u'\N{DEGREE SIGN}'}')
+            dispatcher.configure(self.azCmdLabel, text = f'{value}{u'\N{DEGREE SIGN}'}')
 
         elif axis == 'el' and value is not None:
             with motorLock:
                 self.Motor.write(f'jog inc y {value}')
                 time.sleep(0.1)
                 self.Motor.flushInput()
-            self.elCmdLabel.configure(text = f'{value}{u'\N{DEGREE SIGN}'}')
+            dispatcher.configure(self.elCmdLabel, text = f'{value}{u'\N{DEGREE SIGN}'}')
 
         # Disable inputs. If done correctly, the loop thread should enable inputs when bit 516 is 0
         # self.toggleInputs(DISABLE)
@@ -1755,6 +1832,18 @@ class AziElePlot(FrontEnd):
         """
         self.loopState = val
 
+    @property
+    def loopState(self):
+        """State of bearingDisplayLoop, subscribers are notified when it changes."""
+        return self._loopState
+
+    @loopState.setter
+    def loopState(self, value):
+        changed = value != self._loopState
+        self._loopState = value
+        if changed:
+            self.notify()
+
     def bearingDisplayLoop(self):
         """Main motor bearing state machine. Initializes motor, drives, prog, etc. and plots direction in the matplotlib canvas.
         """
@@ -1762,7 +1851,7 @@ class AziElePlot(FrontEnd):
             match self.loopState:
                 case state.IDLE:
                     # Prevent this thread from taking up too much utilization
-                    self.toggleInputs(DISABLE)
+                    dispatcher.post((self, 'toggleInputs'), self.toggleInputs, DISABLE)
                     time.sleep(IDLE_DELAY)
                     continue
             
@@ -1777,7 +1866,7 @@ class AziElePlot(FrontEnd):
                     self.loopState = state.IDLE
 
                 case state.INIT:
-                    self.toggleInputs(DISABLE)
+                    dispatcher.post((self, 'toggleInputs'), self.toggleInputs, DISABLE)
                     try:
                         motorLock.acquire()
                         self.Motor.write('\n')
@@ -1800,10 +1889,13 @@ class AziElePlot(FrontEnd):
                         motorLock.release()
 
                 case state.LOOP:
-                    self.toggleInputs(ENABLE)
+                    dispatcher.post((self, 'toggleInputs'), self.toggleInputs, ENABLE)
                     try:
                         motorLock.acquire()
-                        self.iconStateMachine()
+                        # Status bits and encoder positions (P6144 for x, P6160 for y) in one round trip
+                        values = self.Motor.queryPrint(MOTOR_STATUS_BITS + MOTOR_ENCODER_PARAMETERS)
+                        self.iconStateMachine(values[:len(MOTOR_STATUS_BITS)])
+                        xEnc, yEnc = values[len(MOTOR_STATUS_BITS):]
                         # Check bit 516 (In motion) to determine whether or not to allow inputs
                         # TODO: Find out why bit 516 returns 0 even when moving
                         # response = self.Motor.query('PRINT P516').splitlines()
@@ -1813,32 +1905,16 @@ class AziElePlot(FrontEnd):
                         #             self.toggleInputs(ENABLE)
                         #         case '1':
                         #             self.toggleInputs(DISABLE)
-                        # query P6144 (x) and P6160 (y) for encoder position
-                        response = self.Motor.query('PRINT P6144').splitlines()
-                        for i in response:
-                            if 'P00' in i or 'PRINT' in i:
-                                response.remove(i)
-                        if len(response) > 1:
-                            raise ValueError(f'Encoder query expected 1 line and returned {len(response)}: {response}')
-                        xEnc = int(response[0])
-
-                        response = self.Motor.query('PRINT P6160').splitlines()
-                        for i in response:
-                            if 'P00' in i or 'PRINT' in i:
-                                response.remove(i)
-                        if len(response) > 1:
-                            raise ValueError(f'Encoder query expected 1 line and returned {len(response)}: {response}')
-                        yEnc = int(response[0])
 
                         # Calculate position in degrees
                         xPos = round((xEnc - X_HOME) / X_CPD, 4)
                         yPos = round((yEnc - Y_HOME) / Y_CPD, 4)
                         # Draw arrows on respective axes
-                        self.drawArrow(self.azAxis, xPos)
-                        self.drawArrow(self.elAxis, yPos)
+                        dispatcher.post((self.azAxis, 'arrow'), self.drawArrow, self.azAxis, xPos)
+                        dispatcher.post((self.elAxis, 'arrow'), self.drawArrow, self.elAxis, yPos)
                         # Set readout widgets
-                        self.azLabel.configure(text = f'{xPos}{u'\N{DEGREE SIGN}'}')
-                        self.elLabel.configure(text = f'{yPos}{u'\N{DEGREE SIGN}'}')
+                        dispatcher.configure(self.azLabel, text = f'{xPos}{u'\N{DEGREE SIGN}'}')
+                        dispatcher.configure(self.elLabel, text = f'{yPos}{u'\N{DEGREE SIGN}'}')
                         # TODO: Check if motors are moving and enable/disable inputs
                     except Exception as e:
                         logging.error(f'{type(e).__name__}: {e}')
@@ -1853,6 +1929,7 @@ class AziElePlot(FrontEnd):
         Raises:
             NotImplementedError: If the motor controller does not return DRIVE ON or DRIVE OFF
         """
+        axes = (self.axis0, self.axis1)
         with motorLock:
             # Check if drive responded correctly here and set status buttons.
             drive = self.Motor.query('DRIVE X')
@@ -1869,6 +1946,8 @@ class AziElePlot(FrontEnd):
                 self.axis0 = False
             else:
                 raise NotImplementedError(f'Unexpected response from AXIS1: {drive}')
+        if (self.axis0, self.axis1) != axes:
+            self.notify()
             
     def queryBit(self, bit:str) -> bool:
         with motorLock:
@@ -1883,99 +1962,94 @@ class AziElePlot(FrontEnd):
 # Thread target to monitor IO connection status
 def statusMonitor(FrontEnd, Vi, Motor, PLC, Azi_Ele):
     """Thread target to monitor IO connection statuses and reflect their state in FrontEnd buttons.
+
+    The monitor waits for notifications from Vi, Motor, PLC, Azi_Ele and automation, or STATUS_MONITOR_TIMEOUT seconds at most, then works out the state of every
+    status widget and only configures the widgets whose text or background differs from what was last rendered.
     """
-    global autoState
+    changed = threading.Event()
+    for source in (Vi, Motor, PLC, Azi_Ele, automation):
+        source.subscribe(lambda source: changed.set())
+    rendered = {}   # (widget, option) mapped to the last value passed to FrontEnd.setStatus
+
+    def setStatus(widget, text=None, background=None):
+        if text is not None and rendered.get((widget, 'text')) != text:
+            rendered[(widget, 'text')] = text
+            FrontEnd.setStatus(widget, text=text)
+        if background is not None and rendered.get((widget, 'background')) != background:
+            rendered[(widget, 'background')] = background
+            FrontEnd.setStatus(widget, background=background)
+
+    def selectButton(buttons, selected):
+        for button in buttons:
+            setStatus(button, background=FrontEnd.SELECT_BACKGROUND if button is selected else FrontEnd.DEFAULT_BACKGROUND)
+
     while True:
+        changed.clear()
+
         # VISA
         try:
             Vi.openRsrc.session
-            FrontEnd.setStatus(FrontEnd.visaStatus, text='Connected')
+            setStatus(FrontEnd.visaStatus, text='Connected')
         except:
-            FrontEnd.setStatus(FrontEnd.visaStatus, text='NC')
+            setStatus(FrontEnd.visaStatus, text='NC')
 
         # MOTOR
         if Motor.ser.is_open:
-            FrontEnd.setStatus(FrontEnd.motorStatus, text='Connected')
+            setStatus(FrontEnd.motorStatus, text='Connected')
         else: 
-            FrontEnd.setStatus(FrontEnd.motorStatus, text='NC')
+            setStatus(FrontEnd.motorStatus, text='NC')
         match Azi_Ele.loopState:
             case state.IDLE:
-                for button in FrontEnd.MODE_BUTTONS_LIST:
-                    if button is FrontEnd.standbyButton:
-                        background=FrontEnd.SELECT_BACKGROUND
-                    else:
-                        background=FrontEnd.DEFAULT_BACKGROUND
-                    FrontEnd.setStatus(button, background=background)
+                selectButton(FrontEnd.MODE_BUTTONS_LIST, FrontEnd.standbyButton)
             case state.INIT:
-                for button in FrontEnd.MODE_BUTTONS_LIST:
-                    FrontEnd.setStatus(button, background=FrontEnd.DEFAULT_BACKGROUND)
+                selectButton(FrontEnd.MODE_BUTTONS_LIST, None)
             case state.LOOP:
-                for button in FrontEnd.MODE_BUTTONS_LIST:
-                    if button is FrontEnd.manualButton:
-                        background=FrontEnd.SELECT_BACKGROUND
-                    else:
-                        background=FrontEnd.DEFAULT_BACKGROUND
-                    FrontEnd.setStatus(button, background=background)
+                selectButton(FrontEnd.MODE_BUTTONS_LIST, FrontEnd.manualButton)
         match Azi_Ele.axis0:
             case True:
-                FrontEnd.setStatus(FrontEnd.azStatus, text='ENABLED')
+                setStatus(FrontEnd.azStatus, text='ENABLED')
             case False:
-                FrontEnd.setStatus(FrontEnd.azStatus, text='STOPPED')
+                setStatus(FrontEnd.azStatus, text='STOPPED')
         match Azi_Ele.axis1:
             case True:
-                FrontEnd.setStatus(FrontEnd.elStatus, text='ENABLED')
+                setStatus(FrontEnd.elStatus, text='ENABLED')
             case False:
-                FrontEnd.setStatus(FrontEnd.elStatus, text='STOPPED')
+                setStatus(FrontEnd.elStatus, text='STOPPED')
 
         # PLC
         if PLC.serial.is_open:
-            FrontEnd.setStatus(FrontEnd.plcStatus, text='Connected')
+            setStatus(FrontEnd.plcStatus, text='Connected')
         else: 
-            FrontEnd.setStatus(FrontEnd.plcStatus, text='NC')
+            setStatus(FrontEnd.plcStatus, text='NC')
         if PLC.status & opcodes.WLIGHT_ON.value:
-            FrontEnd.setStatus(FrontEnd.wlightButton, background=FrontEnd.SELECT_BACKGROUND)
+            setStatus(FrontEnd.wlightButton, background=FrontEnd.SELECT_BACKGROUND)
         else:
-            FrontEnd.setStatus(FrontEnd.wlightButton, background=FrontEnd.DEFAULT_BACKGROUND)
+            setStatus(FrontEnd.wlightButton, background=FrontEnd.DEFAULT_BACKGROUND)
         match PLC.status & opcodes.WLIGHT_CLR.value:
             case opcodes.SLEEP.value:
-                for button in FrontEnd.PLC_OUTPUTS_LIST:
-                    if button is FrontEnd.sleepP1Button:
-                        background=FrontEnd.SELECT_BACKGROUND
-                    else:
-                        background=FrontEnd.DEFAULT_BACKGROUND
-                    FrontEnd.setStatus(button, background=background)
+                selectButton(FrontEnd.PLC_OUTPUTS_LIST, FrontEnd.sleepP1Button)
                 FrontEnd.chainSelect = 'SLEEP'
             case opcodes.P1_INIT.value:
-                FrontEnd.setStatus(FrontEnd.initP1Button, background=FrontEnd.SELECT_BACKGROUND)
+                setStatus(FrontEnd.initP1Button, background=FrontEnd.SELECT_BACKGROUND)
             case opcodes.P1_DISABLE.value:
-                for button in FrontEnd.PLC_OUTPUTS_LIST:
-                    FrontEnd.setStatus(button, background=FrontEnd.DEFAULT_BACKGROUND)
-                FrontEnd.setStatus(FrontEnd.initP1Button, background=FrontEnd.DEFAULT_BACKGROUND)
+                selectButton(FrontEnd.PLC_OUTPUTS_LIST, None)
+                setStatus(FrontEnd.initP1Button, background=FrontEnd.DEFAULT_BACKGROUND)
                 FrontEnd.chainSelect = 'SLEEP'
             case opcodes.DFS_CHAIN1.value:
-                for button in FrontEnd.PLC_OUTPUTS_LIST:
-                    if button is FrontEnd.dfs1Button:
-                        background=FrontEnd.SELECT_BACKGROUND
-                    else:
-                        background=FrontEnd.DEFAULT_BACKGROUND
-                    FrontEnd.setStatus(button, background=background)
+                selectButton(FrontEnd.PLC_OUTPUTS_LIST, FrontEnd.dfs1Button)
                 FrontEnd.chainSelect = 'DFS1'
             case opcodes.EMS_CHAIN1.value:
-                for button in FrontEnd.PLC_OUTPUTS_LIST:
-                    if button is FrontEnd.ems1Button:
-                        background=FrontEnd.SELECT_BACKGROUND
-                    else:
-                        background=FrontEnd.DEFAULT_BACKGROUND
-                    FrontEnd.setStatus(button, background=background)
+                selectButton(FrontEnd.PLC_OUTPUTS_LIST, FrontEnd.ems1Button)
                 FrontEnd.chainSelect = 'EMS1'
                 
         match automation.state:
             case state.IDLE:
-                FrontEnd.setStatus(FrontEnd.autoStartStopButton, background=FrontEnd.DEFAULT_BACKGROUND)
+                setStatus(FrontEnd.autoStartStopButton, background=FrontEnd.DEFAULT_BACKGROUND)
             case state.AUTO:
-                FrontEnd.setStatus(FrontEnd.autoStartStopButton, background=FrontEnd.SELECT_BACKGROUND)
-                
-        time.sleep(STATUS_MONITOR_DELAY)
+                setStatus(FrontEnd.autoStartStopButton, background=FrontEnd.SELECT_BACKGROUND)
+
+        if changed.wait(STATUS_MONITOR_TIMEOUT):
+            time.sleep(STATUS_MONITOR_DELAY)
 
 # Root tkinter interface (contains Front_End and standard output console)
 root = ThemedTk(theme=cfg['theme']['ttk'])
@@ -1983,6 +2057,7 @@ root.title('New Mexico Spectrum Monitor Control')
 root.option_add('*TButton*takeFocus', 0)
 root.option_add('*TCombobox*takeFocus', 0)
 isNumWrapper = root.register(isNumber)
+dispatcher = UiDispatcher(root, UI_INTERVAL, UI_BUDGET)    # Widget updates and canvas draws posted by worker threads
 
 # Change combobox highlight colors to match entry
 dummy = ttk.Entry()
@@ -2008,6 +2083,7 @@ consoleFrame.columnconfigure(0, weight=1)
 console = tk.Text(consoleFrame, height=15)
 console.grid(column=0, row=0, sticky=(N, S, E, W))
 console.config(state=DISABLED)
+consoleSink = ConsoleSink(root, console, CONSOLE_INTERVAL, CONSOLE_MAX_LINES)     # Buffers print/logging output from every thread for the console
 # Scrollbar
 consoleScroll = ttk.Scrollbar(consoleFrame, orient=VERTICAL, command=console.yview)
 console.configure(yscrollcommand=consoleScroll.set)
@@ -2085,17 +2161,6 @@ def executeHandler(event, arg):
     except Exception as e:
         logging.terminal(f'{type(e).__name__}: {e}')
 
-def redirector(inputStr):           # Redirect print/logging statements to the console textbox
-    """Redirects print/logging statements to the console textbox and automatically scrolls down.
-
-    Args:
-        inputStr (string): String to print/log from sys.stdout.write and sys.stderr.write
-    """
-    console.config(state=NORMAL)
-    console.insert(END, inputStr)
-    console.yview(MOVETO, 1)
-    console.config(state=DISABLED)
-
 def checkbuttonStateHandler():
     """Handler function that disables the 'Print Return Value' checkbutton when execBool is true.
     """
@@ -2125,7 +2190,54 @@ def openSaveDialog(type):
         if filename != '':
             Spec_An.fig.savefig(filename)
 
-def saveTrace(f=None, filePath=None, xdata=None, ydata=None, rcvrSuffix=''):
+def snapshotParameters():
+    """Returns the names and last queried values of the parameters saved in trace csvs, with quotes, brackets, etc. removed from the values.
+
+    Returns:
+        list[tuple[str, str]]: (name, value) pairs in the order of Parameter.instances.
+    """
+    header = []
+    for parameter in Parameter.instances:
+        if parameter.log == False:
+            continue
+        if isinstance(parameter.value, (list,)):
+            try:
+                value = parameter.value[0].strip("[]{}()#* \n\t")
+            except:
+                value = str(parameter.value).strip("[]{}()#* \n\t")
+        else:
+            value = str(parameter.value).strip("[]{}()#* \n\t")
+        header.append((parameter.name, value))
+    return header
+
+def queueTrace(filePath, xdata, ydata, rcvrSuffix=''):
+    """Captures the parameter header, receiver, and time of a trace and queues it to be written by the trace writer threads. Returns once the trace is queued, so the caller can
+    acquire the next trace without waiting for storage.
+
+    Args:
+        filePath (string): Directory to save the trace in.
+        xdata (list): List of x data points to save.
+        ydata (list): List of y data points to save.
+        rcvrSuffix (str, optional): String appended to the receiver name in the file name. Defaults to ''.
+
+    Returns:
+        bool: True if the trace was queued, False if it was dropped because the queue stayed full.
+    """
+    record = TraceRecord(xdata, ydata, snapshotParameters(), datetime.now(), Front_End.chainSelect + rcvrSuffix, filePath)
+    return tracePipeline.put(record)
+
+def writeTraceRecord(record):
+    """Writes a TraceRecord taken from the trace writer queue.
+
+    Args:
+        record (TraceRecord): Trace to write.
+    """
+    if TRACE_STORAGE in ('archive', 'both'):
+        TraceArchive.forTrace(record.filePath, record.receiver, record.timestamp).append(record.xdata, record.ydata, record.header, record.timestamp)
+    if TRACE_STORAGE != 'archive':
+        saveTrace(filePath=record.filePath, xdata=record.xdata, ydata=record.ydata, header=record.header, receiver=record.receiver, timestamp=record.timestamp)
+
+def saveTrace(f=None, filePath=None, xdata=None, ydata=None, rcvrSuffix='', header=None, receiver=None, timestamp=None):
     """Saves trace as csv to the file object passed in f or the filePath string. If filePath points to an existing file, an iterating integer is appended to the file name until an unused name is found. This function is blocking and should only be called outside of the main thread.
 
     Args:
@@ -2133,6 +2245,10 @@ def saveTrace(f=None, filePath=None, xdata=None, ydata=None, rcvrSuffix=''):
         filePath (string, optional): File path to save to if f is None. Defaults to None.
         xdata (list, optional): List of x data points to save. If None, get x data points from plot. Defaults to None.
         ydata (list, optional): List of y data points to save. If None, get y data points from plot. Defaults to None.
+        rcvrSuffix (str, optional): String appended to the receiver name in the file name. Defaults to ''.
+        header (list[tuple[str, str]], optional): (name, value) pairs to save as the trace header. If None, use the current values from snapshotParameters(). Defaults to None.
+        receiver (str, optional): Receiver name used as the file name prefix. If None, use Front_End.chainSelect. Defaults to None.
+        timestamp (datetime, optional): Acquisition time used for the date in the file name. If None, use the current time. Defaults to None.
 
     Raises:
         AttributeError: If both f and filePath is None
@@ -2140,46 +2256,37 @@ def saveTrace(f=None, filePath=None, xdata=None, ydata=None, rcvrSuffix=''):
     if f is None:
         if filePath is None:
             raise AttributeError('saveTrace did not receive any arguments.')
+        if receiver is None:
+            receiver = Front_End.chainSelect
+        if timestamp is None:
+            timestamp = datetime.now()
         x=0
-        fileExists = True
-        fileJoined = ''
-        while fileExists:
-            fileName = Front_End.chainSelect + rcvrSuffix + '-' + datetime.now().strftime('%Y-%m-%d') + '-' + str(x) +'.csv'
+        while f is None:
+            fileName = receiver + rcvrSuffix + '-' + timestamp.strftime('%Y-%m-%d') + '-' + str(x) +'.csv'
             fileJoined = os.path.join(filePath, fileName)
-            fileExists = os.path.exists(fileJoined)
-            x += 1
-        f = open(fileJoined, 'w')
+            try:
+                f = open(fileJoined, 'x')   # Exclusive creation so concurrent trace writers cannot claim the same file name
+            except FileExistsError:
+                x += 1
 
     try:
-        buffer = ''
         if xdata is None and ydata is None:
             with specPlotLock:
-                data = Spec_An.ax.lines[0].get_data()
+                data = Spec_An.spectrumLine.getData()
                 xdata = data[0]
                 ydata = data[1]
+        if header is None:
+            header = snapshotParameters()
         if '.txt' in f.name:
             delimiter = '\t'
         else:
             delimiter = ','
 
-        for parameter in Parameter.instances:
-            if parameter.log == False:
-                continue
-            if isinstance(parameter.value, (list,)):
-                try:
-                    value = parameter.value[0].strip("[]{}()#* \n\t")
-                except:
-                    value = str(parameter.value).strip("[]{}()#* \n\t")
-            else:
-                value = str(parameter.value).strip("[]{}()#* \n\t")
-
-            buffer = buffer + parameter.name + delimiter + value + '\n'
-
-        buffer = buffer + 'DATA\n'
-        for index in range(len(xdata)):
-            buffer = buffer + str(xdata[index]) + delimiter + str(ydata[index]) + '\n'
-        f.write(buffer)
+        writeTrace(f, header, xdata, ydata, delimiter)
         f.close()
+        if traceCatalog is not None and f.name.endswith('.csv'):
+            # writeTrace puts one row per header entry above the DATA row
+            traceCatalog.add(f.name, TraceHeader(dict(header), len(header), os.path.basename(f.name).replace('.csv', '')))
     except Exception as e:
         logging.error(f'{type(e).__name__}: {e}')
         f.close()
@@ -2451,6 +2558,7 @@ def autoStartStop():
                 else:
                     _minute = f'*/{automation.cronInterval[1]}'
                 _cronTrigger = CronTrigger(start_date = automation.cronStartDatetime, day = _day, hour = _hour, minute = _minute)
+                automation.cancelEvent.clear()
                 automation.scheduler.add_job(onSchedule, trigger=_cronTrigger)
                 automation.scheduler.resume()
                 automation.state = state.AUTO
@@ -2463,12 +2571,15 @@ def autoStartStop():
                 # if the scheduler isn't paused when adding more than 2 jobs it breaks most of the time
                 # changing trigger from date to interval fixes it?
                 # also commenting out the sys.stdout/err redirectors fixes it and i have no idea why
+                automation.cancelEvent.clear()
                 for taskDateTime in automation.queue:
                     automation.scheduler.add_job(onSchedule, trigger='date', run_date = taskDateTime)
                 automation.scheduler.resume()
                 automation.state = state.AUTO
         case state.AUTO:
             automation.scheduler.pause()
+            automation.cancelEvent.set()    # Stops running jobs waiting on Vi.waitForSweep
+            logging.info(tracePipeline.statistics())
             # Remove jobs past execution from the queue
             for _dt in automation.queue[:]:
                 if _dt < datetime.now():
@@ -2495,7 +2606,7 @@ def generateDriftDialog():
         DEF_DRIFT_TO_PATH = _toPath
         args = (_fromPath, _toPath)
         if now:
-            thread = threading.Thread(target=toDriftFormat, args=args, daemon=True)
+            thread = threading.Thread(target=runDrift, args=(args, _showProgress), daemon=True)
             thread.start()
             return
         _jobTimePicker = intervalPicker.time()
@@ -2504,12 +2615,25 @@ def generateDriftDialog():
         # Check if job is active
         _clearScheduler()
         # Add scheduled cron job
-        dwfScheduler.add_job(toDriftFormat, args=args, trigger=CronTrigger(hour=_jobTime.hour, minute=_jobTime.minute), id=DRIFT_JOB_ID, name='Convert to DRIFT Format')
+        dwfScheduler.add_job(runDrift, args=(args, _showProgress), trigger=CronTrigger(hour=_jobTime.hour, minute=_jobTime.minute), id=DRIFT_JOB_ID, name='Convert to DRIFT Format')
 
     def _clearScheduler():
         if dwfScheduler.get_job(DRIFT_JOB_ID):
             dwfScheduler.remove_job(DRIFT_JOB_ID)
 
+    def _showProgress(done, total, written, writtenBytes, elapsed):
+        # Called from the conversion thread, the dialog may have been closed by the time the update is applied
+        def _update():
+            if not _parent.winfo_exists():
+                return
+            progressBar.configure(maximum=max(total, 1), value=done if total else 1)
+            if not total:
+                progressLabel.configure(text='No traces to process.')
+                return
+            _rate = f'{written / elapsed:.1f} files/s, {writtenBytes / 1e6 / elapsed:.2f} MB/s' if elapsed > 0 else ''
+            progressLabel.configure(text=f'{done} of {total} traces, {written} converted   {_rate}')
+        dispatcher.post((_parent, 'driftProgress'), _update)
+
     def _pickFilePath(entry):
         dir = filedialog.askdirectory(parent = _parent)
         if not dir:
@@ -2571,12 +2695,81 @@ def generateDriftDialog():
     clearButton.grid(row=0, column=1, columnspan=1, sticky=NSEW, padx=ROOT_PADX, pady=ROOT_PADY)
     nowButton = ttk.Button(buttonFrame, text="Run Immediately", command=lambda: _scheduleDrift(now=True))
     nowButton.grid(row=1, column=1, columnspan=2, sticky=NSEW, padx=ROOT_PADX, pady=ROOT_PADY)
+    progressBar = ttk.Progressbar(buttonFrame, orient=HORIZONTAL, mode='determinate')
+    progressBar.grid(row=2, column=0, columnspan=2, sticky=NSEW, padx=ROOT_PADX, pady=ROOT_PADY)
+    progressLabel = ttk.Label(buttonFrame, text='')
+    progressLabel.grid(row=3, column=0, columnspan=2, sticky=W, padx=ROOT_PADX, pady=ROOT_PADY)
+
+def runDrift(args, progress=None):
+    """Calls toDriftFormat with the arguments in `args`. If [drift] max_workers in config.toml is not 1, the csvs are converted in parallel by a `drift.py`
+    subprocess and its log and progress are relayed, for the same reason as in runWaterfalls.
+
+    Args:
+        args (tuple): (tracePath, driftPath) as passed to toDriftFormat.
+        progress (callable, optional): Progress callback passed to toDriftFormat. Defaults to None.
+    """
+    _tracePath, _driftPath = args
+    if DRIFT_MAX_WORKERS == 1 or getattr(sys, 'frozen', False):
+        toDriftFormat(_tracePath, _driftPath, catalogPath=CATALOG_PATH or None, progress=progress)
+        return
+
+    _command = [sys.executable, str(Path(__file__).parent.absolute() / 'drift.py'), _tracePath, _driftPath, '--workers', str(DRIFT_MAX_WORKERS), '--relay']
+    if CATALOG_PATH:
+        _command.extend(['--catalog', CATALOG_PATH])
+    _process = subprocess.Popen(_command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+    for _line in _process.stdout:
+        _fields = _line.rstrip('\n').split('\t')
+        if _fields[0] == PROGRESS_PREFIX and len(_fields) == 6:
+            if progress is not None:
+                progress(*map(int, _fields[1:5]), float(_fields[5]))
+        elif _fields[0].isdigit() and len(_fields) > 1:
+            logging.log(int(_fields[0]), '\t'.join(_fields[1:]))
+        else:
+            logging.drift(_line.rstrip('\n'))
+    if _process.wait() != 0:
+        logging.error(f'DRIFT process exited with code {_process.returncode}')
+
+def runWaterfalls(args, regenerate=False):
+    """Calls makeWaterfalls, or regenerateWaterfalls if `regenerate` is true, with the arguments in `args`. If [waterfall] max_workers in config.toml is not 1, the
+    groups are processed in parallel by a `waterfall.py` subprocess and its log is relayed to the console. A subprocess is used because worker processes started from
+    this module would re-import it and open another GUI on platforms that spawn processes (Windows).
+
+    Args:
+        args (tuple): (frompath, topath, threshold, tz, filetype, dpi, moveFlag, makeMatpl, makePlotly, makeAvg, incremental) as passed to makeWaterfalls.
+        regenerate (bool, optional): Determines whether to call regenerateWaterfalls instead of makeWaterfalls, `incremental` is ignored. Defaults to False.
+    """
+    _fromPath, _toPath, _threshold, _timezone, _filetype, _dpi, _moveFlag, _makeMatpl, _makePlotly, _makeAvg, _incremental = args
+    if WF_MAX_WORKERS == 1 or getattr(sys, 'frozen', False):
+        if regenerate:
+            regenerateWaterfalls(*args[:-1], catalogPath=CATALOG_PATH or None)
+        else:
+            makeWaterfalls(*args[:-1], incremental=_incremental, catalogPath=CATALOG_PATH or None)
+        return
+
+    _command = [sys.executable, str(Path(__file__).parent.absolute() / 'waterfall.py'), _fromPath, _toPath, '--threshold', str(_threshold), '--tz', _timezone,
+                '--filetype', _filetype, '--dpi', str(_dpi), '--workers', str(WF_MAX_WORKERS), '--relay']
+    for _flag, _option in ((not _moveFlag, '--no-move'), (not _makeMatpl, '--no-matplotlib'), (not _makePlotly, '--no-plotly'), (not _makeAvg, '--no-average'), (regenerate, '--regenerate'),
+                            (_incremental and not regenerate, '--incremental')):
+        if _flag:
+            _command.append(_option)
+    if CATALOG_PATH:
+        _command.extend(['--catalog', CATALOG_PATH])
+    logging.waterfall(f'Starting waterfall process with {WF_MAX_WORKERS if WF_MAX_WORKERS > 0 else os.cpu_count()} workers.')
+    _process = subprocess.Popen(_command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+    for _line in _process.stdout:
+        _level, _, _message = _line.rstrip('\n').partition('\t')
+        if _level.isdigit():
+            logging.log(int(_level), _message)
+        else:
+            logging.waterfall(_line.rstrip('\n'))
+    if _process.wait() != 0:
+        logging.error(f'Waterfall process exited with code {_process.returncode}')
 
 def generateWaterfallDialog():
     _fileTypes = ('.png', '.jpg', '.pdf', '.svg')
 
     def _scheduleWaterfall(now=False, regenerate=False):
-        global DEF_WF_FROM_PATH, DEF_WF_TO_PATH, DEF_WF_THRESHOLD, DEF_WF_TZ, DEF_WF_FILETYPE, DEF_WF_DPI
+        global DEF_WF_FROM_PATH, DEF_WF_TO_PATH, DEF_WF_THRESHOLD, DEF_WF_TZ, DEF_WF_FILETYPE, DEF_WF_DPI, DEF_WF_INTERVAL
         _fromPath = fromPathEntry.get()
         _toPath = toPathEntry.get()
         _threshold = int(thEntry.get())
@@ -2587,28 +2780,31 @@ def generateWaterfallDialog():
         _makeMatpl = _makeMatplVar.get()
         _makePlotly = _makePlotlyVar.get()
         _makeAvg = _makeAvgVar.get()
-        args = (_fromPath, _toPath, _threshold, _timezone, _filetype, _dpi, _moveFlag, _makeMatpl, _makePlotly, _makeAvg)
+        _incremental = _incrementalVar.get()
+        _interval = max(int(incEntry.get()), 1)
+        args = (_fromPath, _toPath, _threshold, _timezone, _filetype, _dpi, _moveFlag, _makeMatpl, _makePlotly, _makeAvg, _incremental)
         DEF_WF_FROM_PATH = _fromPath
         DEF_WF_TO_PATH = _toPath
         DEF_WF_THRESHOLD = _threshold
         DEF_WF_TZ = _timezone
         DEF_WF_FILETYPE = _filetype
         DEF_WF_DPI = _dpi
+        DEF_WF_INTERVAL = _interval
         if now:
-            if regenerate:
-                thread = threading.Thread(target=regenerateWaterfalls, args=args, daemon=True)
-                thread.start()
-            else:
-                thread = threading.Thread(target=makeWaterfalls, args=args, daemon=True)
-                thread.start()
+            thread = threading.Thread(target=runWaterfalls, args=(args, regenerate), daemon=True)
+            thread.start()
             return
         _jobTimePicker = intervalPicker.time()
         _jobTimeString = f'{_jobTimePicker[0]}:{_jobTimePicker[1]} {_jobTimePicker[2]}'
         _jobTime = datetime.strptime(_jobTimeString, '%I:%M %p').time()
         # Check if job is active
         _clearScheduler()
+        if _incremental:
+            # Update the waterfalls of the day every few minutes instead of building them once a day
+            dwfScheduler.add_job(runWaterfalls, args=(args,), trigger=IntervalTrigger(minutes=_interval), id=WATERFALL_JOB_ID, name='Update Waterfall Plot', coalesce=True)
+            return
         # Add scheduled cron job
-        dwfScheduler.add_job(makeWaterfalls, args=args, trigger=CronTrigger(hour=_jobTime.hour, minute=_jobTime.minute), id=WATERFALL_JOB_ID, name='Generate Waterfall Plot')
+        dwfScheduler.add_job(runWaterfalls, args=(args,), trigger=CronTrigger(hour=_jobTime.hour, minute=_jobTime.minute), id=WATERFALL_JOB_ID, name='Generate Waterfall Plot')
 
     def _clearScheduler():
         if dwfScheduler.get_job(WATERFALL_JOB_ID):
@@ -2624,6 +2820,7 @@ def generateWaterfallDialog():
     _makeMatplVar = BooleanVar(value=True)
     _makePlotlyVar = BooleanVar(value=True)
     _makeAvgVar = BooleanVar(value=True)
+    _incrementalVar = BooleanVar(value=False)
 
     _parent = Toplevel()
     _parent.title('Waterfall Plot Utility')
@@ -2682,6 +2879,11 @@ def generateWaterfallDialog():
     intervalPicker.addAll(constants.HOURS12)
     intervalPicker.set12Hrs(1)
     intervalPicker.setMins(0)
+    incLabel = ttk.Label(paramsFrame, text='Incremental update every (min):')
+    incLabel.grid(row=5, column=0, padx=ROOT_PADX, pady=ROOT_PADY, sticky=W)
+    incEntry = ttk.Entry(paramsFrame, validate='key', validatecommand=(isNumWrapper, '%P'))
+    incEntry.grid(row=5, column=1, padx=ROOT_PADX, pady=ROOT_PADY, sticky=NSEW)
+    clearAndSetWidget(incEntry, DEF_WF_INTERVAL)
     sep2 = ttk.Separator(configWidgetsFrame, orient=HORIZONTAL)
     sep2.grid(row=3, column=0, columnspan=2, sticky=NSEW, padx=ROOT_PADX, pady=ROOT_PADY)
     buttonFrame = ttk.Frame(configWidgetsFrame)
@@ -2697,6 +2899,8 @@ def generateWaterfallDialog():
     makePlotlyButton.grid(row=2, column=0, sticky=NSEW, padx=ROOT_PADX, pady=ROOT_PADY)
     makeAvgButton = ttk.Checkbutton(buttonFrame, text="Generate average trace", variable=_makeAvgVar)
     makeAvgButton.grid(row=3, column=0, sticky=NSEW, padx=ROOT_PADX, pady=ROOT_PADY)
+    incrementalButton = ttk.Checkbutton(buttonFrame, text="Incremental (add new csvs to cached plots)", variable=_incrementalVar)
+    incrementalButton.grid(row=4, column=0, sticky=NSEW, padx=ROOT_PADX, pady=ROOT_PADY)
 
     scheduleButton = ttk.Button(buttonFrame, text="Schedule Job", command=_scheduleWaterfall)
     scheduleButton.grid(row=0, column=1, columnspan=1, sticky=NSEW, padx=ROOT_PADX, pady=ROOT_PADY)
@@ -2720,7 +2924,7 @@ def openTrace():
         except:
             _time = trace.header.loc['Time'].item()
         fig, ax = plt.subplots()
-        ax.plot(x, y)
+        DecimatedLine(ax, x.to_numpy(), y.to_numpy())
         ax.set_xlabel(f'Frequency ({trace.header.loc['X Axis Units'].item()})')
         ax.set_ylabel(f'Power ({trace.header.loc['Y Axis Units'].item()})')
         ax.grid(visible=True)
@@ -2735,9 +2939,10 @@ def openTrace():
 evalCheckbutton.configure(command=checkbuttonStateHandler)
 execCheckbutton.configure(command=checkbuttonStateHandler)
 
-# When sys.std***.write is called (such as on print), call redirector to print in textbox
-sys.stdout.write = redirector
-sys.stderr.write = redirector
+# When sys.std***.write is called (such as on print), buffer the text in consoleSink, which adds it to the textbox in batches
+sys.stdout.write = consoleSink.write
+sys.stderr.write = consoleSink.write
+consoleSink.start()
 
 # Check for initialization errors and print in the newly generated terminal window
 if 'cfg_error' in globals():
@@ -2750,9 +2955,12 @@ if missingKeys:
         logging.error(f'Missing key [{key}] in config.toml')
 if missingHeaders or missingKeys or 'cfg_error' in globals():
     logging.warning(f'Error loading config.toml, loading default configuration.')
+if TRACE_STORAGE not in TRACE_STORAGE_OPTIONS:
+    logging.warning(f'Invalid trace_storage "{TRACE_STORAGE}" in config.toml, expected one of {TRACE_STORAGE_OPTIONS}. Saving traces as csv.')
 
 # Generate objects within root window
-Vi = VisaIO()
+Vi = VisaIO(cfg['visa']['backend'])
+tracePipeline = AcquisitionPipeline(writeTraceRecord, maxSize=cfg['automation']['write_queue_size'], workers=cfg['automation']['write_workers'], putTimeout=cfg['automation']['write_queue_timeout'])
 Motor = MotorIO(0, 0)
 Relay = SerialIO()
 
@@ -2764,7 +2972,9 @@ Azi_Ele = AziElePlot(Motor, Front_End.directionFrame)
 statusMonitorThread = threading.Thread(target=statusMonitor, args = (Front_End, Vi, Motor, Relay, Azi_Ele), daemon=True)
 statusMonitorThread.start()
 automation.scheduler.start(paused=True)
+tracePipeline.start()
 dwfScheduler.start()
+dispatcher.start()
 Spec_An.analyzerDisplayLoopthread.start()
 
 # Bind FrontEnd buttons to methods
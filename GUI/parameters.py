@@ -0,0 +1,192 @@
+"""Spectrum analyzer parameters shown in the Front End, their SCPI commands and the parameters the device couples to each of them.
+
+Kept out of main.py so the parameter table can be imported without opening the GUI, e.g. by benchmark.py.
+"""
+
+def disableChildren(parent):
+    """Tries to set the state of the child widgets of parent to 'disable'.
+
+    Args:
+        parent (tk:widget): Parent widget whose children should be disabled.
+    """
+    for child in parent.winfo_children():
+        wtype = child.winfo_class()
+        if wtype not in ('Frame', 'LabelFrame', 'TFrame', 'TLabelframe'):
+            child.configure(state='disable')
+        else:
+            disableChildren(child)
+
+def enableChildren(parent):
+    """Tries to set the state of the child widgets of parent to 'enable' or 'normal'.
+
+    Args:
+        parent (tk:widget): Parent widget whose children should be enabled.
+    """
+    for child in parent.winfo_children():
+        wtype = child.winfo_class()
+        if wtype not in ('Frame', 'LabelFrame', 'TFrame', 'TLabelframe'):
+            try:
+                child.configure(state='enable')
+            except:
+                child.configure(state='normal')
+        else:
+            enableChildren(child)
+
+# SPECTRUM ANALYZER PARAMETERS
+class Parameter:
+    instances = []
+    def __init__(self, name, command, log=True, required=False):
+        """Spectrum analyzer parameter and associated SCPI command.
+
+        Args:
+            name (string): Full name to be used in trace csv.
+            command (string): SCPI command used to query/set parameter.
+            log (bool): Determines whether or not to save the parameter to trace csv. Defaults to True.
+            required (bool): Determines if this parameter is necessary for the program to function. Defaults to False.
+        """
+        Parameter.instances.append(self)
+        self.name = name
+        self.command = command
+        self.log = log
+        self.required = required
+        self.arg = None             # Argument to issue to the device, used in SpecAn.setAnalyzerValue
+        self.widget = None          # Widget (entry/combobox/radiobutton) which controls the parameter. In the case of radiobuttons, only one button needs to be stored here but all buttons should share a parent frame/labelframe
+        self.tkvar = None           # Tkinter variable which controls the radiobutton widget
+        self.value = None           # Last queried value for the parameter
+        self.isEnabled = True       # State of the parameter (are the widgets which controlled this parameter enabled or disabled), defaults to True and is tested each time the SpecAn state goes to state.LOOP
+        self.commandList = []       # Additional commands to try for the same Parameter, e.g. TRAC:TYPE and DISP:WIND1:SUBW:TRAC1:MODE for Keysight and R&S frameworks.
+        self.dependents = []        # Parameters whose values may change on the device when this parameter is written, re-queried by SpecAn.setAnalyzerValue
+
+    def update(self, arg:str = None, widget = None, tkvar = None, value:any = None):
+        """Update the argument/value and tkinter widget associated with the parameter.
+
+        Args:
+            arg (any, optional): Parameter argument. Defaults to None.
+            widget (ttk.Widget or Tkinter_variable, optional): Associated tkinter widget. Defaults to None.
+            value(any, optional): Parameter value. Defaults to None.
+        """
+        self.arg = arg
+        if widget is not None:
+            self.widget = widget
+        if value is not None:
+            self.value = value
+        if tkvar is not None:
+            self.tkvar = tkvar
+
+    def addCommand(self, command:str):
+        self.commandList.append(command)
+
+    def addDependents(self, *parameters):
+        """Adds parameters to `self.dependents`. When this parameter is written, SpecAn.setAnalyzerValue only re-queries it and its dependents instead of every parameter.
+
+        Args:
+            *parameters (Parameter): Parameters whose values the device may change when this parameter is written.
+        """
+        for parameter in parameters:
+            if parameter is not self and parameter not in self.dependents:
+                self.dependents.append(parameter)
+
+    def renewCommand(self, command:str):
+        """Swaps `self.command` with the string passed in `command`.
+
+        Args:
+            command (str): SCPI string in `self.commandList` to replace the active command.
+        """
+        if not isinstance(command, str):
+            raise TypeError(f"Command passed to Parameter.renewCommand did not match correct type. Expected str, received {type(command)}")
+        if command in self.commandList:
+            self.commandList.remove(command)
+            self.commandList.append(self.command)
+            self.command = command
+        else:
+            raise ValueError(f"Command {command} not found in self.commandList: {self.commandList}")
+        
+    def getValue(self, dtype: type):
+        """Python may interpret scpi return values as a list or string, sometimes with quotes, brackets or other characters. This function returns the value in the type passed in `type`.
+
+        Args:
+            dtype (type): Data type to cast on the return value.
+        
+        Returns:
+            value: `Parameter.value` in the type passed as an argument, with quotes, brackets, etc. removed.
+        """
+        if isinstance(self.value, (list,)):
+            try:
+                value = self.value[0].strip("[]{}()#* \n\t")
+            except:
+                value = str(self.value).strip("[]{}()#* \n\t")
+        else:
+            value = str(self.value).strip("[]{}()#* \n\t")
+        return dtype(value)
+
+    def disable(self):
+        if isinstance(self.widget, (type(None),)):
+            return
+        else:
+            disableChildren(self.widget.master)
+            self.isEnabled = False
+
+    def enable(self):
+        if isinstance(self.widget, (type(None),)):
+            return
+        else:
+            enableChildren(self.widget.master)
+            self.isEnabled = True
+
+CenterFreq      = Parameter('Center Frequency', ':SENS:FREQ:CENTER', log=False)
+Span            = Parameter('Span', ':SENS:FREQ:SPAN', log=False)
+StartFreq       = Parameter('Start Frequency', ':SENS:FREQ:START', required=True)
+StopFreq        = Parameter('Stop Frequency', ':SENS:FREQ:STOP', required=True)
+SweepTime       = Parameter('Sweep Time', ':SWE:TIME')
+Rbw             = Parameter('RBW', ':SENS:BANDWIDTH:RESOLUTION')
+Vbw             = Parameter('VBW', ':SENS:BANDWIDTH:VIDEO')
+BwRatio         = Parameter('VBW:3 dB RBW', ':SENS:BANDWIDTH:VIDEO:RATIO', log=False)
+Ref             = Parameter('Ref Level', ':DISP:WINDOW:TRACE:Y:RLEVEL', log=False)
+NumDiv          = Parameter('Number of Divisions', ':DISP:WINDOW:TRACE:Y:NDIV', log=False)  # Keysight
+YScale          = Parameter('Scale/Div', ':DISP:WINDOW:TRACE:Y:PDIV', log=False)            # Keysight
+YRange          = Parameter('Range', ':DISP:TRACE:Y:SCALE', log=False)                      # R&S
+Atten           = Parameter('Attenuation', ':SENS:POWER:RF:ATTENUATION')
+SpanType        = Parameter('Swept Span', ':SENS:FREQ:SPAN', log=False)
+SweepType       = Parameter('Auto Sweep Time', ':SWE:TIME:AUTO', log=False)
+RbwType         = Parameter('Auto RBW', ':SENS:BAND:RES:AUTO', log=False)
+VbwType         = Parameter('Auto VBW', ':SENS:BAND:VID:AUTO', log=False)
+BwRatioType     = Parameter('Auto VBW:RBW Ratio', ':SENS:BAND:VID:RATIO', log=False)
+RbwFilterShape  = Parameter('RBW Filter', ':SENS:BAND:SHAP')
+RbwFilterType   = Parameter('RBW Filter BW', ':SENS:BAND:TYPE')
+AttenType       = Parameter('Auto Attenuation', ':SENS:POWER:ATT:AUTO', log=False)
+XAxisUnit       = Parameter('X Axis Units', None)
+XAxisUnit.update(value='Hz')
+YAxisUnit       = Parameter('Y Axis Units', ':UNIT:POW')
+TraceType       = Parameter('Trace Type', ':TRACE:TYPE')                                    # Keysight
+TraceType.addCommand(':DISP:WIND1:SUBW:TRAC1:MODE')                                         # R&S
+AvgType         = Parameter('Average Type', ':SENS:AVER:TYPE')
+AvgAutoMan      = Parameter('Auto Average Type', ':SENS:AVER:TYPE:AUTO', log=False)
+AvgHoldCount    = Parameter('Average/Hold Count', ':SENS:AVER:COUNT', log=False)
+SweepPoints     = Parameter('Number of Points', ':SENS:SWEEP:POINTS', required=True)
+TimeParameter   = Parameter('Time', None)
+SWEEP_AXIS_PARAMETERS = (CenterFreq, Span, StartFreq, StopFreq, SpanType, SweepPoints)     # Writing any of these invalidates SpecAn.sweepAxis
+
+# PARAMETER DEPENDENCIES (Parameters coupled to the written parameter on the device, e.g. RBW and sweep time in auto follow the span)
+_COUPLED_BANDWIDTHS = (Rbw, Vbw, BwRatio, SweepTime)
+CenterFreq.addDependents(StartFreq, StopFreq)
+Span.addDependents(StartFreq, StopFreq, CenterFreq, SpanType, *_COUPLED_BANDWIDTHS)
+StartFreq.addDependents(StopFreq, CenterFreq, Span, SpanType, *_COUPLED_BANDWIDTHS)
+StopFreq.addDependents(StartFreq, CenterFreq, Span, SpanType, *_COUPLED_BANDWIDTHS)
+SpanType.addDependents(Span, StartFreq, StopFreq, CenterFreq, *_COUPLED_BANDWIDTHS)
+SweepTime.addDependents(SweepType)
+SweepType.addDependents(SweepTime)
+Rbw.addDependents(RbwType, *_COUPLED_BANDWIDTHS)
+RbwType.addDependents(*_COUPLED_BANDWIDTHS)
+Vbw.addDependents(VbwType, BwRatio, SweepTime)
+VbwType.addDependents(Vbw, BwRatio, SweepTime)
+BwRatio.addDependents(BwRatioType, Vbw, SweepTime)
+BwRatioType.addDependents(BwRatio, Vbw, SweepTime)
+RbwFilterShape.addDependents(*_COUPLED_BANDWIDTHS)
+RbwFilterType.addDependents(*_COUPLED_BANDWIDTHS)
+Ref.addDependents(Atten)
+Atten.addDependents(AttenType, Ref)
+AttenType.addDependents(Atten)
+AvgType.addDependents(AvgAutoMan)
+AvgAutoMan.addDependents(AvgType)
+SweepPoints.addDependents(SweepTime)
+TraceType.addDependents(AvgType, AvgAutoMan)
@@ -0,0 +1,159 @@
+"""Producer/consumer pipeline that decouples trace acquisition from writing traces to storage.
+
+The thread that reads a trace from the instrument only packs it into a TraceRecord and puts it in a bounded queue. One or more writer threads
+take records from the queue and write them, so the capture cadence does not depend on storage latency. When the queue is full the producer
+waits up to `putTimeout` seconds for space (backpressure) and the record is dropped if none becomes available.
+"""
+
+import logging
+import queue
+import threading
+import time
+
+class TraceRecord:
+    def __init__(self, xdata, ydata, header, timestamp, receiver, filePath):
+        """Trace and the state needed to write it, captured at acquisition time.
+
+        Args:
+            xdata (array_like): X axis data points.
+            ydata (array_like): Y axis data points.
+            header (list[tuple[str, str]]): (name, value) pairs of the logged parameters when the trace was acquired.
+            timestamp (datetime): Time the trace was acquired.
+            receiver (str): Receiver/chain name used as the file name prefix, e.g. 'EMS1'.
+            filePath (str): Directory to write the trace in.
+        """
+        self.xdata = xdata
+        self.ydata = ydata
+        self.header = header
+        self.timestamp = timestamp
+        self.receiver = receiver
+        self.filePath = filePath
+
+class AcquisitionPipeline:
+    def __init__(self, write, maxSize=16, workers=1, putTimeout=5.0, name='Trace writer'):
+        """Bounded queue of TraceRecords drained by writer threads.
+
+        Args:
+            write (callable): Function called by the writer threads with each TraceRecord.
+            maxSize (int, optional): Maximum amount of records waiting to be written. Defaults to 16.
+            workers (int, optional): Amount of writer threads. Defaults to 1.
+            putTimeout (float, optional): Seconds the producer waits for space in a full queue before dropping the record. Defaults to 5.0.
+            name (str, optional): Name used for the writer threads and log messages. Defaults to 'Trace writer'.
+        """
+        self.write = write
+        self.queue = queue.Queue(maxsize=maxSize)
+        self.workers = max(int(workers), 1)
+        self.putTimeout = putTimeout
+        self.name = name
+        self.threads = []
+        self.stopping = threading.Event()   # Set by stop(), the writer threads started with it exit after their current record
+        self.lock = threading.Lock()
+        self.queued = 0         # Records accepted into the queue
+        self.written = 0        # Records written successfully
+        self.failed = 0         # Records whose write raised an exception
+        self.dropped = 0        # Records discarded because the queue stayed full
+        self.backpressure = 0   # Times the producer had to wait for space in the queue
+        self.highWater = 0      # Largest amount of records waiting in the queue
+
+    def start(self):
+        """Starts the writer threads if they are not already running."""
+        if self.stopping.is_set():
+            # Writers of the previous start() may still be stuck in a write, they keep the event they were started with and exit when it returns
+            self.stopping = threading.Event()
+            self.threads = []
+        self.threads = [thread for thread in self.threads if thread.is_alive()]
+        for index in range(len(self.threads), self.workers):
+            thread = threading.Thread(target=self._worker, args=(self.stopping,), name=f'{self.name} {index}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Waits for the queued records to be written and stops the writer threads. Never blocks longer than `timeout`: if a writer is stuck, e.g. on a hung
+        network share, the records still queued are abandoned and the writer exits when its write returns, or with the process since writers are daemon threads.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the queue to drain, None to wait indefinitely. Defaults to None.
+
+        Returns:
+            bool: True if every queued record was handled before the timeout.
+        """
+        drained = self.join(timeout)
+        self.stopping.set()
+        # Wake the idle writers, a full queue means none of them is idle
+        for _ in self.threads:
+            try:
+                self.queue.put_nowait(self.stopping)
+            except queue.Full:
+                break
+        self.threads = []
+        return drained
+
+    def join(self, timeout=None):
+        """Blocks until every queued record has been handled by a writer thread.
+
+        Args:
+            timeout (float, optional): Seconds to wait, None to wait indefinitely. Defaults to None.
+
+        Returns:
+            bool: True if the queue was drained before the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def put(self, record):
+        """Queues `record` for writing. Called by the producer, only blocks if the queue is full.
+
+        Args:
+            record (TraceRecord): Record to write.
+
+        Returns:
+            bool: True if the record was queued, False if it was dropped.
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self.lock:
+                self.backpressure += 1
+            logging.warning(f'{self.name}: Queue full ({self.queue.maxsize} traces), waiting up to {self.putTimeout} s for storage to catch up.')
+            try:
+                self.queue.put(record, timeout=self.putTimeout)
+            except queue.Full:
+                with self.lock:
+                    self.dropped += 1
+                logging.error(f'{self.name}: Dropped trace acquired at {record.timestamp.isoformat()}, {self.dropped} dropped in total.')
+                return False
+        with self.lock:
+            self.queued += 1
+            self.highWater = max(self.highWater, self.queue.qsize())
+        return True
+
+    def statistics(self):
+        """Returns a summary of the pipeline counters for the console."""
+        with self.lock:
+            return (f'{self.name}: {self.written} written, {self.failed} failed, {self.dropped} dropped, {self.queue.qsize()} pending. '
+                    f'Producer waited on a full queue {self.backpressure} times, largest backlog {self.highWater}/{self.queue.maxsize}.')
+
+    def _worker(self, stopping):
+        while not stopping.is_set():
+            record = self.queue.get()
+            if isinstance(record, threading.Event):
+                # Wake up call of stop(), possibly left by an earlier start()
+                self.queue.task_done()
+                continue
+            try:
+                self.write(record)
+            except Exception as e:
+                with self.lock:
+                    self.failed += 1
+                logging.error(f'{self.name}: {type(e).__name__}: {e}')
+            else:
+                with self.lock:
+                    self.written += 1
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,179 @@
+"""Helpers for the live plots of the Python Front End.
+
+WaterfallBuffer keeps the last traces of the display loop in fixed size memory for the live waterfall, BlitManager redraws only the animated artists of a
+figure on top of a cached background instead of rendering the whole canvas, and DecimatedLine plots traces at screen resolution with decimateMinMax.
+"""
+
+import numpy as np
+
+def decimateMinMax(xdata, ydata, bins, xlim=None):
+    """Reduces a trace to the minimum and maximum of `bins` consecutive groups of points, so a line drawn from the result covers the same pixels as the full trace,
+    including narrowband spikes, with at most 2 * `bins` points. Traces that are already that short are returned unchanged.
+
+    Args:
+        xdata (array_like): X axis data points, ascending.
+        ydata (array_like): Y axis data points.
+        bins (int): Amount of groups, usually the width of the axes in pixels.
+        xlim (tuple, optional): (left, right) limits of the axes, only the points inside them and their neighbours are decimated. Defaults to None (all points).
+
+    Returns:
+        tuple[ndarray, ndarray]: Decimated x and y data. Each group contributes its minimum at its first x value followed by its maximum at its last x value.
+    """
+    xdata = np.asarray(xdata)
+    ydata = np.asarray(ydata)
+    if xlim is not None and xdata.size > 1 and xdata[0] <= xdata[-1]:
+        left = max(np.searchsorted(xdata, min(xlim), side='left') - 1, 0)
+        right = min(np.searchsorted(xdata, max(xlim), side='right') + 1, xdata.size)
+        if right - left > 1:
+            xdata = xdata[left:right]
+            ydata = ydata[left:right]
+    bins = max(int(bins), 1)
+    if ydata.size <= 2 * bins:
+        return xdata, ydata
+    starts = np.linspace(0, ydata.size, bins, endpoint=False).astype(np.intp)
+    ends = np.append(starts[1:], ydata.size) - 1
+    x = np.empty(2 * bins, dtype=xdata.dtype)
+    y = np.empty(2 * bins, dtype=ydata.dtype)
+    x[0::2] = xdata[starts]
+    x[1::2] = xdata[ends]
+    y[0::2] = np.minimum.reduceat(ydata, starts)
+    y[1::2] = np.maximum.reduceat(ydata, starts)
+    return x, y
+
+class DecimatedLine:
+    def __init__(self, ax, xdata, ydata, **kwargs):
+        """Line plotted from a min/max decimated copy of a trace (see decimateMinMax) with one group per horizontal pixel of `ax`. The full resolution data is kept
+        and decimated again whenever the x limits of the axes change or the canvas is resized, so zooming in shows the original points.
+
+        Args:
+            ax (Axes): Axes to plot in.
+            xdata (array_like): X axis data points, ascending.
+            ydata (array_like): Y axis data points.
+            **kwargs: Keyword arguments passed to Axes.plot.
+        """
+        self.ax = ax
+        self.line, = ax.plot([], [], **kwargs)
+        # (xdata, ydata) of the trace, replaced as a pair so the callbacks of the Tk thread never see the x axis of one trace with the y data of another
+        self.data = (np.asarray(xdata), np.asarray(ydata))
+        # The limits do not cover the data yet, decimate all of it once so autoscaling sees its full extent
+        self.line.set_data(*decimateMinMax(*self.data, self.bins()))
+        if self.data[0].size and (ax.get_autoscalex_on() or ax.get_autoscaley_on()):
+            ax.relim()
+            ax.autoscale_view()
+        # Lambdas rather than bound methods, which matplotlib only keeps weak references to, so the callbacks keep this object alive as long as the axes
+        ax.callbacks.connect('xlim_changed', lambda ax: self.redecimate())
+        ax.figure.canvas.mpl_connect('resize_event', lambda event: self.redecimate())
+
+    def bins(self):
+        """Returns the width of the axes in pixels."""
+        return max(int(self.ax.bbox.width), 1)
+
+    def setData(self, xdata, ydata):
+        """Replaces the trace and updates the line, the line is drawn by the next draw or blit of the canvas."""
+        self.data = (np.asarray(xdata), np.asarray(ydata))
+        self.redecimate()
+
+    def getData(self):
+        """Returns the full resolution (xdata, ydata) of the trace."""
+        return self.data
+
+    def redecimate(self):
+        """Decimates the trace again for the current x limits and size of the axes."""
+        xdata, ydata = self.data     # Read once, setData may replace it from the display thread
+        self.line.set_data(*decimateMinMax(xdata, ydata, self.bins(), self.ax.get_xlim()))
+
+class WaterfallBuffer:
+    def __init__(self, rows, columns=1000):
+        """Ring buffer of the last `rows` traces as a float32 matrix, allocated once and overwritten in place. Rows that were never written are NaN so they are drawn
+        as empty.
+
+        Traces wider than `columns` points are reduced to `columns` bins holding the maximum of their points, so the image stays close to the screen resolution and
+        narrowband signals remain visible however many points are swept.
+
+        Every row is written twice, at its position and `rows` positions further, so the newest `rows` traces are always a contiguous slice of the buffer and
+        image() returns them in order without copying.
+
+        Args:
+            rows (int): Amount of traces kept.
+            columns (int, optional): Maximum points per row. Defaults to 1000.
+        """
+        self.rows = max(int(rows), 1)
+        self.columns = max(int(columns), 1)
+        self.reset(0)
+
+    def reset(self, points):
+        """Clears the buffer and resizes it for traces of `points` points."""
+        self.points = int(points)
+        width = min(self.points, self.columns)
+        # Start index of the points of each bin
+        self._bins = np.linspace(0, self.points, width, endpoint=False).astype(np.intp) if self.points > self.columns else None
+        self._data = np.full((2 * self.rows, width), np.nan, dtype=np.float32)
+        self._next = 0      # Row written by the next append
+        self.count = 0      # Traces appended since the last reset
+
+    def append(self, ydata):
+        """Adds a trace as the newest row, replacing the oldest one. The buffer is cleared first if the amount of points changed.
+
+        Args:
+            ydata (array_like): Amplitudes of the trace.
+        """
+        ydata = np.asarray(ydata, dtype=np.float32)
+        if ydata.size != self.points:
+            self.reset(ydata.size)
+        row = ydata if self._bins is None else np.maximum.reduceat(ydata, self._bins)
+        self._data[self._next] = row
+        self._data[self._next + self.rows] = row
+        self._next = (self._next + 1) % self.rows
+        self.count += 1
+
+    def image(self):
+        """Returns a (rows, columns) view of the buffer ordered from the oldest to the newest trace."""
+        return self._data[self._next:self._next + self.rows]
+
+class BlitManager:
+    def __init__(self, canvas, artists=()):
+        """Redraws the animated artists of a figure without re-rendering the rest of it. The background is copied whenever the canvas is fully drawn (on resize, or
+        after draw() is called because the axes changed), and update() restores it, draws the artists and blits the figure.
+
+        Args:
+            canvas (FigureCanvasAgg): Canvas of the figure, e.g. a FigureCanvasTkAgg.
+            artists (iterable, optional): Artists to manage, see add(). Defaults to ().
+        """
+        self.canvas = canvas
+        self.background = None
+        self._artists = []
+        for artist in artists:
+            self.add(artist)
+        self.cid = canvas.mpl_connect('draw_event', self._onDraw)
+
+    def add(self, artist):
+        """Manages `artist`, which must belong to the figure of the canvas. It is marked as animated so full draws leave it out of the background."""
+        if artist.figure != self.canvas.figure:
+            raise RuntimeError('Artist does not belong to the figure of the canvas')
+        artist.set_animated(True)
+        self._artists.append(artist)
+
+    def remove(self, artist):
+        if artist in self._artists:
+            self._artists.remove(artist)
+
+    def _onDraw(self, event):
+        if event is not None and event.canvas != self.canvas:
+            raise RuntimeError('Draw event from another canvas')
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._drawAnimated()
+
+    def _drawAnimated(self):
+        figure = self.canvas.figure
+        for artist in self._artists:
+            if artist.get_visible():
+                figure.draw_artist(artist)
+
+    def update(self):
+        """Draws the managed artists over the cached background, fully drawing the canvas first if there is no background yet."""
+        if self.background is None:
+            self.canvas.draw()      # The draw event copies the background and draws the artists
+        else:
+            self.canvas.restore_region(self.background)
+            self._drawAnimated()
+            self.canvas.blit(self.canvas.figure.bbox)
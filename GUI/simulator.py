@@ -0,0 +1,587 @@
+"""Simulated Keysight N9040B spectrum analyzer for testing and benchmarking the Python Front End without an instrument.
+
+The simulator is a TCP socket server that speaks the SCPI subset used by VisaIO, SpecAn, and the automation presets. Connect to it with the pyvisa-py
+backend using the resource string `TCPIP0::127.0.0.1::<port>::SOCKET` and a read/write termination of `\\n`, e.g.
+
+    python simulator.py --port 5025 --sweep-time 0.1 --latency 0.002 --carrier 1.42e9,-45 --carrier 2.4e9,-30,20e6
+
+Traces are synthesised from a noise floor that follows the RBW and attenuation plus a list of RFI carriers. Sweeps take `sweepTime` seconds and every
+message received is delayed by `latency` seconds to mimic a GPIB/LAN round trip.
+"""
+
+import argparse
+import logging
+import math
+import re
+import socketserver
+import struct
+import threading
+import time
+
+import numpy as np
+
+from loggingsetup import *
+
+IDN = 'Keysight Technologies,N9040B,SIMULATED,A.00.00'
+DEFAULT_PORT = 5025
+NO_ERROR = '+0,"No error"'
+UNDEFINED_HEADER = '-113,"Undefined header"'
+DATA_OUT_OF_RANGE = '-222,"Data out of range"'
+ERROR_QUEUE_SIZE = 100
+# Status Operation Condition register bits set while the instrument is sweeping/measuring
+OPER_SWEEPING = 0b00001000
+OPER_MEASURING = 0b00010000
+# Multipliers for the unit suffixes accepted in numeric arguments
+UNIT_SUFFIXES = {
+    'GHZ': 1e9, 'MHZ': 1e6, 'KHZ': 1e3, 'HZ': 1,
+    'S': 1, 'MS': 1e-3, 'US': 1e-6, 'NS': 1e-9,
+    'DBM': 1, 'DB': 1,
+}
+# Default state after *RST, keyed by the short form of the SCPI header (optional SENSe node and numeric suffixes removed)
+DEFAULT_SETTINGS = {
+    'FREQ:STAR': 0.0,
+    'FREQ:STOP': 26.5e9,
+    'SWE:POIN': 1001,
+    'SWE:TIME': 0.1,
+    'SWE:TIME:AUTO': True,
+    'BAND:RES': 3e6,
+    'BAND:RES:AUTO': True,
+    'BAND:VID': 3e6,
+    'BAND:VID:AUTO': True,
+    'BAND:VID:RAT': 1.0,
+    'BAND:VID:RAT:AUTO': True,
+    'BAND:SHAP': 'GAUS',
+    'BAND:TYPE': 'DB3',
+    'POW:ATT': 10.0,
+    'POW:ATT:AUTO': True,
+    'DISP:WIND:TRAC:Y:RLEV': 0.0,
+    'DISP:WIND:TRAC:Y:NDIV': 10,
+    'DISP:WIND:TRAC:Y:PDIV': 10.0,
+    'UNIT:POW': 'DBM',
+    'TRAC:TYPE': 'WRIT',
+    'AVER:TYPE': 'LOG',
+    'AVER:TYPE:AUTO': True,
+    'AVER:COUN': 100,
+    'INIT:CONT': True,
+    'FORM': 'ASC',
+    'FORM:BORD': 'NORM',
+}
+# Headers with optional nodes that are stored under a shorter key
+ALIASES = {
+    'POW:RF:ATT': 'POW:ATT',
+    'POW:RF:ATT:AUTO': 'POW:ATT:AUTO',
+    'DISP:WIND:TRAC:Y:SCAL:RLEV': 'DISP:WIND:TRAC:Y:RLEV',
+    'DISP:WIND:TRAC:Y:SCAL:NDIV': 'DISP:WIND:TRAC:Y:NDIV',
+    'DISP:WIND:TRAC:Y:SCAL:PDIV': 'DISP:WIND:TRAC:Y:PDIV',
+    'BWID:RES': 'BAND:RES',
+    'BWID:RES:AUTO': 'BAND:RES:AUTO',
+    'BWID:VID': 'BAND:VID',
+    'BWID:VID:AUTO': 'BAND:VID:AUTO',
+    'BWID:VID:RAT': 'BAND:VID:RAT',
+    'BWID:VID:RAT:AUTO': 'BAND:VID:RAT:AUTO',
+    'BAND': 'BAND:RES',
+    'BWID': 'BAND:RES',
+}
+ENUMERATIONS = {
+    'BAND:SHAP': ('GAUS', 'FLAT'),
+    'BAND:TYPE': ('DB3', 'DB6', 'IMP', 'NOIS'),
+    'UNIT:POW': ('DBM', 'DBMV', 'DBUV', 'DBUA', 'V', 'W', 'A'),
+    'TRAC:TYPE': ('WRIT', 'AVER', 'MAXH', 'MINH'),
+    'AVER:TYPE': ('LOG', 'RMS', 'SCAL'),
+    'FORM:BORD': ('NORM', 'SWAP'),
+}
+RBW_STEPS = (1, 1.5, 2, 3, 5, 7.5)     # Mantissas of the automatically coupled RBW values
+RBW_SPAN_RATIO = 106                    # Span:RBW ratio used when RBW is coupled to span
+MIN_RBW = 1.0
+MAX_RBW = 8e6
+MAX_SWEEP_TIME_FACTOR = 100            # Longest coupled sweep time as a multiple of the configured sweep time
+
+def _shortForm(node):
+    """Converts a SCPI header node to its uppercase short form and removes its numeric suffix, e.g. `BANDWIDTH` -> `BAND`, `WIND1` -> `WIND`.
+
+    Args:
+        node (str): Header node in short or long form.
+
+    Returns:
+        str: Short form of `node`.
+    """
+    node = node.upper().rstrip('0123456789')
+    if len(node) <= 4:
+        return node
+    return node[:3] if node[3] in 'AEIOU' else node[:4]
+
+def _toFloat(argument):
+    """Parses a SCPI numeric argument with an optional unit suffix.
+
+    Args:
+        argument (str): Numeric argument, e.g. `1e6`, `10 MHz`, or `100 ms`.
+
+    Raises:
+        ValueError: If `argument` is not numeric.
+
+    Returns:
+        float: Value of `argument` in base units.
+    """
+    match = re.fullmatch(r'\s*([-+]?[0-9.]+(?:[eE][-+]?[0-9]+)?)\s*([A-Za-z]*)\s*', argument)
+    if match is None:
+        raise ValueError(f'Invalid numeric argument {argument}')
+    multiplier = UNIT_SUFFIXES.get(match.group(2).upper(), 1) if match.group(2) else 1
+    return float(match.group(1)) * multiplier
+
+def _toBool(argument):
+    argument = argument.strip().upper()
+    if argument in ('1', 'ON'):
+        return True
+    if argument in ('0', 'OFF'):
+        return False
+    raise ValueError(f'Invalid boolean argument {argument}')
+
+def _formatValue(value):
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return f'{value:+d}'
+    if isinstance(value, float):
+        return f'{value:+.11E}'
+    return value
+
+class Carrier:
+    def __init__(self, frequency, power, bandwidth=0.0, drift=0.0):
+        """RFI carrier added to the simulated noise floor.
+
+        Args:
+            frequency (float): Center frequency in Hz.
+            power (float): Total power in dBm.
+            bandwidth (float, optional): Occupied bandwidth in Hz, 0 for a CW carrier. Defaults to 0.0.
+            drift (float, optional): Random walk of the center frequency per sweep in Hz. Defaults to 0.0.
+        """
+        self.frequency = frequency
+        self.power = power
+        self.bandwidth = bandwidth
+        self.drift = drift
+
+    @classmethod
+    def fromString(cls, string):
+        """Parses a carrier from a string in the format `frequency,power[,bandwidth[,drift]]`.
+
+        Args:
+            string (str): Comma separated carrier parameters.
+
+        Returns:
+            Carrier: Parsed carrier.
+        """
+        return cls(*(float(value) for value in string.split(',')))
+
+class SimulatedAnalyzer:
+    def __init__(self, carriers=None, sweepTime=0.1, noiseFloor=-150.0, seed=None):
+        """State of the simulated spectrum analyzer and the SCPI command interpreter. Thread safe, a single instance may be shared by several connections.
+
+        Args:
+            carriers (list[Carrier], optional): RFI carriers to synthesise. Defaults to a small set of carriers spread over the frequency range.
+            sweepTime (float, optional): Sweep time in seconds while the sweep time is coupled. Defaults to 0.1.
+            noiseFloor (float, optional): Displayed average noise level in dBm/Hz with 0 dB attenuation. Defaults to -150.0.
+            seed (int, optional): Seed of the noise generator, for reproducible traces. Defaults to None.
+        """
+        if carriers is None:
+            carriers = [Carrier(98.1e6, -55, 200e3), Carrier(1.0e9, -40), Carrier(1.57542e9, -70, 2e6), Carrier(2.437e9, -35, 20e6, drift=1e6), Carrier(5.8e9, -50, 40e6)]
+        self.carriers = carriers
+        self.autoSweepTime = sweepTime
+        self.noiseFloor = noiseFloor
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.RLock()
+        self.messages = 0       # Amount of program messages received
+        self.queries = 0        # Amount of responses sent
+        self.sweeps = 0         # Amount of completed sweeps
+        self.reset()
+
+    def reset(self):
+        """Restores the default settings (*RST) and clears the status registers, error queue, and trace."""
+        with self.lock:
+            self.settings = dict(DEFAULT_SETTINGS)
+            self.settings['SWE:TIME'] = self.autoSweepTime
+            self.errors = []
+            self.esr = 0
+            self.ese = 0
+            self.opcPending = False
+            self.sweepEnd = 0.0
+            self.trace = None
+            self.averaged = 0
+            self._couple()
+
+    # ---------------------------------------------------------------- Couplings
+    def _couple(self):
+        """Recomputes the parameters coupled to other parameters (RBW to span, VBW to RBW, sweep time to RBW/VBW) and invalidates the trace."""
+        s = self.settings
+        span = s['FREQ:STOP'] - s['FREQ:STAR']
+        if s['BAND:RES:AUTO']:
+            target = max(span / RBW_SPAN_RATIO, MIN_RBW)
+            decade = 10 ** math.floor(math.log10(target))
+            s['BAND:RES'] = min(min((step * decade for step in RBW_STEPS + (10,)), key=lambda rbw: abs(math.log(rbw / target))), MAX_RBW)
+        if s['BAND:VID:AUTO']:
+            s['BAND:VID'] = s['BAND:RES'] * s['BAND:VID:RAT']
+        else:
+            s['BAND:VID:RAT'] = s['BAND:VID'] / s['BAND:RES']
+        if s['SWE:TIME:AUTO']:
+            # Swept analyzer sweep time scales with span / RBW^2. The configured sweep time is the minimum, reached at the default span and RBW
+            reference = DEFAULT_SETTINGS['FREQ:STOP'] / DEFAULT_SETTINGS['BAND:RES'] ** 2
+            bandwidth = min(s['BAND:RES'], s['BAND:VID'])
+            s['SWE:TIME'] = self.autoSweepTime * min(max(span / bandwidth ** 2 / reference, 1), MAX_SWEEP_TIME_FACTOR)
+        if s['POW:ATT:AUTO']:
+            s['POW:ATT'] = 10.0
+        self.trace = None
+        self.averaged = 0
+
+    def _setFrequency(self, key, value):
+        s = self.settings
+        start, stop = s['FREQ:STAR'], s['FREQ:STOP']
+        center, span = (start + stop) / 2, stop - start
+        if key == 'FREQ:STAR':
+            start = value
+            stop = max(stop, start)
+        elif key == 'FREQ:STOP':
+            stop = value
+            start = min(start, stop)
+        elif key == 'FREQ:CENT':
+            start, stop = value - span / 2, value + span / 2
+        elif key == 'FREQ:SPAN':
+            start, stop = center - value / 2, center + value / 2
+        s['FREQ:STAR'] = max(start, 0.0)
+        s['FREQ:STOP'] = min(stop, DEFAULT_SETTINGS['FREQ:STOP'])
+
+    # ---------------------------------------------------------------- Sweeps
+    def xAxis(self):
+        return np.linspace(self.settings['FREQ:STAR'], self.settings['FREQ:STOP'], self.settings['SWE:POIN'])
+
+    def _synthesise(self):
+        """Generates one sweep of amplitudes in dBm from the noise floor and carriers."""
+        s = self.settings
+        x = self.xAxis()
+        rbw = s['BAND:RES']
+        floor = self.noiseFloor + 10 * math.log10(rbw) + s['POW:ATT'] - 10
+        # Log-detected noise has a standard deviation of ~5.6 dB, smoothed by the VBW
+        deviation = 5.6 * min(1.0, math.sqrt(s['BAND:VID'] / rbw))
+        power = 10 ** ((floor + self.rng.normal(0, deviation, x.size)) / 10)
+        for carrier in self.carriers:
+            if carrier.drift:
+                carrier.frequency += self.rng.normal(0, carrier.drift)
+            width = max(carrier.bandwidth, rbw)
+            sigma = width / 2.355
+            if carrier.frequency + 4 * sigma < x[0] or carrier.frequency - 4 * sigma > x[-1]:
+                continue
+            # Power within one RBW when the carrier is wider than the RBW
+            peak = carrier.power + 10 * math.log10(min(1.0, rbw / width))
+            power += 10 ** (peak / 10) * np.exp(-0.5 * ((x - carrier.frequency) / sigma) ** 2)
+        return 10 * np.log10(power)
+
+    def _completeSweep(self):
+        """Combines a new sweep into the trace according to the trace type."""
+        y = self._synthesise()
+        traceType = self.settings['TRAC:TYPE']
+        if self.trace is None or traceType == 'WRIT':
+            self.trace = y
+            self.averaged = 1
+        elif traceType == 'AVER':
+            self.averaged = min(self.averaged + 1, self.settings['AVER:COUN'])
+            self.trace = self.trace + (y - self.trace) / self.averaged
+        elif traceType == 'MAXH':
+            self.trace = np.maximum(self.trace, y)
+        elif traceType == 'MINH':
+            self.trace = np.minimum(self.trace, y)
+        self.sweeps += 1
+
+    def initiate(self):
+        """Starts a single sweep (:INIT:IMM)."""
+        self.sweepEnd = time.monotonic() + self.settings['SWE:TIME']
+
+    def isSweeping(self):
+        """Returns True while a sweep started by initiate() is in progress and completes it once the sweep time has elapsed."""
+        if self.sweepEnd and time.monotonic() >= self.sweepEnd:
+            self.sweepEnd = 0.0
+            self._completeSweep()
+            if self.opcPending:
+                self.opcPending = False
+                self.esr |= 1
+        return bool(self.sweepEnd)
+
+    def waitForSweep(self):
+        """Blocks until the current sweep is complete (*WAI, *OPC?)."""
+        while self.isSweeping():
+            time.sleep(max(self.sweepEnd - time.monotonic(), 0))
+
+    def currentTrace(self):
+        """Returns the amplitudes of the last sweep. In continuous mode a new sweep is taken for every request, like the display of a free running analyzer."""
+        if self.settings['INIT:CONT'] and not self.isSweeping():
+            self._completeSweep()
+        elif self.trace is None:
+            self._completeSweep()
+        return self.trace
+
+    # ---------------------------------------------------------------- Responses
+    def _block(self, values):
+        """Formats `values` according to :FORM, either as comma separated ASCII or as an IEEE 488.2 definite length binary block."""
+        form = self.settings['FORM']
+        if form == 'ASC':
+            return ','.join(f'{value:.6E}' for value in values).encode()
+        dtype = 'f' if form == 'REAL,32' else 'd'
+        endian = '>' if self.settings['FORM:BORD'] == 'NORM' else '<'
+        payload = struct.pack(f'{endian}{len(values)}{dtype}', *values)
+        length = str(len(payload))
+        return f'#{len(length)}{length}'.encode() + payload
+
+    def _error(self, error):
+        if len(self.errors) < ERROR_QUEUE_SIZE:
+            self.errors.append(error)
+
+    def execute(self, message):
+        """Executes a program message, which may contain several commands separated by semicolons.
+
+        Args:
+            message (str): Program message without its termination character.
+
+        Returns:
+            bytes: Response message or None if the message contained no queries. Responses to several queries are separated by semicolons.
+        """
+        with self.lock:
+            self.messages += 1
+            responses = []
+            path = []
+            for command in message.split(';'):
+                command = command.strip()
+                if not command:
+                    continue
+                header, _, argument = command.partition(' ')
+                # Commands not starting with a colon or asterisk are relative to the path of the previous command
+                if header.startswith(':') or header.startswith('*'):
+                    path = []
+                nodes = path + [node for node in header.strip(':').split(':') if node]
+                path = nodes[:-1]
+                try:
+                    response = self._command(nodes, argument.strip())
+                except ValueError:
+                    self._error(DATA_OUT_OF_RANGE)
+                    continue
+                except KeyError:
+                    self._error(UNDEFINED_HEADER)
+                    continue
+                if response is not None:
+                    responses.append(response.encode() if isinstance(response, str) else response)
+            if not responses:
+                return None
+            self.queries += 1
+            return b';'.join(responses)
+
+    def _command(self, nodes, argument):
+        """Executes a single command.
+
+        Args:
+            nodes (list[str]): Header nodes, e.g. ['SENS', 'FREQ', 'START?'].
+            argument (str): Command argument, empty if there is none.
+
+        Raises:
+            KeyError: If the header is not recognised.
+            ValueError: If the argument is invalid.
+
+        Returns:
+            str or bytes: Response of a query or None.
+        """
+        isQuery = nodes[-1].endswith('?')
+        nodes = [_shortForm(node.rstrip('?')) for node in nodes]
+        if nodes and nodes[0] == 'SENS':
+            nodes = nodes[1:]
+        key = ':'.join(nodes)
+        key = ALIASES.get(key, key)
+        s = self.settings
+
+        # Common commands
+        if key == '*IDN':
+            return IDN
+        if key == '*RST':
+            self.reset()
+            return None
+        if key == '*CLS':
+            self.errors.clear()
+            self.esr = 0
+            return None
+        if key == '*ESE':
+            if isQuery:
+                return f'{self.ese:+d}'
+            self.ese = int(_toFloat(argument))
+            return None
+        if key == '*ESR':
+            self.isSweeping()
+            esr, self.esr = self.esr, 0
+            return f'{esr:+d}'
+        if key == '*OPC':
+            if isQuery:
+                self.waitForSweep()
+                return '1'
+            if self.isSweeping():
+                self.opcPending = True
+            else:
+                self.esr |= 1
+            return None
+        if key == '*WAI':
+            self.waitForSweep()
+            return None
+        if key == '*STB':
+            return f'{(0b00100000 if self.esr & self.ese else 0):+d}'
+
+        # Triggering and measurement results
+        if key == 'INIT:IMM' or key == 'INIT':
+            self.initiate()
+            return None
+        if key == 'ABOR':
+            self.sweepEnd = 0.0
+            return None
+        if key == 'TRAC:DATA' or key == 'TRAC':
+            self.waitForSweep()
+            return self._block(self.currentTrace())
+        if key in ('FETC:SAN', 'READ:SAN'):
+            if key == 'READ:SAN':
+                self.initiate()
+            self.waitForSweep()
+            y = self.currentTrace()
+            interleaved = np.empty(2 * y.size)
+            interleaved[::2] = self.xAxis()
+            interleaved[1::2] = y
+            return self._block(interleaved)
+        if key == 'AVER:COUN:CURR':
+            return f'{self.averaged:+d}'
+
+        # Status and errors
+        if key == 'STAT:OPER:COND':
+            return f'{(OPER_SWEEPING | OPER_MEASURING if self.isSweeping() else 0):+d}'
+        if key in ('STAT:QUES:CAL:COND', 'STAT:QUES:COND', 'STAT:OPER:EVEN', 'STAT:QUES:EVEN'):
+            return '+0'
+        if key in ('SYST:ERR', 'SYST:ERR:NEXT'):
+            return self.errors.pop(0) if self.errors else NO_ERROR
+        if key == 'SYST:ERR:PUP':
+            return NO_ERROR
+
+        # Frequency settings are stored as start/stop, center and span are derived from them
+        if key in ('FREQ:CENT', 'FREQ:SPAN', 'FREQ:STAR', 'FREQ:STOP'):
+            if isQuery:
+                start, stop = s['FREQ:STAR'], s['FREQ:STOP']
+                value = {'FREQ:CENT': (start + stop) / 2, 'FREQ:SPAN': stop - start, 'FREQ:STAR': start, 'FREQ:STOP': stop}[key]
+                return _formatValue(value)
+            self._setFrequency(key, _toFloat(argument))
+            self._couple()
+            return None
+        if key == 'FORM' or key == 'FORM:DATA':
+            if isQuery:
+                return s['FORM'].replace('ASC', 'ASC,8')
+            form = argument.upper().replace(' ', '')
+            form = {'ASC': 'ASC', 'ASCII': 'ASC', 'ASC,8': 'ASC', 'REAL': 'REAL,32', 'REAL,32': 'REAL,32', 'REAL,64': 'REAL,64'}.get(form)
+            if form is None:
+                raise ValueError(argument)
+            s['FORM'] = form
+            return None
+
+        # Remaining settings, explicitly setting a coupled value turns its coupling off
+        if key not in s:
+            raise KeyError(key)
+        if isQuery:
+            return _formatValue(s[key])
+        default = DEFAULT_SETTINGS[key]
+        if isinstance(default, bool):
+            value = _toBool(argument)
+        elif isinstance(default, (int, float)):
+            value = type(default)(_toFloat(argument))
+            if value < 0 or (key == 'SWE:POIN' and not 1 <= value <= 100001):
+                raise ValueError(argument)
+        else:
+            value = next((option for option in ENUMERATIONS.get(key, ()) if argument.upper().startswith(option)), None)
+            if value is None:
+                raise ValueError(argument)
+        s[key] = value
+        if f'{key}:AUTO' in s and not isinstance(default, bool):
+            s[f'{key}:AUTO'] = False
+        if key == 'BAND:VID:RAT':
+            s['BAND:VID:AUTO'] = True
+        self._couple()
+        return None
+
+class SimulatorHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        """Reads newline terminated program messages from the connection and writes the responses back."""
+        server = self.server
+        logging.info(f'Simulator: Connection from {self.client_address[0]}:{self.client_address[1]}')
+        for line in self.rfile:
+            message = line.decode(errors='replace').strip()
+            if not message:
+                continue
+            if server.latency:
+                time.sleep(server.latency)
+            logging.debug(f'Simulator: Received {message}')
+            response = server.analyzer.execute(message)
+            if response is None:
+                continue
+            if server.bytesPerSecond:
+                time.sleep(len(response) / server.bytesPerSecond)
+            self.wfile.write(response + b'\n')
+        logging.info(f'Simulator: Connection from {self.client_address[0]}:{self.client_address[1]} closed')
+
+class SimulatorServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, analyzer=None, host='127.0.0.1', port=DEFAULT_PORT, latency=0.0, bytesPerSecond=0):
+        """TCP socket server exposing a SimulatedAnalyzer. Pass port 0 to bind an unused port.
+
+        Args:
+            analyzer (SimulatedAnalyzer, optional): Simulated instrument. Defaults to a new SimulatedAnalyzer.
+            host (str, optional): Interface to listen on. Defaults to '127.0.0.1'.
+            port (int, optional): TCP port. Defaults to 5025 (the SCPI raw socket port).
+            latency (float, optional): Delay in seconds applied to every received message. Defaults to 0.0.
+            bytesPerSecond (int, optional): Throughput limit applied to responses, 0 for unlimited. Defaults to 0.
+        """
+        self.analyzer = analyzer if analyzer is not None else SimulatedAnalyzer()
+        self.latency = latency
+        self.bytesPerSecond = bytesPerSecond
+        super().__init__((host, port), SimulatorHandler)
+
+    @property
+    def resourceName(self):
+        """VISA resource string of the server for the pyvisa-py backend."""
+        host, port = self.server_address[:2]
+        return f'TCPIP0::{host}::{port}::SOCKET'
+
+    def start(self):
+        """Serves connections in a daemon thread.
+
+        Returns:
+            SimulatorServer: self
+        """
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        logging.info(f'Simulator: Listening on {self.resourceName}')
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Simulated Keysight N9040B spectrum analyzer served over a raw SCPI socket.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--sweep-time', type=float, default=0.1, help='Sweep time in seconds for the default span and RBW')
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay in seconds applied to every message, e.g. 0.002 for GPIB')
+    parser.add_argument('--bytes-per-second', type=int, default=0, help='Response throughput limit, e.g. 1000000 for GPIB. 0 for unlimited')
+    parser.add_argument('--noise-floor', type=float, default=-150.0, help='Displayed average noise level in dBm/Hz')
+    parser.add_argument('--carrier', action='append', type=Carrier.fromString, help='RFI carrier as frequency,power[,bandwidth[,drift]]. May be repeated')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--verbose', action='store_true', help='Log every received message')
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    analyzer = SimulatedAnalyzer(carriers=args.carrier, sweepTime=args.sweep_time, noiseFloor=args.noise_floor, seed=args.seed)
+    server = SimulatorServer(analyzer, args.host, args.port, args.latency, args.bytes_per_second)
+    logging.info(f'Simulator: Listening on {server.resourceName}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
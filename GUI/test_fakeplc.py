@@ -0,0 +1,45 @@
+"""Checks SerialIO against the simulated PLC in fakeplc.py. Run `python -m pytest test_fakeplc.py` from this directory, pseudo-terminals are only available on
+POSIX systems.
+"""
+
+import os
+
+import pytest
+
+from fakeplc import FakePLC
+from frontendio import SerialIO
+from opcodes import opcodes
+
+pytestmark = pytest.mark.skipif(os.name != 'posix', reason='fakeplc needs a pseudo-terminal')
+
+SEQUENCE = (opcodes.EMS_CHAIN1.value, opcodes.DFS_CHAIN1.value, opcodes.EMS_CHAIN1.value, opcodes.DFS_CHAIN1.value)
+
+@pytest.fixture(params=[True, False], ids=['status frames', 'legacy'])
+def plc(request):
+    fake = FakePLC(pushStatus=request.param, latency=0.05).start()     # Replies still in flight when the next command is sent
+    serialIO = SerialIO()
+    serialIO.openSerial(fake.port, timeout=0.1)
+    yield fake, serialIO
+    serialIO.close()
+    fake.stop()
+
+def test_query_returns_status_of_each_command(plc):
+    fake, serialIO = plc
+    assert [serialIO.query(opCode, delay=2.0) for opCode in SEQUENCE] == list(SEQUENCE)
+    assert serialIO.pushesStatus == fake.pushStatus
+
+def test_query_ignores_24v_frames(plc):
+    fake, serialIO = plc
+    assert serialIO.query(opcodes.EMS_CHAIN1.value, delay=2.0) == opcodes.EMS_CHAIN1.value
+    fake.set24V(1)
+    fake.set24V(0)
+    assert serialIO.query(opcodes.DFS_CHAIN1.value, delay=2.0) == opcodes.DFS_CHAIN1.value
+    assert serialIO.query(None, delay=2.0) == opcodes.DFS_CHAIN1.value
+
+def test_query_ignores_24v_and_base_replies(plc):
+    fake, serialIO = plc
+    fake.set24V(1)
+    assert serialIO.query(opcodes.EMS_CHAIN1.value, delay=2.0) == opcodes.EMS_CHAIN1.value
+    for opCode in (opcodes.CHECK_24V_SL1.value, opcodes.CHECK_24V_SL2.value, opcodes.IS_BASE_ACTIVE.value):
+        assert serialIO.query(opCode, delay=2.0) == opcodes.EMS_CHAIN1.value
+    assert serialIO.status == opcodes.EMS_CHAIN1.value
@@ -1,6 +1,11 @@
 import pandas as pd
+import numpy as np
 import os
 import re
+import io
+import csv
+import json
+import threading
 from enum import Enum
 from datetime import datetime, timezone
 
@@ -20,6 +25,270 @@ def getAllCsvFiles(path):
     csvFiles = [f for f in allFiles if f.endswith(".csv")]
     return sorted(csvFiles, key=natural_sort_key)
 
+def formatTrace(header, xdata, ydata, delimiter=','):
+    """Formats a trace in the layout parsed by Trace: a `Parameter,Value` row per header entry, a `DATA` row, and an `x,y` row per data point. Each column is converted to
+    strings in a single numpy call, which gives the same text as calling str() on every element.
+
+    Args:
+        header (list[tuple[str, str]]): (name, value) pairs written above the data.
+        xdata (array_like): X axis data points.
+        ydata (array_like): Y axis data points, same length as `xdata`.
+        delimiter (str, optional): Column delimiter. Defaults to ','.
+
+    Raises:
+        ValueError: If `xdata` and `ydata` have different lengths.
+
+    Returns:
+        str: Formatted trace.
+    """
+    xstrings = np.asarray(xdata).astype(str)
+    ystrings = np.asarray(ydata).astype(str)
+    if xstrings.shape != ystrings.shape:
+        raise ValueError(f'Trace x and y data lengths do not match: {xstrings.size} and {ystrings.size}')
+    rows = [name + delimiter + value for name, value in header]
+    rows.append('DATA')
+    rows.extend(map(delimiter.join, zip(xstrings.tolist(), ystrings.tolist())))
+    rows.append('')
+    return '\n'.join(rows)
+
+def writeTrace(f, header, xdata, ydata, delimiter=','):
+    """Formats a trace with formatTrace() and writes it to `f` in a single call.
+
+    Args:
+        f (file): Open text file object to write to.
+        header (list[tuple[str, str]]): (name, value) pairs written above the data.
+        xdata (array_like): X axis data points.
+        ydata (array_like): Y axis data points.
+        delimiter (str, optional): Column delimiter. Defaults to ','.
+    """
+    f.write(formatTrace(header, xdata, ydata, delimiter))
+
+class TraceHeader:
+    def __init__(self, values, dataRow, name):
+        """Parameters from the header of a trace csv, read without parsing the data points. See readTraceHeader().
+
+        Args:
+            values (dict): Parameter names and values (strings) in the order they appear in the header.
+            dataRow (int): Zero based line number of the `DATA` row. The data points start on the following line.
+            name (string): File name without the .csv extension.
+        """
+        self.values = values
+        self.dataRow = dataRow
+        self.name = name
+
+    @property
+    def time(self):
+        """datetime: Acquisition time from the 'Time' parameter. Raises KeyError if the trace has no time (e.g. csvs saved on the analyzer)."""
+        return datetime.fromisoformat(self.values['Time'])
+
+    @property
+    def startFreq(self):
+        return float(self.values['Start Frequency'])
+
+    @property
+    def stopFreq(self):
+        return float(self.values['Stop Frequency'])
+
+    @property
+    def sweepPoints(self):
+        return float(self.values['Number of Points'])
+
+def readTraceHeader(path):
+    """Reads the `Parameter,Value` rows of a trace csv up to the `DATA` row. The data points are not read, which makes this much cheaper than building a Trace when only
+    the metadata is needed.
+
+    Args:
+        path (string): Path to the trace csv.
+
+    Raises:
+        ValueError: If the file has no `DATA` row.
+
+    Returns:
+        TraceHeader: Header of the trace.
+    """
+    values = {}
+    with open(path, 'r', newline='') as f:
+        for dataRow, row in enumerate(csv.reader(f)):
+            if not row:
+                continue
+            if row[0] == 'DATA':
+                return TraceHeader(values, dataRow, os.path.basename(path).replace('.csv', ''))
+            values[row[0]] = row[1] if len(row) > 1 else ''
+    raise ValueError(f'No DATA row found in {path}')
+
+def readTraceData(path, dataRow=None):
+    """Reads the `x,y` data points of a trace csv as arrays, skipping the header without parsing it.
+
+    Args:
+        path (string): Path to the trace csv.
+        dataRow (int, optional): TraceHeader.dataRow of the file, read with readTraceHeader if None. Defaults to None.
+
+    Returns:
+        tuple[ndarray, ndarray]: X axis data points (float64) and y axis data points (float32).
+    """
+    if dataRow is None:
+        dataRow = readTraceHeader(path).dataRow
+    data = pd.read_csv(path, header=None, skiprows=dataRow + 1, usecols=[0, 1], dtype=np.float64).to_numpy()
+    return data[:, 0].copy(), data[:, 1].astype(np.float32)
+
+def getAllArchives(path):
+    """Searches a directory for trace archives, returns a sorted list of their directory names.
+
+    Args:
+        path (string): File path to search for trace archives
+
+    Returns:
+        list: Sorted list of trace archive directories in the directory
+    """
+    archives = [f for f in os.listdir(path) if f.endswith(TraceArchive.SUFFIX) and os.path.isdir(os.path.join(path, f))]
+    return sorted(archives, key=natural_sort_key)
+
+class TraceArchive:
+    SUFFIX = '-ARCHIVE'
+    HEADER_FILE = 'header.jsonl'
+    _locks = {}
+    _locksLock = threading.Lock()
+    def __init__(self, path):
+        """Binary store for the traces of one receiver on one day, kept in the directory `path`. Traces with the same frequency axis form a segment, made of the axis
+        (frequency-<segment>.npy, float64) and an amplitude matrix with one float32 row per trace (amplitude-<segment>.f32, raw little endian, appended to). The
+        parameter header and acquisition time of every row are appended to header.jsonl. A new segment is started whenever the frequency axis changes.
+
+        Appending a trace writes one row and one header line, and reading a segment maps the amplitude file into memory instead of parsing text.
+
+        Args:
+            path (string): Archive directory, created on the first append if it does not exist.
+        """
+        self.path = path
+        self.name = os.path.basename(os.path.normpath(path)).removesuffix(self.SUFFIX)
+        with TraceArchive._locksLock:
+            self.lock = TraceArchive._locks.setdefault(os.path.abspath(path), threading.Lock())
+        self._segment = None        # Segment appended to and its frequency axis, loaded on the first append
+        self._frequency = None
+
+    @classmethod
+    def forTrace(cls, directory, receiver, timestamp):
+        """Returns the archive of `receiver` for the date of `timestamp` in `directory`.
+
+        Args:
+            directory (string): Directory holding the archives.
+            receiver (string): Receiver name, e.g. 'EMS1'.
+            timestamp (datetime): Acquisition time of the trace.
+
+        Returns:
+            TraceArchive: Archive named '<receiver>-<YYYY-MM-DD>-ARCHIVE'.
+        """
+        return cls(os.path.join(directory, f'{receiver}-{timestamp.strftime("%Y-%m-%d")}{cls.SUFFIX}'))
+
+    def _file(self, kind, segment):
+        extension = '.npy' if kind == 'frequency' else '.f32'
+        return os.path.join(self.path, f'{kind}-{segment}{extension}')
+
+    def segments(self):
+        """Returns the sorted segment numbers in the archive."""
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(int(f[len('frequency-'):-len('.npy')]) for f in os.listdir(self.path) if re.fullmatch(r'frequency-\d+\.npy', f))
+
+    def frequency(self, segment):
+        """Returns the frequency axis shared by every row of `segment`."""
+        return np.load(self._file('frequency', segment))
+
+    def amplitudes(self, segment):
+        """Returns the amplitudes of `segment` as a read only (rows, points) float32 array mapped from disk. Rows are in the order they were appended.
+
+        Args:
+            segment (int): Segment number.
+
+        Returns:
+            numpy.ndarray: Amplitude matrix.
+        """
+        points = self.frequency(segment).size
+        path = self._file('amplitude', segment)
+        rows = os.path.getsize(path) // (4 * points) if os.path.exists(path) and points else 0
+        if rows == 0:
+            return np.empty((0, points), dtype='<f4')
+        return np.memmap(path, dtype='<f4', mode='r', shape=(rows, points))
+
+    def headers(self, segment=None):
+        """Returns the header records in the archive, optionally only those of `segment`. Each record is a dictionary with the keys 'segment', 'row', 'time' (ISO format
+        string) and 'header' (dictionary of parameter names and values).
+
+        Args:
+            segment (int, optional): Segment number. Defaults to None (all segments).
+
+        Returns:
+            list[dict]: Header records in the order they were appended.
+        """
+        path = os.path.join(self.path, self.HEADER_FILE)
+        if not os.path.exists(path):
+            return []
+        records = []
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:    # Line left incomplete by an interrupted append
+                    continue
+                if segment is None or record['segment'] == segment:
+                    records.append(record)
+        return records
+
+    def append(self, xdata, ydata, header, timestamp):
+        """Appends a trace to the archive, starting a new segment if `xdata` differs from the frequency axis of the current segment.
+
+        Args:
+            xdata (array_like): Frequency axis of the trace.
+            ydata (array_like): Amplitudes of the trace, same length as `xdata`.
+            header (list[tuple[str, str]]): (name, value) pairs of the parameters when the trace was acquired.
+            timestamp (datetime): Acquisition time of the trace.
+
+        Raises:
+            ValueError: If `xdata` and `ydata` have different lengths.
+        """
+        xdata = np.asarray(xdata, dtype=np.float64)
+        ydata = np.asarray(ydata, dtype='<f4')
+        if xdata.shape != ydata.shape:
+            raise ValueError(f'Trace x and y data lengths do not match: {xdata.size} and {ydata.size}')
+        with self.lock:
+            os.makedirs(self.path, exist_ok=True)
+            if self._segment is None:
+                segments = self.segments()
+                if segments:
+                    self._segment = segments[-1]
+                    self._frequency = self.frequency(self._segment)
+            if self._frequency is None or self._frequency.shape != xdata.shape or not np.array_equal(self._frequency, xdata):
+                self._segment = 0 if self._segment is None else self._segment + 1
+                self._frequency = xdata
+                np.save(self._file('frequency', self._segment), xdata)
+            amplitudePath = self._file('amplitude', self._segment)
+            with open(amplitudePath, 'ab') as f:
+                # Truncate a row left incomplete by an interrupted append so rows stay aligned
+                offset = f.tell() - f.tell() % ydata.nbytes
+                f.truncate(offset)
+                f.seek(offset)
+                f.write(ydata.tobytes())
+            record = {'segment': self._segment, 'row': offset // ydata.nbytes, 'time': timestamp.isoformat(), 'header': dict(header)}
+            with open(os.path.join(self.path, self.HEADER_FILE), 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+    def toTrace(self, segment, row):
+        """Builds a Trace from one row of the archive, as if it had been read from the trace csv.
+
+        Args:
+            segment (int): Segment number.
+            row (int): Row within the segment.
+
+        Returns:
+            Trace: Trace named '<receiver>-<YYYY-MM-DD>-<index>', where index is the position of the trace in the archive like the counter in csv file names.
+        """
+        index, record = next((index, record) for index, record in enumerate(self.headers()) if record['segment'] == segment and record['row'] == row)
+        header = list(record['header'].items())
+        if 'Time' not in record['header']:
+            header.append(('Time', record['time']))
+        text = formatTrace(header, self.frequency(segment), self.amplitudes(segment)[row])
+        df = pd.read_csv(io.StringIO(text), header=None)
+        return Trace(df, f'{self.name}-{index}')
+
 class Trace:
     DRIFT_SUFFIX = '-D'
     def __init__(self, trace, name):
@@ -70,11 +339,21 @@ class Trace:
                 self.scan_az = header.loc['Azimuth'].item()
                 self.scan_el = header.loc['Elevation'].item()
             self.intensity_unit = 'dBm'
-            self.scan_name = self.receiver + '-' + datetime.strftime("%Y-%m-%d") + '-D' + name.split('-')[4]
+            self.scan_name = self.scanName(name, datetime)
             self.scan_datetime = datetime.astimezone(timezone.utc).isoformat()  # drift datetime is in utc
             self.frequency = data.loc[:, 0].astype(float) / 1000000         # drift freq is in mhz
             self.intensity = data.loc[:, 1]
 
+        @staticmethod
+        def scanName(name, datetime):
+            """Returns the DRIFT scan name of a trace, which is also the name of its DRIFT csv without the extension, e.g. 'EMS1-2026-01-01-D12'.
+
+            Args:
+                name (string): Trace.name
+                datetime (datetime): Acquisition time of the trace.
+            """
+            return name.split('-')[0] + '-' + datetime.strftime("%Y-%m-%d") + '-D' + name.split('-')[4]
+
         def getDriftDf(self):
             """Formats parameters generated in Drift.__init__ into the DRIFT-compatible format.
 
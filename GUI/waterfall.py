@@ -2,7 +2,11 @@ import os
 import re
 import shutil
 import logging
+import logging.handlers
+import argparse
+import multiprocessing
 import pandas as pd
+import matplotlib
 import matplotlib.dates as mdates
 import pytz
 import numpy as np
@@ -11,8 +15,14 @@ from matplotlib import pyplot as plt
 from matplotlib import ticker
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
+import loggingsetup
 from tracedata import *
+from catalog import TraceCatalog
+
+CACHE_DIR = 'Waterfall-Cache'       # Directory in topath holding the cached groups of incremental mode
+MANIFEST_FILE = 'absorbed.txt'      # Names of the csvs absorbed into the cache, one per line
 
 def _mkdir(path: str, subfolder: str | list[str] | tuple[str]):
     if type(subfolder) == str:
@@ -46,62 +56,68 @@ def _makeUniquePath(path: str) -> str:
             return new_path
         i += 1
 
-def regenerateWaterfalls(frompath:str, topath:str, threshold:int = 100, tz:str = 'US/Mountain', filetype:str = '.png', dpi:int=600, moveFlag:bool=False, makeMatpl:bool=True, makePlotly:bool=True, makeAvg:bool=True):
-    folders_with_csv = []
-    for dirpath, dirnames, filenames in os.walk(frompath):
-        if any(filename.lower().endswith('.csv') for filename in filenames):
-            folders_with_csv.append(dirpath)
-    for folder in folders_with_csv:
-        makeWaterfalls(folder, topath, threshold, tz, filetype, dpi, moveFlag=False, makeMatpl=makeMatpl, makePlotly=makePlotly, makeAvg=makeAvg)
+def _initWorker(logQueue, level):
+    """Initializer of the waterfall worker processes. Renders without a display and forwards log records to the parent process through `logQueue`."""
+    matplotlib.use('Agg')
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(logQueue))
+    root.setLevel(level)
 
-def makeWaterfalls(frompath:str, topath:str, threshold:int = 100, tz:str = 'US/Mountain', filetype:str = '.png', dpi:int=600, moveFlag:bool=True, makeMatpl:bool=True, makePlotly:bool=True, makeAvg:bool=True):
-    """Searches for csv files located in `frompath`, and if there are an amount of csvs with a unique date and receiver information
-    in the file name above `threshold`, make a waterfall plot with them. A plot will only be made if all csv entries have a matching
-    start frequency, stop frequency, receiver, date, and number of sweet points. The plot is saved in `topath` as `filetype` and the
-    parsed csv files are moved to their own directory if `moveFlag` is true.
+def _traceHeaders(frompath:str, skip:set, catalog:TraceCatalog=None):
+    """Yields the (file name, path, header) of every csv in `frompath` not in `skip`. With a catalog, only the headers of csvs that are new or changed since the last
+    run are read from the files, header is the exception raised by readTraceHeader for csvs that could not be read.
+    """
+    if catalog is not None:
+        added, removed, failed = catalog.sync(frompath)
+        for file_path, e in failed:
+            yield os.path.basename(file_path), file_path, e
+        for file_path, header in catalog.headers(frompath):
+            if os.path.basename(file_path) not in skip:
+                yield os.path.basename(file_path), file_path, header
+        return
+    for file_name in getAllCsvFiles(frompath):
+        if file_name in skip:
+            continue
+        file_path = os.path.join(frompath, file_name)
+        try:
+            yield file_name, file_path, readTraceHeader(file_path)
+        except Exception as e:
+            yield file_name, file_path, e
 
-    This function also generates an "averaged" csv of the entire waterfall plot and drift format version.
+def _scanGroups(frompath:str, tz:str, threshold:int, skip:set=frozenset(), cachePath:str=None, catalog:TraceCatalog=None):
+    """Groups the csvs in `frompath` by receiver, local date, start frequency, stop frequency and number of points using only their headers.
 
     Args:
         frompath (str): File path to check for csvs.
-        topath (str): File path to generate waterfall plots and average csvs into, and to archive processed csvs.
-        threshold (int): Minimum count of unique csvs to process. Defaults to 100
-        tz (str, optional): Timezone string passed to pytz.timezone, can be 'UTC', 'US/(Pacific/Mountain/Central/Eastern)', etc. Defaults to 'US/Mountain'.
-        filetype (str, optional): File extension used in matplotlib.pyplot.savefig. Defaults to '.png'.
-        dpi (int, optional): Argument passed to matplotlib.pyplot.savefig. Defaults to 600.
-        moveFlag (bool, optional): Determines whether or not to move parsed trace csvs. Defaults to True.
-        makeMatpl (bool, optional): Determines whether or not to generate matplotlib waterfall. Defaults to True.
-        makePlotly (bool, optional): Determines whether or not to generate plotly.js waterfall. Defaults to True.
-        makeAvg (bool, optional): Determines whether or not to generate average trace. Defaults to True.
-    """
-    if not any([makeMatpl, makePlotly, makeAvg]):
-        logging.waterfall('Error: At least one argument of makeMatpl, makePlotly, and makeAvg, must be true.')
-        return
+        tz (str): Timezone string passed to pytz.timezone, determines the date of each trace.
+        threshold (int): Minimum count of csvs in a group (exclusive) for it to be returned.
+        skip (set, optional): File names to leave out without opening them. Defaults to an empty set.
+        cachePath (str, optional): Waterfall cache directory in incremental mode, the traces already cached for a group count towards `threshold`. Defaults to None.
+        catalog (TraceCatalog, optional): Trace catalog providing the headers of the csvs indexed by previous runs. Defaults to None (read every header).
 
-    DATE_REGEX = r"(\d{4}-\d{2}-\d{2})"
+    Returns:
+        dict: (receiver, date, startFreq, stopFreq, sweepPoints) keys mapped to lists of {"time", "path", "filename", "header"} dictionaries.
+    """
     TIMEZONE = pytz.timezone(tz)
-    CSV_THRESHOLD = threshold
-    
     trace_index = defaultdict(list)
 
-    for file_name in getAllCsvFiles(frompath):
-        file_path = os.path.join(frompath, file_name)
-
+    # Group the csvs by their headers only, the data points are parsed later for groups above the threshold
+    for file_name, file_path, header in _traceHeaders(frompath, skip, catalog):
         try:
-            df = pd.read_csv(file_path, header=None)
-            trace = Trace(df, file_name)
+            if isinstance(header, Exception):
+                raise header
 
             # Extract metadata
-            t_utc = datetime.fromisoformat(
-                trace.header.loc['Time'].item()
-            ).astimezone(pytz.utc)
+            t_utc = header.time.astimezone(pytz.utc)
             t_local = t_utc.astimezone(TIMEZONE)
 
             receiver = file_name.split('-')[0]
             date = t_local.date().isoformat()
-            start_freq = float(trace.header.loc['Start Frequency'].item())
-            stop_freq = float(trace.header.loc['Stop Frequency'].item())
-            n_points = float(trace.header.loc['Number of Points'].item())
+            start_freq = header.startFreq
+            stop_freq = header.stopFreq
+            n_points = header.sweepPoints
 
             key = (
                 receiver,
@@ -113,144 +129,396 @@ def makeWaterfalls(frompath:str, topath:str, threshold:int = 100, tz:str = 'US/M
 
             trace_index[key].append({
                 "time": t_utc,
-                "trace": trace,
                 "path": file_path,
                 "filename": file_name,
+                "header": header,
             })
 
         except Exception as e:
             logging.waterfall(f"Failed parsing {file_name}: {e}")
 
-    groupsToProcess = {
+    return {
         key: traces
         for key, traces in trace_index.items()
-        if len(traces) > CSV_THRESHOLD
+        if len(traces) + (_cachedRows(_cacheArchive(cachePath, key)) if cachePath else 0) > threshold
     }
 
+def _cacheArchive(cachePath:str, key:tuple):
+    """Returns the TraceArchive holding the stacked traces and acquisition times of the group `key` in incremental mode."""
+    receiver, date, startFreq, stopFreq, sweepPoints = key
+    _year, _month, _ = date.split('-')
+    return TraceArchive(os.path.join(cachePath, receiver, _year, _month, f'{receiver}-{date}-{startFreq:.0f}-{stopFreq:.0f}-{sweepPoints:.0f}{TraceArchive.SUFFIX}'))
+
+def _cachedRows(archive:TraceArchive):
+    segments = archive.segments()
+    return archive.amplitudes(segments[0]).shape[0] if segments else 0
+
+def _cacheSuffix(archive:TraceArchive):
+    """Returns the suffix of the output file names of a cached group: empty for the first group of a receiver and date, by the time of its first trace, and the
+    position of the group otherwise, like _makeUniquePath numbers the outputs of the groups of one run.
+    """
+    directory = os.path.dirname(archive.path)
+    prefix = '-'.join(archive.name.split('-')[:4]) + '-'
+    siblings = [f for f in os.listdir(directory) if f.startswith(prefix) and f.endswith(TraceArchive.SUFFIX)]
+    if len(siblings) <= 1:
+        return ''
+    firstTimes = {}
+    for sibling in siblings:
+        records = TraceArchive(os.path.join(directory, sibling)).headers()
+        firstTimes[sibling] = min(datetime.fromisoformat(record['time']) for record in records) if records else datetime.max.replace(tzinfo=pytz.utc)
+    index = sorted(siblings, key=lambda f: (firstTimes[f], f)).index(os.path.basename(archive.path))
+    return str(index) if index else ''
+
+def _readManifest(cachePath:str):
+    """Returns the names of the csvs absorbed into the waterfall cache by previous incremental runs."""
+    try:
+        with open(os.path.join(cachePath, MANIFEST_FILE), 'r') as f:
+            return {line.rstrip('\n') for line in f if line.strip()}
+    except FileNotFoundError:
+        return set()
+
+def _writeManifest(cachePath:str, fileNames:set):
+    os.makedirs(cachePath, exist_ok=True)
+    path = os.path.join(cachePath, MANIFEST_FILE)
+    with open(path + '.tmp', 'w') as f:
+        f.writelines(f'{name}\n' for name in sorted(fileNames, key=natural_sort_key))
+    os.replace(path + '.tmp', path)
+
+def _processGroup(key:tuple, traces:list, topath:str, tz:str, filetype:str, dpi:int, moveFlag:bool, makeMatpl:bool, makePlotly:bool, makeAvg:bool, cachePath:str=None):
+    """Reads the csvs of one group returned by _scanGroups and generates its waterfall plots and average trace. Runs in a worker process in process pool mode.
+
+    The amplitudes are written into a float32 matrix with one row per csv, allocated once for the group, and each csv is discarded as soon as its row is filled, so
+    memory use is bounded by the size of the matrix rather than by the parsed files. In incremental mode the rows are appended to the group's TraceArchive in
+    `cachePath` instead, the plots are drawn from every cached row, and the outputs of previous runs are overwritten.
+
+    Args:
+        key (tuple): (receiver, date, startFreq, stopFreq, sweepPoints) of the group.
+        traces (list): {"time", "path", "filename", "header"} dictionaries of the csvs in the group.
+        cachePath (str, optional): Waterfall cache directory, None to process only `traces`. Defaults to None.
+        Remaining arguments are documented in makeWaterfalls.
+
+    Returns:
+        list: (original path, current path) pairs of the csvs absorbed into the plots, the paths differ for csvs moved to the Archived directory.
+    """
+    receiver, date, startFreq, stopFreq, sweepPoints = key
+    TIMEZONE = pytz.timezone(tz)
+
     if moveFlag:
         archivedir = _mkdir(topath, 'Archived')
-    
-    for (receiver, date, startFreq, stopFreq, sweepPoints), traces in groupsToProcess.items():
-
-        # Sort traces by true acquisition time
-        traces.sort(key=lambda t: t["time"])
 
-        x = []
-        y = []
-        z = []
+    # Sort traces by true acquisition time
+    traces.sort(key=lambda t: t["time"])
 
-        _year, _month, _ = date.split('-')
-        _filename = f'{receiver}-{date}-WATERFALL'
+    x = None            # Frequency axis of the first trace, every other trace must match it
+    y = []              # Acquisition time of each row of z
+    z = np.empty((len(traces), int(sweepPoints)), dtype=np.float32)
+    rows = 0
+    header = None       # Header values of the last trace added, used for the average trace
+    absorbed = []
+    archive = _cacheArchive(cachePath, key) if cachePath else None
+    if archive is not None:
+        cachedTimes = {record['time'] for record in archive.headers()}
+        if archive.segments():
+            x = archive.frequency(0)
 
-        if moveFlag:
-            moveToDir = _mkdir(archivedir, (receiver, _year, _month, _filename))
+    _year, _month, _ = date.split('-')
+    _filename = f'{receiver}-{date}-WATERFALL'
 
-        for entry in traces:
-            trace = entry["trace"]
+    if moveFlag:
+        moveToDir = _mkdir(archivedir, (receiver, _year, _month, _filename))
 
-            freq = trace.data.iloc[:, 0].astype(float)
-            amp = trace.data.iloc[:, 1].astype(float)
+    for entry in traces:
+        # Traces cached by a run interrupted before it updated the manifest are only moved
+        if archive is None or entry["time"].isoformat() not in cachedTimes:
+            try:
+                freq, amp = readTraceData(entry["path"], entry["header"].dataRow)
+            except Exception as e:
+                logging.waterfall(f'Failed parsing {entry["filename"]}: {e}')
+                continue
 
-            if len(x) == 0:
-                x.append(freq)
+            if x is None:
+                if archive is None and len(freq) != z.shape[1]:
+                    # 'Number of Points' disagrees with the data, size the matrix from the data instead
+                    z = np.empty((len(traces), len(freq)), dtype=np.float32)
+                x = freq
             else:
                 # Optional grid sanity check
-                if len(freq) != len(x[0]) or not np.allclose(freq, x[0]):
-                    logging.warning(f'Waterfall frequency grid mismatch - skipping trace {trace.name}')
+                if len(freq) != len(x) or not np.allclose(freq, x):
+                    logging.warning(f'Waterfall frequency grid mismatch - skipping trace {entry["header"].name}')
                     continue
 
-            z.append(amp)
-            y.append(entry["time"].astimezone(TIMEZONE))
-
-            if moveFlag:
-                try:
-                    shutil.move(entry["path"], moveToDir)
-                except (FileExistsError, shutil.Error):
-                    pass
-                except Exception as e:
-                    logging.waterfall(f'{type(e).__name__}: {e}')
-                    return
-            
-        # GENERATE WATERFALL PLOT
-        if makeMatpl:
-            wfplotdir = _mkdir(topath, 'Waterfall-Plots')
-            wfplotfullpath = _mkdir(wfplotdir, (receiver, _year, _month))
-            wfplotfullpathandfilename = os.path.join(wfplotfullpath, _filename + filetype)
+            if archive is None:
+                z[rows] = amp
+                rows += 1
+                y.append(entry["time"].astimezone(TIMEZONE))
+                header = entry["header"].values
+            else:
+                archive.append(x, amp, entry["header"].values.items(), entry["time"])
+        absorbed.append((entry["path"], entry["path"]))
+
+        if moveFlag:
+            try:
+                absorbed[-1] = (entry["path"], shutil.move(entry["path"], moveToDir))
+            except (FileExistsError, shutil.Error):
+                pass
+            except Exception as e:
+                logging.waterfall(f'{type(e).__name__}: {e}')
+                return absorbed
+
+    _suffix = ''
+    if archive is not None:
+        if not archive.segments():
+            logging.waterfall(f'No traces could be parsed for {_filename}')
+            return absorbed
+        # Draw every cached row in acquisition order, rows of a partial append without a header record are left out
+        amplitudes = archive.amplitudes(0)
+        records = sorted((record for record in archive.headers(0) if record['row'] < amplitudes.shape[0]), key=lambda record: datetime.fromisoformat(record['time']))
+        z = amplitudes[[record['row'] for record in records]]
+        y = [datetime.fromisoformat(record['time']).astimezone(TIMEZONE) for record in records]
+        header = records[-1]['header']
+        del amplitudes
+        _suffix = _cacheSuffix(archive)
+        _filename += _suffix
+        logging.waterfall(f'{_filename}: {len(absorbed)} new traces, {len(records)} in total')
+    elif not rows:
+        logging.waterfall(f'No traces could be parsed for {_filename}')
+        return absorbed
+    else:
+        z = z[:rows]
+
+    # GENERATE WATERFALL PLOT
+    if makeMatpl:
+        wfplotdir = _mkdir(topath, 'Waterfall-Plots')
+        wfplotfullpath = _mkdir(wfplotdir, (receiver, _year, _month))
+        wfplotfullpathandfilename = os.path.join(wfplotfullpath, _filename + filetype)
+        if archive is None:
             wfplotfullpathandfilename = _makeUniquePath(wfplotfullpathandfilename)
-            # plot
-            mpfig, ax = plt.subplots(layout='constrained')
-            mesh = ax.pcolormesh(x, y, z, shading='nearest', vmin=-80, vmax=-30)
-            ax.set_title(f'{_filename}')
-            ax.set_xlabel("Frequency (Hz)")
-            ax.set_ylabel(f'Time ({TIMEZONE.zone})')
-            ax.xaxis.set_minor_locator(ticker.AutoMinorLocator())
-            ax.yaxis.set_minor_locator(ticker.AutoMinorLocator())
-            ax.yaxis.set_major_locator(mdates.HourLocator(interval=4))
-            ax.xaxis.set_major_formatter(ticker.EngFormatter(unit=''))
-            ax.yaxis.set_major_formatter(mdates.DateFormatter('%H:%M', tz=TIMEZONE))
-            ax.invert_yaxis()
-            plt.colorbar(mesh, label='Magnitude (dBm)')
-            plt.savefig(wfplotfullpathandfilename, dpi=dpi)
-            logging.waterfall(f'File {_filename + filetype} successfully saved to {topath}')
-
-        # GENERATE WATERFALL PLOTLY HTML
-        if makePlotly:
-            plotlydir = _mkdir(topath, 'Waterfall-html')
-            plotlyfullpath = _mkdir(plotlydir, (receiver, _year, _month))
-            plotlyfullpathandfilename = os.path.join(plotlyfullpath, _filename + '.html')
+        # plot
+        mpfig, ax = plt.subplots(layout='constrained')
+        mesh = ax.pcolormesh(x, y, z, shading='nearest', vmin=-80, vmax=-30)
+        ax.set_title(f'{_filename}')
+        ax.set_xlabel("Frequency (Hz)")
+        ax.set_ylabel(f'Time ({TIMEZONE.zone})')
+        ax.xaxis.set_minor_locator(ticker.AutoMinorLocator())
+        ax.yaxis.set_minor_locator(ticker.AutoMinorLocator())
+        ax.yaxis.set_major_locator(mdates.HourLocator(interval=4))
+        ax.xaxis.set_major_formatter(ticker.EngFormatter(unit=''))
+        ax.yaxis.set_major_formatter(mdates.DateFormatter('%H:%M', tz=TIMEZONE))
+        ax.invert_yaxis()
+        plt.colorbar(mesh, label='Magnitude (dBm)')
+        plt.savefig(wfplotfullpathandfilename, dpi=dpi)
+        plt.close(mpfig)
+        logging.waterfall(f'File {_filename + filetype} successfully saved to {topath}')
+
+    # GENERATE WATERFALL PLOTLY HTML
+    if makePlotly:
+        plotlydir = _mkdir(topath, 'Waterfall-html')
+        plotlyfullpath = _mkdir(plotlydir, (receiver, _year, _month))
+        plotlyfullpathandfilename = os.path.join(plotlyfullpath, _filename + '.html')
+        if archive is None:
             plotlyfullpathandfilename = _makeUniquePath(plotlyfullpathandfilename)
-            pfig = px.imshow(
-                z,
-                x = np.array(x).squeeze(),      # Frequency (must remove leading dimension)
-                y = y,                          # Time (datetime)
-                origin="upper",                 # matches Matplotlib invert_yaxis()
-                aspect="auto",
-                zmin=-80,
-                zmax=-30,
-                color_continuous_scale="Viridis",
-            )
+        pfig = px.imshow(
+            z,
+            x = x,                          # Frequency
+            y = y,                          # Time (datetime)
+            origin="upper",                 # matches Matplotlib invert_yaxis()
+            aspect="auto",
+            zmin=-80,
+            zmax=-30,
+            color_continuous_scale="Viridis",
+        )
 
-            pfig.update_layout(
-                title=_filename,
-                xaxis_title="Frequency (Hz)",
-                yaxis_title=f"Time ({TIMEZONE.zone})",
-                coloraxis_colorbar=dict(title="Magnitude (dBm)"),
-            )
-            pfig.update_xaxes(tickformat="~s")          # x-axis: engineering notation (like EngFormatter) e.g., 1k, 10M, etc.
-            pfig.update_yaxes(tickformat="%H:%M")       # y-axis: datetime formatting (HH:MM)
-            pfig.write_html(plotlyfullpathandfilename)  # Save to HTML
-
-        # GENERATES AVERAGE CSV
-        if makeAvg:
-            avgdir = _mkdir(topath, 'Averages')
-            fullavgdir = _mkdir(avgdir, (receiver, _year, _month))
-            fullavgdriftdir = _mkdir(avgdir, ('DRIFT', receiver, _year, _month))
-            average = np.array((np.array(x[0][:]), np.mean(z, axis=0)))
-            # Create pandas dataframe by using the last collected trace header as the average trace header
-            datarow = pd.DataFrame({'index': ['DATA',], 'Value': [np.nan,]})
-            avgHeader = pd.concat([trace.header.reset_index(), datarow], ignore_index=True)
-            avgData = pd.DataFrame(average.T)
-            avgData.columns = ['index', 'Value']
-            avgCsvDf  = pd.concat([avgHeader, avgData], ignore_index=True)
-            avgCsvDf.columns = [0, 1]
-            # Create trace object from average csv dataframe and save to csvs in respective directories
-            AvgTraceCsvNameJoined = os.path.join(fullavgdir, f'{receiver}-{date}-AVG.csv')
+        pfig.update_layout(
+            title=_filename,
+            xaxis_title="Frequency (Hz)",
+            yaxis_title=f"Time ({TIMEZONE.zone})",
+            coloraxis_colorbar=dict(title="Magnitude (dBm)"),
+        )
+        pfig.update_xaxes(tickformat="~s")          # x-axis: engineering notation (like EngFormatter) e.g., 1k, 10M, etc.
+        pfig.update_yaxes(tickformat="%H:%M")       # y-axis: datetime formatting (HH:MM)
+        pfig.write_html(plotlyfullpathandfilename)  # Save to HTML
+
+    # GENERATES AVERAGE CSV
+    if makeAvg:
+        avgdir = _mkdir(topath, 'Averages')
+        fullavgdir = _mkdir(avgdir, (receiver, _year, _month))
+        fullavgdriftdir = _mkdir(avgdir, ('DRIFT', receiver, _year, _month))
+        average = np.array((x, np.mean(z, axis=0, dtype=np.float64)))
+        # Create pandas dataframe by using the last collected trace header as the average trace header
+        datarow = pd.DataFrame({'index': ['DATA',], 'Value': [np.nan,]})
+        avgHeader = pd.concat([pd.DataFrame({'index': list(header.keys()), 'Value': list(header.values())}), datarow], ignore_index=True)
+        avgData = pd.DataFrame(average.T)
+        avgData.columns = ['index', 'Value']
+        avgCsvDf  = pd.concat([avgHeader, avgData], ignore_index=True)
+        avgCsvDf.columns = [0, 1]
+        # Create trace object from average csv dataframe and save to csvs in respective directories
+        AvgTraceCsvNameJoined = os.path.join(fullavgdir, f'{receiver}-{date}-AVG{_suffix}.csv')
+        if archive is None:
             AvgTraceCsvNameJoined = _makeUniquePath(AvgTraceCsvNameJoined)
-            AvgTraceCsvName = os.path.basename(AvgTraceCsvNameJoined)
-            AvgTraceName, ext = os.path.splitext(AvgTraceCsvName)
-            AvgTrace = Trace(avgCsvDf, AvgTraceName)
-            # AvgTrace = Trace(avgCsvDf, f'{receiver}-{date}-AVG.csv')
-            AvgTraceDrift = AvgTrace.generateDriftData()
-            AvgTraceCsvName = AvgTrace.name + '.csv'
-            # Recreate scan name with 'D' in type to denote drift format
-            AvgTraceCsvDriftName = AvgTrace.drift.scan_name + '.csv'
-            # Join drift file paths and file names
-            AvgTraceCsvDriftNameJoined = os.path.join(fullavgdriftdir, AvgTraceCsvDriftName)
+        AvgTraceCsvName = os.path.basename(AvgTraceCsvNameJoined)
+        AvgTraceName, ext = os.path.splitext(AvgTraceCsvName)
+        AvgTrace = Trace(avgCsvDf, AvgTraceName)
+        # AvgTrace = Trace(avgCsvDf, f'{receiver}-{date}-AVG.csv')
+        AvgTraceDrift = AvgTrace.generateDriftData()
+        AvgTraceCsvName = AvgTrace.name + '.csv'
+        # Recreate scan name with 'D' in type to denote drift format
+        AvgTraceCsvDriftName = AvgTrace.drift.scan_name + '.csv'
+        # Join drift file paths and file names
+        AvgTraceCsvDriftNameJoined = os.path.join(fullavgdriftdir, AvgTraceCsvDriftName)
+        if archive is None:
             AvgTraceCsvDriftNameJoined = _makeUniquePath(AvgTraceCsvDriftNameJoined)
-            # Create csv files
-            AvgTrace.trace.to_csv(AvgTraceCsvNameJoined, index=False, header=False)
-            logging.waterfall(f'File {AvgTraceCsvName} successfully saved to {fullavgdir}')
-            AvgTraceDrift.to_csv(AvgTraceCsvDriftNameJoined, index=False)
-            logging.waterfall(f'File {AvgTraceCsvDriftName} successfully saved to {fullavgdriftdir}')
+        # Create csv files
+        AvgTrace.trace.to_csv(AvgTraceCsvNameJoined, index=False, header=False)
+        logging.waterfall(f'File {AvgTraceCsvName} successfully saved to {fullavgdir}')
+        AvgTraceDrift.to_csv(AvgTraceCsvDriftNameJoined, index=False)
+        logging.waterfall(f'File {AvgTraceCsvDriftName} successfully saved to {fullavgdriftdir}')
+
+    return absorbed
+
+def _runGroups(groups:list, maxWorkers:int, **kwargs):
+    """Calls _processGroup for every (key, traces) pair in `groups`, in a pool of `maxWorkers` processes if it is greater than 1. Log records of the workers are
+    handled by the logging handlers of this process.
+
+    Args:
+        groups (list): (key, traces) pairs returned by _scanGroups.
+        maxWorkers (int): Amount of worker processes, 0 for one per CPU core and 1 to process groups in this process.
+        **kwargs: Keyword arguments passed to _processGroup.
+
+    Returns:
+        list: (original path, current path) pairs of the csvs absorbed into the plots of every group.
+    """
+    absorbed = []
+    if maxWorkers == 0:
+        maxWorkers = os.cpu_count() or 1
+    maxWorkers = min(maxWorkers, len(groups))
+    if maxWorkers <= 1:
+        for key, traces in groups:
+            absorbed.extend(_processGroup(key, traces, **kwargs) or [])
+        return absorbed
 
-    logging.waterfall('No more plots to generate.')
\ No newline at end of file
+    logging.waterfall(f'Processing {len(groups)} waterfall groups with {maxWorkers} worker processes.')
+    with multiprocessing.Manager() as manager:
+        logQueue = manager.Queue()
+        listener = logging.handlers.QueueListener(logQueue, _LogRelay(), respect_handler_level=False)
+        listener.start()
+        try:
+            with ProcessPoolExecutor(max_workers=maxWorkers, initializer=_initWorker, initargs=(logQueue, logging.getLogger().getEffectiveLevel())) as executor:
+                futures = {executor.submit(_processGroup, key, traces, **kwargs): key for key, traces in groups}
+                for future in as_completed(futures):
+                    try:
+                        absorbed.extend(future.result() or [])
+                    except Exception as e:
+                        logging.waterfall(f'Failed generating waterfall for {futures[future][0]} {futures[future][1]}: {type(e).__name__}: {e}')
+        finally:
+            listener.stop()
+    return absorbed
+
+def _catalogAbsorbed(catalog:TraceCatalog, absorbed:list):
+    """Records the csvs absorbed into waterfalls, and the new location of those moved to the Archived directory, in the trace catalog."""
+    for path, current in absorbed:
+        if current != path:
+            catalog.move(path, current)
+    catalog.mark([current for path, current in absorbed], 'waterfall')
+    catalog.mark([current for path, current in absorbed if current != path], 'archived')
+
+class _LogRelay(logging.Handler):
+    def emit(self, record):
+        """Passes a log record received from a worker process to the loggers of this process."""
+        logging.getLogger(record.name).handle(record)
+
+def regenerateWaterfalls(frompath:str, topath:str, threshold:int = 100, tz:str = 'US/Mountain', filetype:str = '.png', dpi:int=600, moveFlag:bool=False, makeMatpl:bool=True, makePlotly:bool=True, makeAvg:bool=True, maxWorkers:int=1, catalogPath:str=None):
+    """Calls makeWaterfalls on every folder in `frompath` containing csvs, without moving them. The groups of every folder are processed by a single pool when
+    `maxWorkers` is greater than 1. Arguments are documented in makeWaterfalls.
+    """
+    folders_with_csv = []
+    for dirpath, dirnames, filenames in os.walk(frompath):
+        if any(filename.lower().endswith('.csv') for filename in filenames):
+            folders_with_csv.append(dirpath)
+    catalog = TraceCatalog(catalogPath) if catalogPath else None
+    try:
+        groups = []
+        for folder in folders_with_csv:
+            groups.extend(_scanGroups(folder, tz, threshold, catalog=catalog).items())
+        absorbed = _runGroups(groups, maxWorkers, topath=topath, tz=tz, filetype=filetype, dpi=dpi, moveFlag=False, makeMatpl=makeMatpl, makePlotly=makePlotly, makeAvg=makeAvg)
+        if catalog is not None:
+            _catalogAbsorbed(catalog, absorbed)
+    finally:
+        if catalog is not None:
+            catalog.close()
+    logging.waterfall('No more plots to generate.')
+
+def makeWaterfalls(frompath:str, topath:str, threshold:int = 100, tz:str = 'US/Mountain', filetype:str = '.png', dpi:int=600, moveFlag:bool=True, makeMatpl:bool=True, makePlotly:bool=True, makeAvg:bool=True, maxWorkers:int=1, incremental:bool=False, catalogPath:str=None):
+    """Searches for csv files located in `frompath`, and if there are an amount of csvs with a unique date and receiver information
+    in the file name above `threshold`, make a waterfall plot with them. A plot will only be made if all csv entries have a matching
+    start frequency, stop frequency, receiver, date, and number of sweet points. The plot is saved in `topath` as `filetype` and the
+    parsed csv files are moved to their own directory if `moveFlag` is true.
+
+    This function also generates an "averaged" csv of the entire waterfall plot and drift format version.
+
+    In incremental mode the amplitudes and acquisition times of each group are kept in a TraceArchive in `topath`/Waterfall-Cache, and the names of the csvs
+    absorbed into it in a manifest. Each run only reads the csvs that are not in the manifest, appends them to the cache and redraws the plots and average of the
+    updated groups from the cache, overwriting the previous outputs, so it can run every few minutes during the day. `threshold` counts the cached traces too.
+
+    Args:
+        frompath (str): File path to check for csvs.
+        topath (str): File path to generate waterfall plots and average csvs into, and to archive processed csvs.
+        threshold (int): Minimum count of unique csvs to process. Defaults to 100
+        tz (str, optional): Timezone string passed to pytz.timezone, can be 'UTC', 'US/(Pacific/Mountain/Central/Eastern)', etc. Defaults to 'US/Mountain'.
+        filetype (str, optional): File extension used in matplotlib.pyplot.savefig. Defaults to '.png'.
+        dpi (int, optional): Argument passed to matplotlib.pyplot.savefig. Defaults to 600.
+        moveFlag (bool, optional): Determines whether or not to move parsed trace csvs. Defaults to True.
+        makeMatpl (bool, optional): Determines whether or not to generate matplotlib waterfall. Defaults to True.
+        makePlotly (bool, optional): Determines whether or not to generate plotly.js waterfall. Defaults to True.
+        makeAvg (bool, optional): Determines whether or not to generate average trace. Defaults to True.
+        maxWorkers (int, optional): Amount of worker processes generating the plots of different groups in parallel, 0 for one per CPU core. Defaults to 1 (no worker processes).
+        incremental (bool, optional): Determines whether to add new csvs to the cached waterfalls of previous runs instead of plotting only the csvs found. Defaults to False.
+        catalogPath (str, optional): Trace catalog database (see catalog.py). The headers of csvs indexed by previous runs are taken from it instead of the files, and the
+            csvs absorbed into waterfalls or moved are recorded in it. Defaults to None (no catalog).
+    """
+    if not any([makeMatpl, makePlotly, makeAvg]):
+        logging.waterfall('Error: At least one argument of makeMatpl, makePlotly, and makeAvg, must be true.')
+        return
+
+    cachePath = os.path.join(topath, CACHE_DIR) if incremental else None
+    manifest = _readManifest(cachePath) if incremental else set()
+    catalog = TraceCatalog(catalogPath) if catalogPath else None
+    try:
+        groups = list(_scanGroups(frompath, tz, threshold, skip=manifest, cachePath=cachePath, catalog=catalog).items())
+        absorbed = _runGroups(groups, maxWorkers, topath=topath, tz=tz, filetype=filetype, dpi=dpi, moveFlag=moveFlag, makeMatpl=makeMatpl, makePlotly=makePlotly, makeAvg=makeAvg, cachePath=cachePath)
+        if catalog is not None:
+            _catalogAbsorbed(catalog, absorbed)
+    finally:
+        if catalog is not None:
+            catalog.close()
+    if incremental:
+        # Forget csvs that were moved or deleted so the manifest only grows with the contents of `frompath`
+        _writeManifest(cachePath, (manifest | {os.path.basename(path) for path, current in absorbed}) & set(getAllCsvFiles(frompath)))
+    logging.waterfall('No more plots to generate.')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generates waterfall plots and average traces from trace csvs.')
+    parser.add_argument('frompath', help='Directory to search for trace csvs')
+    parser.add_argument('topath', help='Directory to write plots and averages in')
+    parser.add_argument('--threshold', type=int, default=100)
+    parser.add_argument('--tz', default='US/Mountain')
+    parser.add_argument('--filetype', default='.png')
+    parser.add_argument('--dpi', type=int, default=600)
+    parser.add_argument('--no-move', action='store_true', help='Do not move processed csvs to the Archived directory')
+    parser.add_argument('--no-matplotlib', action='store_true')
+    parser.add_argument('--no-plotly', action='store_true')
+    parser.add_argument('--no-average', action='store_true')
+    parser.add_argument('--incremental', action='store_true', help='Add new csvs to the waterfalls cached by previous incremental runs')
+    parser.add_argument('--regenerate', action='store_true', help='Process every subdirectory of frompath with regenerateWaterfalls')
+    parser.add_argument('--workers', type=int, default=0, help='Worker processes, 0 for one per CPU core. Defaults to 0')
+    parser.add_argument('--catalog', default=None, help='Trace catalog database to read indexed headers from and record processed csvs in')
+    parser.add_argument('--relay', action='store_true', help='Write log records to stdout as "<level number>\\t<message>" lines')
+    args = parser.parse_args()
+
+    matplotlib.use('Agg')
+    if args.relay:
+        loggingsetup.relayLogToStdout()
+    options = dict(threshold=args.threshold, tz=args.tz, filetype=args.filetype, dpi=args.dpi, makeMatpl=not args.no_matplotlib, makePlotly=not args.no_plotly, makeAvg=not args.no_average, maxWorkers=args.workers, catalogPath=args.catalog)
+    if args.regenerate:
+        regenerateWaterfalls(args.frompath, args.topath, **options)
+    else:
+        makeWaterfalls(args.frompath, args.topath, moveFlag=not args.no_move, incremental=args.incremental, **options)
@@ -19,6 +19,8 @@
 #define SLOT_DISCRETE_OUT_15    1         // Slot on the P1AM that the P1-15TD2 discrete output module is connected to.
 #define ONE_SECOND              1000
 #define ONE_MINUTE              60000
+#define CHECK_24V_INTERVAL      100       // Milliseconds between checks of the 24V supply of the output module for status frames
+#define NO_OPCODE               (-1)      // Opcode of the status frames sent because the 24V check changed, which do not acknowledge an opcode
 
 // OUTPUT CHANNELS
 #define ALL_CHANNELS            0
@@ -33,6 +35,13 @@
 // GLOBAL VARIABLES
 bool returnOpCodes = false;               // Determines whether or not to Serial.print parsed opcodes
 int status;
+bool baseEnabled = true;                  // False after P1_DISABLE, the 24V supply is not checked until P1_INIT
+int supply24V = 0;                        // Last value returned by P1.check24V() for the output module
+int sentStatus = -1;                      // Status and supply24V in the last status frame, -1 before the first frame
+int sentSupply24V = -1;
+unsigned long last24VCheck = 0;           // millis() of the last 24V check
+
+void handleOpCode(int opCode);
 
 
 /**
@@ -97,6 +106,24 @@ uint8_t msbAnd(uint8_t a, uint8_t b) {
     return ((a >> 7) & 1 & ((b >> 7) & 1)) << 7;
 }
 
+/**
+ * @brief Prints a status frame "STATUS <opCode> <status> <supply24V>" so the Python program can update its buttons without polling.
+ * A frame is sent after every opcode except QUERY_STATUS, echoing the opcode so the sender can match it to its command, and whenever the 24V check
+ * changes, with the opcode NO_OPCODE.
+ * 
+ * @param opCode Opcode the frame acknowledges, or NO_OPCODE for a frame sent because the 24V check changed.
+ */
+void sendStatusFrame(int opCode) {
+    char outputStringBuffer[48];
+    if (opCode == NO_OPCODE && status == sentStatus && supply24V == sentSupply24V) {
+        return;
+    }
+    sprintf(outputStringBuffer, "STATUS %d %d %d", opCode, status, supply24V);
+    Serial.println(outputStringBuffer);
+    sentStatus = status;
+    sentSupply24V = supply24V;
+}
+
 /**
  * @brief Setup runs once during power on, initializes serial communication and PLC modules
  * 
@@ -113,7 +140,12 @@ void setup() {
  */
 void loop() {
     int opCode;
-    char outputStringBuffer[256];
+    // Push a status frame if the 24V supply of the output module changed
+    if (baseEnabled && millis() - last24VCheck >= CHECK_24V_INTERVAL) {
+        last24VCheck = millis();
+        supply24V = P1.check24V(SLOT_DISCRETE_OUT_15);
+        sendStatusFrame(NO_OPCODE);
+    }
     // Wait for information in serial buffer
     if (!Serial.available()) {
         return;
@@ -123,6 +155,20 @@ void loop() {
     if (opCode < 0) {
         return;
     }
+    handleOpCode(opCode);
+    // QUERY_STATUS is answered with the bare status, an extra frame would be left unread by the sender
+    if (opCode != QUERY_STATUS) {
+        sendStatusFrame(opCode);
+    }
+}
+
+/**
+ * @brief Executes a parsed opcode and updates `status`.
+ * 
+ * @param opCode Opcode returned by parseInput().
+ */
+void handleOpCode(int opCode) {
+    char outputStringBuffer[256];
     // Print the received opCode
     if (returnOpCodes && opCode != QUERY_STATUS) {
         sprintf(outputStringBuffer, "OpCode: 0x%02X (%d)", opCode, opCode);
@@ -164,7 +210,9 @@ void loop() {
             }
             return;
         case IS_BASE_ACTIVE:
-            Serial.println(P1.isBaseActive());
+            // Prefixed so the reply is not mistaken for the bare status answering QUERY_STATUS
+            sprintf(outputStringBuffer, "BASE %d", P1.isBaseActive());
+            Serial.println(outputStringBuffer);
             return;
         case PRINT_MODULES:
             if (P1.isBaseActive()) {
@@ -172,19 +220,27 @@ void loop() {
             }
             return;
         case CHECK_24V_SL1:
-            P1.check24V(1);
+            sprintf(outputStringBuffer, "24V 1 %d", P1.check24V(1));
+            Serial.println(outputStringBuffer);
+            return;
         case CHECK_24V_SL2:
-            P1.check24V(2);
+            sprintf(outputStringBuffer, "24V 2 %d", P1.check24V(2));
+            Serial.println(outputStringBuffer);
+            return;
         case CHECK_24V_SL3:
-            P1.check24V(3);
+            sprintf(outputStringBuffer, "24V 3 %d", P1.check24V(3));
+            Serial.println(outputStringBuffer);
+            return;
         case P1_INIT:
             Serial.println("Initializing...");
             while (!P1.init()){}
+            baseEnabled = true;
             status = SLEEP;
             return;
         case P1_DISABLE:
             Serial.println("Disabling P1AM-100 Module");
             P1.enableBaseController(false);
+            baseEnabled = false;
             status = opCode;
             return;
         case QUERY_STATUS: